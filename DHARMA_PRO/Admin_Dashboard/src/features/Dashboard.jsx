@@ -6,6 +6,16 @@ import KioskTicket from '../components/KioskTicket';
 
 import { getBookings, getBookingParticipants, getSlots, createKioskBooking, addParticipant } from '../services/api';
 
+// First day the dashboard needs bookings for: the chart looks back 30 days
+// (Month) or to Jan 1 (Year); an earlier selected date widens it
+const bookingsWindowStart = (selectedDate) => {
+    const monthAgo = new Date();
+    monthAgo.setDate(monthAgo.getDate() - 29);
+    const yearStart = new Date(new Date().getFullYear(), 0, 1);
+    const from = (monthAgo < yearStart ? monthAgo : yearStart).toISOString().split('T')[0];
+    return selectedDate && selectedDate < from ? selectedDate : from;
+};
+
 // Real Temple Timings Data
 const TEMPLE_TIMINGS = {
     '1': { // Somnath
@@ -222,7 +232,8 @@ export default function Dashboard() {
     const fetchDashboardData = async () => {
         try {
             setLoading(true);
-            const allBookingsData = await getBookings();
+            const windowStart = bookingsWindowStart(selectedDate);
+            const allBookingsData = await getBookings({ templeId: templeId || undefined, dateFrom: windowStart });
             setAllBookings(allBookingsData); // Store raw data for chart processing
 
             // Filter by templeId if present
@@ -298,7 +309,7 @@ export default function Dashboard() {
             setStats([
                 { title: 'Total Visitors', value: visitorsToday.toString(), change: 'Today', color: 'orange' },
                 { title: 'Active Slots', value: activeSlots.toString(), change: 'Today', color: 'red' },
-                { title: 'Total Bookings', value: filteredBookings.length.toString(), change: 'All Time', color: 'amber' },
+                { title: 'Total Bookings', value: filteredBookings.length.toString(), change: `Since ${windowStart}`, color: 'amber' },
             ]);
 
             // 3. Process Recent Bookings (Last 5)
@@ -129,7 +129,11 @@ export default function HeatMap() {
     const fetchHeatMapData = async (center) => {
         try {
             setLoading(true);
-            const allBookings = await getBookings();
+            const allBookings = await getBookings({
+                templeId: templeId || undefined,
+                dateFrom: selectedDate,
+                dateTo: selectedDate,
+            });
 
             const filteredBookings = allBookings.filter(b =>
                 (templeId ? String(b.templeId) === String(templeId) : true) &&
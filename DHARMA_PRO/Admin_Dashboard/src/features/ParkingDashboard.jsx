@@ -36,8 +36,8 @@ export default function ParkingDashboard() {
         const fetchParkingData = async () => {
             setLoading(true);
             try {
-                const allBookings = await getBookings();
                 const todayStr = new Date().toISOString().split('T')[0];
+                const allBookings = await getBookings({ templeId, dateFrom: todayStr, dateTo: todayStr });
 
                 // Filter: Today + Specific Temple
                 // Note: We might not have 'parkingRequired' in backend yet, so we assume all valid bookings *could* utilize parking
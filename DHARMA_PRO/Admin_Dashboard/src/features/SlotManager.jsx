@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import DatePicker from "react-datepicker";
 import "react-datepicker/dist/react-datepicker.css";
-import { createSlot, getSlots, updateSlot, deleteSlot, getTemple, getBookings, getBookingParticipants, getParticipant } from "../services/api";
+import { createSlot, getSlots, subscribeSlotStream, updateSlot, deleteSlot, getTemple, getBookings, getBookingParticipants, getParticipant } from "../services/api";
 import { useParams, useNavigate } from "react-router-dom";
 
 const timeOptions = Array.from({ length: 40 }, (_, i) => {
@@ -42,6 +42,24 @@ export default function SlotManager() {
     }
   }, [templeId]);
 
+  // Live updates: bookings, cancellations and edits made elsewhere
+  useEffect(() => {
+    if (!templeId) return;
+    return subscribeSlotStream(templeId, (event) => {
+      setSlots((current) => {
+        if (event.deleted) {
+          return current.filter((s) => s.id !== event.slotId);
+        }
+        return current.map((s) => s.id !== event.slotId ? s : {
+          ...s,
+          onlineCapacity: event.onlineTickets,
+          offlineCapacity: event.capacity - event.onlineTickets,
+          onlineBooked: Math.max(0, event.onlineTickets - event.remaining),
+        });
+      });
+    });
+  }, [templeId]);
+
   const fetchTempleDetails = async () => {
     try {
       const data = await getTemple(templeId);
@@ -58,8 +76,11 @@ export default function SlotManager() {
       let realUsageMap = {};
 
       try {
-        // Fetch all bookings and filter by current temple
-        const allBookings = await getBookings();
+        // Only this temple's bookings, over the days its slots cover
+        const slotDates = data.map(s => s.date).filter(Boolean).sort();
+        const allBookings = slotDates.length
+          ? await getBookings({ templeId, dateFrom: slotDates[0], dateTo: slotDates[slotDates.length - 1] })
+          : [];
         const relevantBookings = allBookings.filter(b => String(b.templeId) === String(templeId) && b.slotId);
 
         // Fetch participants for each booking (Parallel)
@@ -22,8 +22,8 @@ export default function TempleSelector({ temples }) {
 
   const fetchTempleStats = async () => {
     try {
-      const allBookings = await getBookings();
       const today = new Date().toISOString().split('T')[0];
+      const allBookings = await getBookings({ dateFrom: today, dateTo: today });
       const todaysBookings = allBookings.filter(b => b.bookingDate === today);
 
       const stats = {};
@@ -190,6 +190,20 @@ export const getSlots = async (templeId) => {
     }
 };
 
+// Live slot changes (bookings, cancellations, edits) for one temple.
+// Calls onSlot with each event; returns a function that closes the stream.
+export const subscribeSlotStream = (templeId, onSlot) => {
+    const source = new EventSource(`${BASE_URL}/slots/stream?templeId=${templeId}`);
+    source.addEventListener("slot", (e) => {
+        try {
+            onSlot(JSON.parse(e.data));
+        } catch (error) {
+            console.error("Bad slot event:", error);
+        }
+    });
+    return () => source.close();
+};
+
 export const updateSlot = async (id, slotData) => {
     try {
         const token = getAuthToken();
@@ -285,17 +299,31 @@ export const createKioskBooking = async (bookingData) => {
     }
 };
 
-export const getBookings = async () => {
+// filters: { templeId, slotId, dateFrom, dateTo, bookingType, special } (server-side).
+// The backend returns one page at a time; follow X-Next-Cursor to the end.
+export const getBookings = async (filters = {}) => {
     try {
         const token = getAuthToken();
-        const response = await fetch(`${BASE_URL}/bookings/`, {
-            headers: {
-                "Authorization": `Bearer ${token}`,
-                "Content-Type": "application/json"
-            }
-        });
-        if (!response.ok) throw new Error("Failed to fetch bookings");
-        return await response.json();
+        const bookings = [];
+        let after = null;
+        do {
+            const queryParams = new URLSearchParams({ limit: "1000" });
+            Object.entries(filters).forEach(([key, value]) => {
+                if (value !== undefined && value !== null && value !== "") queryParams.append(key, value);
+            });
+            if (after) queryParams.append("after", after);
+
+            const response = await fetch(`${BASE_URL}/bookings/?${queryParams.toString()}`, {
+                headers: {
+                    "Authorization": `Bearer ${token}`,
+                    "Content-Type": "application/json"
+                }
+            });
+            if (!response.ok) throw new Error("Failed to fetch bookings");
+            bookings.push(...(await response.json()));
+            after = response.headers.get("X-Next-Cursor");
+        } while (after);
+        return bookings;
     } catch (error) {
         console.error("Error fetching bookings:", error);
         throw error;
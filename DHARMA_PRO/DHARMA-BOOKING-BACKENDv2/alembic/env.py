@@ -22,6 +22,8 @@ import database.models.user.user_model
 import database.models.booking.booking_model
 import database.models.booking.booking_participant_model
 import database.models.booking.slot_model
+import database.models.booking.slot_lease_model
+import database.models.booking.slot_counter_model
 import database.models.temple.temple_model
 import database.models.admin.admin_model
 import database.models.payment.payment_model
@@ -29,6 +31,8 @@ import database.models.common.sms_model
 import database.models.parking.parking_model
 import database.models.parking.parking_slot_model
 import database.models.common.ticket_model   # <-- IMPORTANT
+import database.models.common.ticket_revocation_model
+import database.models.common.ticket_admission_model
 # ---------------------------------------------
 
 
@@ -0,0 +1,34 @@
+"""add slot_leases table
+
+Revision ID: 3c1d7e9a2b40
+Revises: 8f602cb2a864
+Create Date: 2026-01-12 10:04:18.512930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d7e9a2b40'
+down_revision: Union[str, Sequence[str], None] = '8f602cb2a864'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('slot_leases',
+    sa.Column('slotId', sa.Integer(), nullable=False),
+    sa.Column('tokens', sa.Integer(), nullable=False),
+    sa.Column('updatedAt', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['slotId'], ['slots.slotId'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('slotId')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('slot_leases')
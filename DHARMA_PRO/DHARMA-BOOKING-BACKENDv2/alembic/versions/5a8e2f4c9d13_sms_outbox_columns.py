@@ -0,0 +1,38 @@
+"""sms_logs outbox columns
+
+Revision ID: 5a8e2f4c9d13
+Revises: 3c1d7e9a2b40
+Create Date: 2026-01-14 16:37:52.104118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8e2f4c9d13'
+down_revision: Union[str, Sequence[str], None] = '3c1d7e9a2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('sms_logs', 'userId', existing_type=sa.Integer(), nullable=True)
+    op.add_column('sms_logs', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sms_logs', sa.Column('nextAttemptAt', sa.DateTime(), nullable=True))
+    op.add_column('sms_logs', sa.Column('lastError', sa.Text(), nullable=True))
+    op.add_column('sms_logs', sa.Column('sentAt', sa.DateTime(), nullable=True))
+    op.create_index('ix_sms_logs_status_next_attempt', 'sms_logs', ['status', 'nextAttemptAt'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sms_logs_status_next_attempt', table_name='sms_logs')
+    op.drop_column('sms_logs', 'sentAt')
+    op.drop_column('sms_logs', 'lastError')
+    op.drop_column('sms_logs', 'nextAttemptAt')
+    op.drop_column('sms_logs', 'attempts')
+    op.alter_column('sms_logs', 'userId', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,30 @@
+"""tickets image_status column
+
+Revision ID: 7b3e9d1f6a25
+Revises: 5a8e2f4c9d13
+Create Date: 2026-01-19 11:02:41.583207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9d1f6a25'
+down_revision: Union[str, Sequence[str], None] = '5a8e2f4c9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing tickets were rendered inline, so they are already READY
+    op.add_column('tickets', sa.Column('image_status', sa.String(length=16), nullable=False, server_default='READY'))
+    op.alter_column('tickets', 'image_status', existing_type=sa.String(length=16), server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tickets', 'image_status')
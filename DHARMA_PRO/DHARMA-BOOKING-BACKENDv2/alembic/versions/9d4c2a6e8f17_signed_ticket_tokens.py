@@ -0,0 +1,42 @@
+"""signed ticket tokens: wider tickets.token, ticket_revocations table
+
+Revision ID: 9d4c2a6e8f17
+Revises: 7b3e9d1f6a25
+Create Date: 2026-01-23 09:41:07.226518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4c2a6e8f17'
+down_revision: Union[str, Sequence[str], None] = '7b3e9d1f6a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Signed QR payloads are ~200 characters
+    op.alter_column('tickets', 'token', existing_type=sa.String(length=128), type_=sa.String(length=512),
+                    existing_nullable=False)
+    op.create_table('ticket_revocations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ticket_id', sa.String(length=64), nullable=False),
+    sa.Column('reason', sa.String(length=128), nullable=True),
+    sa.Column('revoked_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('ticket_id')
+    )
+    op.create_index(op.f('ix_ticket_revocations_id'), 'ticket_revocations', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ticket_revocations_id'), table_name='ticket_revocations')
+    op.drop_table('ticket_revocations')
+    op.alter_column('tickets', 'token', existing_type=sa.String(length=512), type_=sa.String(length=128),
+                    existing_nullable=False)
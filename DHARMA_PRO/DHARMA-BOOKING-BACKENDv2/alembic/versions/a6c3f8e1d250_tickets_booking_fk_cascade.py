@@ -0,0 +1,37 @@
+"""tickets_booking_fk_cascade: cancelling a booking deletes its ticket rows
+
+Revision ID: a6c3f8e1d250
+Revises: f5b8d2e7a419
+Create Date: 2026-02-19 10:42:13.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3f8e1d250'
+down_revision: Union[str, Sequence[str], None] = 'f5b8d2e7a419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # SQLite does not enforce the foreign key here
+    op.drop_constraint('tickets_booking_id_fkey', 'tickets', type_='foreignkey')
+    op.create_foreign_key(
+        'tickets_booking_id_fkey', 'tickets', 'bookings',
+        ['booking_id'], ['bookingId'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('tickets_booking_id_fkey', 'tickets', type_='foreignkey')
+    op.create_foreign_key('tickets_booking_id_fkey', 'tickets', 'bookings', ['booking_id'], ['bookingId'])
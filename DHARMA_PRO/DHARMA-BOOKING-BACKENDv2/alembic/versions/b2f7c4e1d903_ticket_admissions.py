@@ -0,0 +1,35 @@
+"""ticket_admissions: scan-once admission ledger
+
+Revision ID: b2f7c4e1d903
+Revises: 9d4c2a6e8f17
+Create Date: 2026-01-27 16:12:48.603114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f7c4e1d903'
+down_revision: Union[str, Sequence[str], None] = '9d4c2a6e8f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ticket_admissions',
+    sa.Column('ticket_id', sa.String(length=64), nullable=False),
+    sa.Column('gate_id', sa.String(length=64), nullable=False),
+    sa.Column('headcount', sa.Integer(), nullable=True),
+    sa.Column('scanned_at', sa.DateTime(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('ticket_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ticket_admissions')
@@ -0,0 +1,34 @@
+"""bookings: composite indexes for keyset pagination
+
+Revision ID: c4a1e8f3b652
+Revises: b2f7c4e1d903
+Create Date: 2026-01-30 11:08:21.457390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a1e8f3b652'
+down_revision: Union[str, Sequence[str], None] = 'b2f7c4e1d903'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_temple_booking', 'bookings', ['templeId', 'bookingId'], unique=False)
+    op.create_index('ix_bookings_temple_date', 'bookings', ['templeId', 'bookingDate'], unique=False)
+    op.create_index('ix_bookings_slot_booking', 'bookings', ['slotId', 'bookingId'], unique=False)
+    op.create_index('ix_bookings_date_booking', 'bookings', ['bookingDate', 'bookingId'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_date_booking', table_name='bookings')
+    op.drop_index('ix_bookings_slot_booking', table_name='bookings')
+    op.drop_index('ix_bookings_temple_date', table_name='bookings')
+    op.drop_index('ix_bookings_temple_booking', table_name='bookings')
@@ -0,0 +1,44 @@
+"""indexes for hot booking / slot / payment / ticket lookups
+
+Revision ID: d7e2b5a9c184
+Revises: c4a1e8f3b652
+Create Date: 2026-02-02 10:26:54.318902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e2b5a9c184'
+down_revision: Union[str, Sequence[str], None] = 'c4a1e8f3b652'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_user_booking', 'bookings', ['userId', 'bookingId'], unique=False)
+    op.create_index('ix_slots_temple_date_start', 'slots', ['templeId', 'date', 'startTime'], unique=False)
+    op.create_index('ix_slots_date_start', 'slots', ['date', 'startTime'], unique=False)
+    op.create_index('ix_slots_temple_number', 'slots', ['templeId', 'slotNumber'], unique=False)
+    op.create_index(op.f('ix_payments_bookingId'), 'payments', ['bookingId'], unique=False)
+    op.create_index(op.f('ix_booking_participants_bookingId'), 'booking_participants', ['bookingId'], unique=False)
+    op.create_index(op.f('ix_tickets_booking_id'), 'tickets', ['booking_id'], unique=False)
+    op.create_index('ix_tickets_pending_image', 'tickets', ['image_status'], unique=False,
+                    postgresql_where=sa.text("image_status = 'PENDING'"),
+                    sqlite_where=sa.text("image_status = 'PENDING'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_pending_image', table_name='tickets')
+    op.drop_index(op.f('ix_tickets_booking_id'), table_name='tickets')
+    op.drop_index(op.f('ix_booking_participants_bookingId'), table_name='booking_participants')
+    op.drop_index(op.f('ix_payments_bookingId'), table_name='payments')
+    op.drop_index('ix_slots_temple_number', table_name='slots')
+    op.drop_index('ix_slots_date_start', table_name='slots')
+    op.drop_index('ix_slots_temple_date_start', table_name='slots')
+    op.drop_index('ix_bookings_user_booking', table_name='bookings')
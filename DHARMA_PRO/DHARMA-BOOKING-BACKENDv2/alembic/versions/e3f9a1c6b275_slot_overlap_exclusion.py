@@ -0,0 +1,50 @@
+"""exclusion constraint: a temple's slots may not overlap (PostgreSQL)
+
+Revision ID: e3f9a1c6b275
+Revises: d7e2b5a9c184
+Create Date: 2026-02-09 11:42:17.604233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f9a1c6b275'
+down_revision: Union[str, Sequence[str], None] = 'd7e2b5a9c184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # the router checks for overlaps itself
+
+    overlapping = op.get_bind().execute(sa.text(
+        """
+        SELECT a."slotId", b."slotId" FROM slots a
+        JOIN slots b ON a."templeId" = b."templeId" AND a.date = b.date AND a."slotId" < b."slotId"
+        WHERE a."startTime" < b."endTime" AND a."endTime" > b."startTime"
+        LIMIT 10
+        """
+    )).all()
+    if overlapping:
+        raise RuntimeError(
+            f"Overlapping slots (slotId pairs) must be fixed before adding ex_slots_temple_time: {overlapping}"
+        )
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        '''ALTER TABLE slots ADD CONSTRAINT ex_slots_temple_time EXCLUDE USING gist '''
+        '''("templeId" WITH =, tsrange(date + "startTime", date + "endTime", '[)') WITH &&)'''
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('ex_slots_temple_time', 'slots', type_='exclude')
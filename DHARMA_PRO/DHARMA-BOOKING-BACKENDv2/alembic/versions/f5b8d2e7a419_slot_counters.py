@@ -0,0 +1,39 @@
+"""slot_counters: per-temple slotNumber allocation
+
+Revision ID: f5b8d2e7a419
+Revises: e3f9a1c6b275
+Create Date: 2026-02-12 09:18:40.227615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b8d2e7a419'
+down_revision: Union[str, Sequence[str], None] = 'e3f9a1c6b275'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('slot_counters',
+    sa.Column('templeId', sa.Integer(), nullable=False),
+    sa.Column('lastSlotNumber', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['templeId'], ['temples.templeId'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('templeId')
+    )
+    # continue every temple's numbering where it stands
+    op.execute(
+        'INSERT INTO slot_counters ("templeId", "lastSlotNumber") '
+        'SELECT "templeId", COALESCE(MAX("slotNumber"), 0) FROM slots '
+        'WHERE "templeId" IS NOT NULL GROUP BY "templeId"'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('slot_counters')
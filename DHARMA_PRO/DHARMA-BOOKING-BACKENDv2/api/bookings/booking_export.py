@@ -0,0 +1,106 @@
+# api/bookings/booking_export.py
+"""
+Streaming bookings export (GET /bookings/export) for reconciliation.
+
+Rows are plain column tuples (no ORM objects) read through a server-side
+cursor, BOOKINGS_EXPORT_CHUNK at a time (yield_per), and written out as
+NDJSON or CSV one chunk at a time, optionally gzip-compressed on the fly.
+Memory stays flat whatever the table size.
+
+The generator opens its own session: the response body is produced after
+the endpoint (and its get_db session) has returned.
+"""
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Iterator, List
+
+from sqlalchemy import select
+
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.payment.payment_model import Payment
+
+BOOKINGS_EXPORT_CHUNK = int(os.getenv("BOOKINGS_EXPORT_CHUNK", "2000"))
+
+COLUMNS = [
+    Booking.bookingId,
+    Booking.bookingType,
+    Booking.special,
+    Booking.bookingDate,
+    Booking.templeId,
+    Booking.slotId,
+    Booking.userId,
+    Booking.mobileNumber,
+    Booking.numberOfParticipants,
+    Payment.paymentId,
+    Payment.amount,
+    Payment.paymentMethod,
+    Payment.paymentStatus,
+    Payment.transactionId,
+    Payment.paymentDate,
+]
+FIELDS = [column.key for column in COLUMNS]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query():
+    """Every booking with its payment (if any), in bookingId order. Add filters with .filter()."""
+    return (
+        select(*COLUMNS)
+        .outerjoin(Payment, Payment.bookingId == Booking.bookingId)
+        .order_by(Booking.bookingId)
+    )
+
+
+def _chunks(query) -> Iterator[List[tuple]]:
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=BOOKINGS_EXPORT_CHUNK))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def ndjson(query) -> Iterator[bytes]:
+    for rows in _chunks(query):
+        yield "".join(
+            json.dumps(dict(zip(FIELDS, map(_value, row))), separators=(",", ":")) + "\n" for row in rows
+        ).encode()
+
+
+def csv_rows(query) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for rows in _chunks(query):
+        writer.writerows([_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():   # header only: no bookings matched
+        yield buffer.getvalue().encode()
+
+
+def gzipped(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)   # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(query, fmt: str, gzip: bool = False) -> Iterator[bytes]:
+    chunks = csv_rows(query) if fmt == "csv" else ndjson(query)
+    return gzipped(chunks) if gzip else chunks
@@ -1,8 +1,10 @@
 # api/booking_router.py
+import os
 from typing import List, Optional
-from datetime import date as DateType
+from datetime import date as DateType, datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database.dependencies import get_current_user
 from database.models.admin.admin_model import Admin
@@ -12,23 +14,38 @@ from database.models.user.user_model import User
 from database.models.temple.temple_model import Temple
 from database.models.booking.slot_model import Slot
 from database.schemas.booking.booking_schema import BookingCreate, BookingResponse
-from database.get_db import get_db
-
-
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
+from database.get_db import get_async_db, get_db
+from api.bookings import booking_export
+from api.bookings.slot_inventory import (
+    reserve_slot_tickets,
+    release_slot_tickets,
+    booking_ticket_count,
+)
+from api.notifications.sms_outbox import enqueue_sms, wake as wake_sms_dispatcher
+from api.payments.ticket_service import reissue_signed_tickets
+from api.payments.ticket_tokens import claims_for, revoke_booking
 
 router = APIRouter(
     prefix="/bookings",
     tags=["Bookings"],
 )
 
+# GET /bookings/ page size: default, and the most a client may ask for
+BOOKINGS_PAGE_DEFAULT = int(os.getenv("BOOKINGS_PAGE_DEFAULT", "100"))
+BOOKINGS_PAGE_MAX = int(os.getenv("BOOKINGS_PAGE_MAX", "1000"))
+
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_booking(payload: BookingCreate, db: Session = Depends(get_db)):
+async def create_booking(payload: BookingCreate, db=Depends(get_async_db)):
+    new_booking = await db.run_sync(_create_booking, payload)
+
+    # Delivered by the background dispatcher, off the request path
+    wake_sms_dispatcher()
+
+    return new_booking
+
+
+def _create_booking(db: Session, payload: BookingCreate):
 
     # --- Your validation logic ---
     user = db.query(User).filter(User.userId == payload.userId).first()
@@ -39,13 +56,9 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db)):
     if not temple:
         raise HTTPException(404, "Temple not found for given templeId")
 
-    slot = None
+    # --- Reserve tickets (atomic, same transaction as the insert) ---
     if payload.slotId is not None:
-        slot = db.query(Slot).filter(Slot.slotId == payload.slotId).first()
-        if not slot:
-            raise HTTPException(404, "Slot not found for given slotId")
-        if slot.templeId != payload.templeId:
-            raise HTTPException(400, "Slot does not belong to the given temple")
+        reserve_slot_tickets(db, payload.slotId, payload.templeId, payload.numberOfParticipants)
 
     # --- Create booking ---
     user_mobile = user.mobileNumber
@@ -58,15 +71,15 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db)):
         userId=payload.userId,
         slotId=payload.slotId,
         bookingDate=payload.bookingDate,
-        mobileNumber=user_mobile
+        mobileNumber=user_mobile,
+        numberOfParticipants=payload.numberOfParticipants,
     )
 
     db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+    db.flush()   # assigns bookingId for the SMS text
 
     # ----------------------------------------------------
-    # ⭐ PREPARE SMS
+    # ⭐ QUEUE SMS (outbox row, same transaction as booking)
     # ----------------------------------------------------
     sms_message = (
     f"Dear {user.firstName}, your Dharma booking is confirmed!\n"
@@ -76,38 +89,95 @@ def create_booking(payload: BookingCreate, db: Session = Depends(get_db)):
     f"Slot ID: {new_booking.slotId}\n"
     f"Thank you for using Dharma."
     )
+    enqueue_sms(db, user.mobileNumber, sms_message, user_id=user.userId)
 
-    # ----------------------------------------------------
-    # ⭐ SEND SMS THROUGH NGROK → TWILIO SERVICE
-    # ----------------------------------------------------
+    db.commit()
+    db.refresh(new_booking)
 
-    try:
-        send_data = {
-            "mobile": user.mobileNumber,
-            "message": sms_message  
-        }
+    return new_booking
 
-        URL=os.getenv("URL")
-        sms_response = requests.post(URL, json=send_data)
-        sms_response_json = sms_response.json()
 
-        print("SMS Response:", sms_response_json)
-        status_text = sms_response_json.get("status", "unknown")
-
-    except Exception as e:
-        status_text = f"FAILED: {str(e)}"
-        print("SMS ERROR:", status_text)
-    return new_booking
+def _booking_filters(query, templeId=None, slotId=None, dateFrom=None, dateTo=None, bookingType=None, special=None):
+    """Admin list / export filters; works on a Query or a select(). Dates are inclusive days."""
+    if templeId is not None:
+        query = query.filter(Booking.templeId == templeId)
+    if slotId is not None:
+        query = query.filter(Booking.slotId == slotId)
+    if dateFrom is not None:
+        query = query.filter(Booking.bookingDate >= datetime.combine(dateFrom, datetime.min.time()))
+    if dateTo is not None:
+        query = query.filter(Booking.bookingDate < datetime.combine(dateTo + timedelta(days=1), datetime.min.time()))
+    if bookingType is not None:
+        query = query.filter(Booking.bookingType == bookingType)
+    if special is not None:
+        query = query.filter(Booking.special == special)
+    return query
 
 
 @router.get(
     "/",
     response_model=List[BookingResponse],
 )
-def get_all_bookings(
+async def get_all_bookings(
+    response: Response,
+    after: Optional[int] = None,
+    limit: int = BOOKINGS_PAGE_DEFAULT,
+    templeId: Optional[int] = None,
+    slotId: Optional[int] = None,
+    dateFrom: Optional[DateType] = None,
+    dateTo: Optional[DateType] = None,
+    bookingType: Optional[str] = None,
+    special: Optional[bool] = None,
+    db=Depends(get_async_db),
+    user=Depends(get_current_user)
+):
+    """
+    One page of bookings in bookingId order (keyset pagination).
+    Pass the X-Next-Cursor response header back as `after` for the next
+    page; no header means this was the last page. dateFrom / dateTo are
+    inclusive booking days.
+    """
+    if user["role"] != "admin":
+        raise HTTPException(403, "Not authorized")
+
+    limit = max(1, min(limit, BOOKINGS_PAGE_MAX))
+    bookings = await db.run_sync(
+        _bookings_page, user["id"], after, limit, templeId, slotId, dateFrom, dateTo, bookingType, special
+    )
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        response.headers["X-Next-Cursor"] = str(bookings[-1].bookingId)
+    return bookings
+
+
+def _bookings_page(db: Session, admin_id, after, limit, *filters):
+    """Up to limit + 1 bookings (the extra one means there is a next page)"""
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
+
+    if not admin:
+        raise HTTPException(404, "Admin not found")
+
+    query = _booking_filters(db.query(Booking), *filters)
+    if after is not None:
+        query = query.filter(Booking.bookingId > after)
+
+    return query.order_by(Booking.bookingId).limit(limit + 1).all()
+
+
+@router.get("/export")
+def export_bookings(
+    format: str = "ndjson",
+    gzip: bool = False,
+    templeId: Optional[int] = None,
+    dateFrom: Optional[DateType] = None,
+    dateTo: Optional[DateType] = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
+    """
+    Every matching booking with its payment, streamed as NDJSON (default) or
+    CSV. gzip=true compresses the stream (Content-Encoding: gzip).
+    """
     if user["role"] != "admin":
         raise HTTPException(403, "Not authorized")
 
@@ -116,17 +186,27 @@ def get_all_bookings(
     if not admin:
         raise HTTPException(404, "Admin not found")
 
+    if format not in booking_export.MEDIA_TYPES:
+        raise HTTPException(400, "format must be ndjson or csv")
 
-    bookings = db.query(Booking).all()
-    return bookings
+    query = _booking_filters(booking_export.export_query(), templeId, dateFrom=dateFrom, dateTo=dateTo)
+    headers = {"Content-Disposition": f'attachment; filename="bookings.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        booking_export.stream(query, format, gzip),
+        media_type=booking_export.MEDIA_TYPES[format],
+        headers=headers,
+    )
 
 
 @router.get(
     "/{booking_id}",
     response_model=BookingResponse,
 )
-def get_booking_by_id(booking_id: int, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.bookingId == booking_id).first()
+async def get_booking_by_id(booking_id: int, db=Depends(get_async_db)):
+    booking = await db.run_sync(lambda db: db.query(Booking).filter(Booking.bookingId == booking_id).first())
 
     if not booking:
         raise HTTPException(
@@ -141,8 +221,8 @@ def get_booking_by_id(booking_id: int, db: Session = Depends(get_db)):
     "/user/{user_id}",
     response_model=List[BookingResponse],
 )
-def get_bookings_by_user(user_id: int, db: Session = Depends(get_db)):
-    bookings = db.query(Booking).filter(Booking.userId == user_id).all()
+async def get_bookings_by_user(user_id: int, db=Depends(get_async_db)):
+    bookings = await db.run_sync(lambda db: db.query(Booking).filter(Booking.userId == user_id).all())
     return bookings
 
 
@@ -150,14 +230,30 @@ def get_bookings_by_user(user_id: int, db: Session = Depends(get_db)):
     "/{booking_id}",
     response_model=BookingResponse,
 )
-def update_booking(
+async def update_booking(
     booking_id: int,
     payload: BookingCreate,
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
 ):
     """
     Full update: all fields from BookingCreate are required.
     """
+    booking = await db.run_sync(_update_booking, booking_id, payload)
+
+    # New ticket links, when signed tickets were reissued
+    wake_sms_dispatcher()
+
+    return booking
+
+
+def _gate_claims(booking) -> dict:
+    """What a signed ticket of this booking asserts (slot, date, headcount...), expiry aside."""
+    claims = claims_for(booking, "")
+    claims.pop("e")
+    return claims
+
+
+def _update_booking(db: Session, booking_id: int, payload: BookingCreate):
 
     booking = db.query(Booking).filter(Booking.bookingId == booking_id).first()
 
@@ -183,10 +279,19 @@ def update_booking(
             detail="Temple not found for given templeId",
         )
 
-    # Validate slot if provided
-    slot = None
-    if payload.slotId is not None:
-        slot = db.query(Slot).filter(Slot.id == payload.slotId).first()
+    gate_claims = _gate_claims(booking)
+
+    # Move tickets between slots: give back what the old slot held,
+    # then take from the new one (raises 404/400/409 on the new slot)
+    old_count = booking_ticket_count(booking)
+    if old_count:
+        release_slot_tickets(db, booking.slotId, old_count)
+
+    new_count = payload.numberOfParticipants if payload.bookingType != "OFFLINE" else 0
+    if payload.slotId is not None and new_count:
+        reserve_slot_tickets(db, payload.slotId, payload.templeId, new_count)
+    elif payload.slotId is not None:
+        slot = db.query(Slot).filter(Slot.slotId == payload.slotId).first()
         if not slot:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -203,10 +308,26 @@ def update_booking(
     booking.templeId = payload.templeId
     booking.userId = payload.userId
     booking.slotId = payload.slotId
+    booking.numberOfParticipants = payload.numberOfParticipants
 
     if getattr(payload, "bookingDate", None) is not None:
         booking.bookingDate = payload.bookingDate
 
+    # Signed tickets carry the old slot / date / headcount and gates check
+    # them offline: revoke them and send new ones, same transaction
+    db.flush()
+    db.expire(booking)
+    if _gate_claims(booking) != gate_claims:
+        reissued = reissue_signed_tickets(db, booking, "booking changed")
+        if reissued:
+            links = "\n".join(t["ticket_url"] for t in reissued)
+            enqueue_sms(
+                db, user.mobileNumber,
+                f"Dear {user.firstName}, your Dharma booking {booking.bookingId} was changed. "
+                f"Earlier tickets are no longer valid; your new ticket:\n{links}",
+                user_id=user.userId,
+            )
+
     db.commit()
     db.refresh(booking)
 
@@ -217,11 +338,16 @@ def update_booking(
     "/{booking_id}",
     status_code=status.HTTP_200_OK,
 )
-def delete_booking(booking_id: int, db: Session = Depends(get_db)):
+async def delete_booking(booking_id: int, db=Depends(get_async_db)):
     """
     Cancel a booking by ID.
     This affects only the booking, not the user.
     """
+    await db.run_sync(_delete_booking, booking_id)
+    return {"message": "Booking deleted (cancelled) successfully"}
+
+
+def _delete_booking(db: Session, booking_id: int):
 
     booking = db.query(Booking).filter(Booking.bookingId == booking_id).first()
 
@@ -231,7 +357,13 @@ def delete_booking(booking_id: int, db: Session = Depends(get_db)):
             detail="Booking not found",
         )
 
+    # Return the booking's tickets to the slot in the same transaction
+    count = booking_ticket_count(booking)
+    if count:
+        release_slot_tickets(db, booking.slotId, count)
+
+    # Signed tickets verify offline: gate devices must learn they are revoked
+    revoke_booking(db, booking_id, "booking cancelled")
+
     db.delete(booking)
     db.commit()
-
-    return {"message": "Booking deleted (cancelled) successfully"}
@@ -0,0 +1,434 @@
+# api/bookings/hot_slots.py
+"""
+Hot-slot mode: sharded in-memory ticket counters for today's slots.
+
+With HOT_SLOT_MODE on, every slot dated today gets a HotSlotCounter split into
+HOT_SLOT_SHARDS shards. Tickets are *leased* out of slots.remaining in chunks
+of HOT_SLOT_LEASE (a conditional UPDATE + a slot_leases row, committed on its
+own), then sold from the shards without touching the slots row. Bookings only
+pay for their own INSERT; the slot row is written once per lease instead of
+once per booking.
+
+Bookkeeping
+-----------
+* slots.remaining       tickets not leased to any process
+* slot_leases.tokens    tickets leased and not yet checkpointed as sold
+* counter shards        tickets leased and still unsold (memory only)
+
+A reservation is confirmed when the booking transaction commits; if it rolls
+back or the session closes without committing, the tickets go back to a shard.
+The reconciliation job (every HOT_SLOT_RECONCILE_SECONDS) checkpoints sold
+tickets into slot_leases, retires counters for slots that are no longer
+today's (returning their unsold tickets to slots.remaining) and leases for new
+ones. Shutdown retires every counter.
+
+Crash recovery
+--------------
+If the process dies, its unsold leased tickets exist only in slot_leases.
+On the next start, for each lease row:
+
+    remaining = max(remaining, min(remaining + lease.tokens,
+                                   onlineTickets - tickets held by online bookings))
+
+then the row is deleted. Leased tickets are never sold twice: a crash can
+only under-sell until recovery, and recovery is capped by real bookings.
+
+The counters live in one process, so hot-slot mode assumes a single worker
+process per database.
+
+With DB_ASYNC, try_reserve runs on the event loop thread (inside run_sync),
+where a lease, a blocking transaction on the sync engine, would stall every
+request. There an empty counter queues the lease for the reconciler thread
+and the booking takes the row-lock path meanwhile.
+"""
+import asyncio
+import itertools
+import os
+import queue
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.booking.slot_model import Slot
+from database.models.booking.slot_lease_model import SlotLease
+
+HOT_SLOT_MODE = os.getenv("HOT_SLOT_MODE", "false").lower() in ("1", "true", "yes")
+HOT_SLOT_SHARDS = int(os.getenv("HOT_SLOT_SHARDS", "8"))
+HOT_SLOT_LEASE = int(os.getenv("HOT_SLOT_LEASE", "64"))
+HOT_SLOT_RECONCILE_SECONDS = float(os.getenv("HOT_SLOT_RECONCILE_SECONDS", "5"))
+
+_PENDING = "hot_slot_pending"   # key in Session.info: [(counter, count), ...]
+
+
+# ---------------------------------------------------------
+# Counter
+# ---------------------------------------------------------
+class _Shard:
+    __slots__ = ("lock", "tokens")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = 0
+
+
+class HotSlotCounter:
+    def __init__(self, slot_id: int, temple_id: int, shards: int):
+        self.slot_id = slot_id
+        self.temple_id = temple_id
+        self.shards = [_Shard() for _ in range(max(1, shards))]
+        # Spreads callers over the shards (not by thread: with DB_ASYNC every
+        # request runs on the event loop thread)
+        self._next_shard = itertools.count()
+        self.refill_lock = threading.Lock()
+        self.refill_queued = False
+        self._sold_lock = threading.Lock()
+        self._sold = 0           # confirmed since the last checkpoint
+        self.retired = False
+
+    def take(self, count: int) -> bool:
+        n = len(self.shards)
+        start = next(self._next_shard) % n
+
+        # Fast path: one shard covers the whole request
+        for i in range(n):
+            shard = self.shards[(start + i) % n]
+            if shard.tokens < count:
+                continue
+            with shard.lock:
+                if shard.tokens >= count:
+                    shard.tokens -= count
+                    return True
+
+        # Group bookings may need tokens from several shards
+        taken = []
+        needed = count
+        for i in range(n):
+            shard = self.shards[(start + i) % n]
+            with shard.lock:
+                got = min(shard.tokens, needed)
+                shard.tokens -= got
+            if got:
+                taken.append((shard, got))
+                needed -= got
+            if not needed:
+                return True
+        for shard, got in taken:
+            with shard.lock:
+                shard.tokens += got
+        return False
+
+    def put(self, count: int) -> None:
+        shard = self.shards[next(self._next_shard) % len(self.shards)]
+        with shard.lock:
+            shard.tokens += count
+
+    def fill(self, tokens: int) -> None:
+        base, extra = divmod(tokens, len(self.shards))
+        for i, shard in enumerate(self.shards):
+            with shard.lock:
+                shard.tokens += base + (1 if i < extra else 0)
+
+    def drain(self) -> int:
+        total = 0
+        for shard in self.shards:
+            with shard.lock:
+                total += shard.tokens
+                shard.tokens = 0
+        return total
+
+    def available(self) -> int:
+        return sum(shard.tokens for shard in self.shards)
+
+    def add_sold(self, count: int) -> None:
+        with self._sold_lock:
+            self._sold += count
+
+    def take_sold(self) -> int:
+        with self._sold_lock:
+            sold, self._sold = self._sold, 0
+        return sold
+
+
+_counters: Dict[int, HotSlotCounter] = {}
+_registry_lock = threading.Lock()
+_stop = threading.Event()
+_wake = threading.Event()
+_jobs: "queue.SimpleQueue" = queue.SimpleQueue()   # (fn, args) run by the reconciler thread
+_thread: Optional[threading.Thread] = None
+
+
+def is_active() -> bool:
+    return _thread is not None
+
+
+def unsold(slot_id: int) -> int:
+    """Tickets leased into the slot's counter and not sold yet (0 if not hot)."""
+    counter = _counters.get(slot_id)
+    return counter.available() if counter is not None else 0
+
+
+def _on_event_loop() -> bool:
+    """True on the event loop thread (an async route's run_sync): no blocking I/O here."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _defer(fn, *args) -> None:
+    """Run fn(*args) on the reconciler thread."""
+    _jobs.put((fn, args))
+    _wake.set()
+
+
+# ---------------------------------------------------------
+# Hot path
+# ---------------------------------------------------------
+def try_reserve(db: Session, slot_id: int, temple_id: int, count: int) -> bool:
+    """
+    Take `count` tickets from the slot's in-memory counter. Returns False when
+    the slot is not hot (or the lease is exhausted) so the caller can fall back
+    to the row-lock path. Confirmation happens when `db` commits.
+    """
+    counter = _counters.get(slot_id)
+    if counter is None or counter.temple_id != temple_id:
+        return False
+
+    if not counter.take(count):
+        if _on_event_loop():
+            if not counter.refill_queued:
+                counter.refill_queued = True
+                _defer(_refill, counter, count)
+            return False
+        with counter.refill_lock:
+            if not counter.take(count):
+                if not _lease(counter, max(HOT_SLOT_LEASE, count)) or not counter.take(count):
+                    return False
+
+    db.info.setdefault(_PENDING, []).append((counter, count))
+    return True
+
+
+def _after_commit(session: Session) -> None:
+    for counter, count in session.info.pop(_PENDING, ()):
+        counter.add_sold(count)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    # Anything still pending was never committed: give the tickets back
+    for counter, count in session.info.pop(_PENDING, ()):
+        if counter.retired and _on_event_loop() and is_active():
+            _defer(_return_to_slot, counter.slot_id, count)
+        elif counter.retired:
+            _return_to_slot(counter.slot_id, count)
+        else:
+            counter.put(count)
+
+
+# ---------------------------------------------------------
+# Leasing (each in its own short transaction)
+# ---------------------------------------------------------
+def _lease(counter: HotSlotCounter, wanted: int) -> int:
+    """Move up to `wanted` tickets from slots.remaining into the counter."""
+    if counter.retired:
+        return 0
+    db = SessionLocal()
+    try:
+        for _ in range(3):
+            remaining = db.query(Slot.remaining).filter(Slot.slotId == counter.slot_id).scalar()
+            if not remaining or remaining <= 0:
+                return 0
+            k = min(wanted, remaining)
+            row = db.execute(
+                update(Slot)
+                .where(Slot.slotId == counter.slot_id, Slot.remaining >= k)
+                .values(remaining=Slot.remaining - k)
+                .returning(Slot.remaining)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                db.rollback()   # remaining moved under us; re-read and retry
+                continue
+
+            updated = db.execute(
+                update(SlotLease)
+                .where(SlotLease.slotId == counter.slot_id)
+                .values(tokens=SlotLease.tokens + k)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not updated:
+                db.add(SlotLease(slotId=counter.slot_id, tokens=k))
+            db.commit()
+
+            counter.fill(k)
+            return k
+        return 0
+    finally:
+        db.close()
+
+
+def _refill(counter: HotSlotCounter, wanted: int) -> None:
+    """Lease for a counter that ran dry on the event loop (see try_reserve)."""
+    counter.refill_queued = False
+    with counter.refill_lock:
+        if counter.available() < wanted:
+            _lease(counter, max(HOT_SLOT_LEASE, wanted))
+
+
+def _return_to_slot(slot_id: int, count: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Slot)
+            .where(Slot.slotId == slot_id)
+            .values(remaining=Slot.remaining + count)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _retire(db: Session, counter: HotSlotCounter) -> None:
+    """Stop serving a slot from memory and hand its unsold tickets back."""
+    counter.retired = True
+    with _registry_lock:
+        _counters.pop(counter.slot_id, None)
+
+    unsold = counter.drain()
+    counter.take_sold()
+    if unsold:
+        db.execute(
+            update(Slot)
+            .where(Slot.slotId == counter.slot_id)
+            .values(remaining=Slot.remaining + unsold)
+            .execution_options(synchronize_session=False)
+        )
+    db.query(SlotLease).filter(SlotLease.slotId == counter.slot_id).delete(synchronize_session=False)
+    db.commit()
+
+
+# ---------------------------------------------------------
+# Reconciliation job
+# ---------------------------------------------------------
+def reconcile() -> None:
+    """Checkpoint sold tickets, retire stale counters, warm today's slots."""
+    db = SessionLocal()
+    try:
+        for counter in list(_counters.values()):
+            sold = counter.take_sold()
+            if sold:
+                db.execute(
+                    update(SlotLease)
+                    .where(SlotLease.slotId == counter.slot_id)
+                    .values(tokens=SlotLease.tokens - sold)
+                    .execution_options(synchronize_session=False)
+                )
+        db.commit()
+
+        todays = dict(db.query(Slot.slotId, Slot.templeId).filter(Slot.date == date.today()).all())
+
+        for slot_id, counter in list(_counters.items()):
+            if todays.get(slot_id) != counter.temple_id:
+                _retire(db, counter)
+
+        for slot_id, temple_id in todays.items():
+            if slot_id in _counters:
+                continue
+            counter = HotSlotCounter(slot_id, temple_id, HOT_SLOT_SHARDS)
+            with _registry_lock:
+                _counters[slot_id] = counter
+            _lease(counter, HOT_SLOT_LEASE)
+    finally:
+        db.close()
+
+
+def recover() -> None:
+    """Return tickets leased by a process that died (see module docstring)."""
+    db = SessionLocal()
+    try:
+        for lease in db.query(SlotLease).all():
+            slot = db.query(Slot).filter(Slot.slotId == lease.slotId).first()
+            if slot and lease.tokens > 0 and slot.remaining is not None:
+                held = (
+                    db.query(func.coalesce(func.sum(func.coalesce(Booking.numberOfParticipants, 1)), 0))
+                    .filter(Booking.slotId == slot.slotId, Booking.bookingType != "OFFLINE")
+                    .scalar()
+                )
+                ceiling = max(0, (slot.onlineTickets or 0) - held)
+                slot.remaining = max(slot.remaining, min(slot.remaining + lease.tokens, ceiling))
+                print(f"Hot-slot recovery: slot {slot.slotId} remaining -> {slot.remaining}")
+            db.delete(lease)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run_jobs() -> None:
+    while True:
+        try:
+            fn, args = _jobs.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            fn(*args)
+        except Exception as e:
+            print("❌ Hot-slot job failed:", e)
+
+
+def _run() -> None:
+    next_reconcile = time.monotonic() + HOT_SLOT_RECONCILE_SECONDS
+    while not _stop.is_set():
+        _wake.wait(max(0.0, next_reconcile - time.monotonic()))
+        _wake.clear()
+        _run_jobs()
+        if _stop.is_set() or time.monotonic() < next_reconcile:
+            continue
+        next_reconcile = time.monotonic() + HOT_SLOT_RECONCILE_SECONDS
+        try:
+            reconcile()
+        except Exception as e:
+            print("❌ Hot-slot reconcile failed:", e)
+
+
+def start() -> None:
+    global _thread
+    if _thread is not None:
+        return
+    recover()
+    event.listen(SessionLocal, "after_commit", _after_commit)
+    event.listen(SessionLocal, "after_transaction_end", _after_transaction_end)
+    reconcile()
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="hot-slot-reconciler", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _wake.set()
+    _thread.join()
+    _thread = None
+    _run_jobs()
+
+    db = SessionLocal()
+    try:
+        for counter in list(_counters.values()):
+            _retire(db, counter)
+    finally:
+        db.close()
+    event.remove(SessionLocal, "after_commit", _after_commit)
+    event.remove(SessionLocal, "after_transaction_end", _after_transaction_end)
@@ -1,36 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database.get_db import get_db
+from database.get_db import get_async_db
 from database.models.booking.booking_model import Booking
 from database.models.temple.temple_model import Temple
 from database.schemas.booking.kiosk import KioskBookingCreate
 from database.schemas.booking.booking_schema import BookingResponse
 from database.dependencies import get_current_user
 from database.models.admin.admin_model import Admin
+from api.notifications.sms_outbox import enqueue_sms, wake as wake_sms_dispatcher
 from datetime import date
 
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
-
 router = APIRouter(
     prefix="/bookings/kiosk",
     tags=["Kiosk Bookings"],
 )
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_kiosk_booking(
+async def create_kiosk_booking(
     payload: KioskBookingCreate, 
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
     # 1. Verify Admin Access
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can perform kiosk bookings")
-    
-    admin = db.query(Admin).filter(Admin.adminId == current_user["id"]).first()
+
+    new_booking = await db.run_sync(_create_kiosk_booking, payload, current_user["id"])
+
+    # Delivered by the background dispatcher, off the request path
+    wake_sms_dispatcher()
+
+    return new_booking
+
+
+def _create_kiosk_booking(db: Session, payload: KioskBookingCreate, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     
@@ -63,8 +67,7 @@ def create_kiosk_booking(
     )
 
     db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+    db.flush()   # assigns bookingId for the SMS text
 
     sms_message = (
         f"Your Dharma kiosk booking is confirmed!\n"
@@ -77,24 +80,11 @@ def create_kiosk_booking(
     )
 
     # ------------------------------------------
-    # ⭐ CALL TWILIO SERVICE THROUGH NGROK
+    # ⭐ QUEUE SMS (outbox row, same transaction as booking)
     # ------------------------------------------
-    try:
-        sms_payload = {
-            "mobile": payload.mobileNumber,
-            "message": sms_message
-        }
-        url = os.getenv("URL")
-        print(url)
-        sms_response = requests.post(url, json=sms_payload)
-        sms_response_json = sms_response.json()
+    enqueue_sms(db, payload.mobileNumber, sms_message)
 
-        status_text = sms_response_json.get("status", "unknown")
-        # print("Kiosk SMS Payload:", sms_payload)
-        print("Kiosk SMS Response:", sms_response_json)
-        print("Kiosk SMS Status:", status_text)
-
-    except Exception as e:
-        print("Kiosk SMS FAILED:", str(e))
+    db.commit()
+    db.refresh(new_booking)
 
-    return new_booking
\ No newline at end of file
+    return new_booking
@@ -0,0 +1,247 @@
+# api/bookings/slot_availability.py
+"""
+Availability snapshots for devotee apps (GET /slots/availability).
+
+One snapshot per (temple, date): the day's slots as compact JSON
+
+    {"templeId": 1, "date": "2026-03-01", "slots": [
+        {"slotId": 7, "startTime": "06:00:00", "endTime": "06:30:00",
+         "onlineTickets": 400, "remaining": 123}, ...]}
+
+built with one indexed query, serialised once and kept in process memory
+with a strong ETag (hash of the body). A hit is answered on the event loop
+(no worker thread, no session); polling clients send If-None-Match and get
+a 304 without the database being touched.
+
+* invalidation: a commit that inserts, updates or deletes a Booking or a
+  Slot drops every snapshot of that temple (SessionLocal events, as in
+  ticket_verify); core inserts that bypass the ORM call mark_changed()
+* TTL: snapshots expire after SLOT_AVAILABILITY_TTL_SECONDS, which bounds
+  how stale another worker process can be
+* bounded: at most SLOT_AVAILABILITY_CACHE_SIZE snapshots, LRU
+* single flight: concurrent misses for one key build it once; a build
+  that raced with an invalidation is served but not cached
+
+In hot-slot mode the tickets leased into the in-memory counters are still
+available, so remaining includes them (hot_slots.unsold).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from api.bookings import hot_slots
+from api.monitoring import metrics
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.booking.slot_model import Slot
+
+SLOT_AVAILABILITY_TTL_SECONDS = float(os.getenv("SLOT_AVAILABILITY_TTL_SECONDS", "5"))
+SLOT_AVAILABILITY_CACHE_SIZE = int(os.getenv("SLOT_AVAILABILITY_CACHE_SIZE", "5000"))
+
+LOOKUPS = metrics.counter("dharma_slot_availability_lookups_total", "Availability snapshot cache lookups", ["result"])
+NOT_MODIFIED = metrics.counter("dharma_slot_availability_not_modified_total", "Availability requests answered 304")
+INVALIDATIONS = metrics.counter("dharma_slot_availability_invalidations_total", "Temples whose snapshots were dropped")
+ENTRIES = metrics.gauge("dharma_slot_availability_cache_entries", "Availability snapshots held in memory")
+
+_CHANGED = "slot_availability_changed"   # key in Session.info: set of temple ids
+
+Key = Tuple[int, date]
+
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str           # quoted, ready for the ETag header
+    expires: float
+
+
+# ---------------------------------------------------------
+# Cache
+# ---------------------------------------------------------
+class AvailabilityCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Key, Snapshot]" = OrderedDict()
+        self._generations: Dict[int, int] = {}     # temple id -> bumped on every invalidation
+        self._building: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _fresh(self, key: Key) -> Optional[Snapshot]:
+        snapshot = self._entries.get(key)
+        if snapshot is None:
+            return None
+        if snapshot.expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return snapshot
+
+    def peek(self, temple_id: int, day: date) -> Optional[Snapshot]:
+        """Fresh snapshot if cached (counted as a hit), else None; never queries."""
+        with self._lock:
+            snapshot = self._fresh((temple_id, day))
+        if snapshot is not None:
+            LOOKUPS.inc(result="hit")
+        return snapshot
+
+    def get(self, db: Session, temple_id: int, day: date) -> Snapshot:
+        key = (temple_id, day)
+        with self._lock:
+            snapshot = self._fresh(key)
+            if snapshot is not None:
+                LOOKUPS.inc(result="hit")
+                return snapshot
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            with self._lock:
+                snapshot = self._fresh(key)     # built while we waited
+                if snapshot is not None:
+                    LOOKUPS.inc(result="hit")
+                    return snapshot
+                generation = self._generations.get(temple_id, 0)
+
+            LOOKUPS.inc(result="miss")
+            try:
+                snapshot = build(db, temple_id, day, self.ttl)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+            with self._lock:
+                if self._generations.get(temple_id, 0) == generation:
+                    self._entries[key] = snapshot
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                ENTRIES.set(len(self._entries))
+            return snapshot
+
+    def invalidate(self, temple_ids) -> None:
+        with self._lock:
+            for temple_id in temple_ids:
+                self._generations[temple_id] = self._generations.get(temple_id, 0) + 1
+                INVALIDATIONS.inc()
+            for key in [key for key in self._entries if key[0] in temple_ids]:
+                del self._entries[key]
+            ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            ENTRIES.set(0)
+
+
+cache = AvailabilityCache(SLOT_AVAILABILITY_CACHE_SIZE, SLOT_AVAILABILITY_TTL_SECONDS)
+
+
+def build(db: Session, temple_id: int, day: date, ttl: float = SLOT_AVAILABILITY_TTL_SECONDS) -> Snapshot:
+    rows = db.execute(
+        select(Slot.slotId, Slot.startTime, Slot.endTime, Slot.onlineTickets, Slot.remaining)
+        .where(Slot.templeId == temple_id, Slot.date == day)
+        .order_by(Slot.startTime)
+    ).all()
+    slots = [
+        {
+            "slotId": slot_id,
+            "startTime": start.isoformat() if start else None,
+            "endTime": end.isoformat() if end else None,
+            "onlineTickets": online,
+            "remaining": (remaining or 0) + hot_slots.unsold(slot_id),
+        }
+        for slot_id, start, end, online, remaining in rows
+    ]
+    body = json.dumps(
+        {"templeId": temple_id, "date": day.isoformat(), "slots": slots}, separators=(",", ":")
+    ).encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    return Snapshot(body, etag, time.monotonic() + ttl)
+
+
+def cached(temple_id: int, day: date) -> Optional[Snapshot]:
+    """Snapshot without touching the database, or None (a miss, or the cache is not running)."""
+    return cache.peek(temple_id, day) if _started else None
+
+
+def snapshot(temple_id: int, day: date) -> Snapshot:
+    """Cached snapshot, built on a miss in its own session (blocking: run it in a worker thread)."""
+    db = SessionLocal()
+    try:
+        if _started:
+            return cache.get(db, temple_id, day)
+        return build(db, temple_id, day)
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------
+# Invalidation (SessionLocal events)
+# ---------------------------------------------------------
+def mark_changed(session: Session, temple_id: int) -> None:
+    """Drop the temple's snapshots when `session` commits (for writes the ORM does not see)."""
+    session.info.setdefault(_CHANGED, set()).add(temple_id)
+
+
+def _temple_ids(obj) -> set:
+    # old and new templeId of a moved booking / slot
+    history = inspect(obj).attrs.templeId.history
+    return {t for t in (*history.added, *history.unchanged, *history.deleted, obj.templeId) if t is not None}
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    changed = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Booking, Slot)):
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED, set())
+            changed |= _temple_ids(obj)
+
+
+def _after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED, None)
+    if changed:
+        cache.invalidate(changed)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHANGED, None)
+
+
+# ---------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------
+_started = False
+
+
+def start() -> None:
+    global _started
+    if _started:
+        return
+    event.listen(SessionLocal, "after_flush", _after_flush)
+    event.listen(SessionLocal, "after_commit", _after_commit)
+    event.listen(SessionLocal, "after_transaction_end", _after_transaction_end)
+    _started = True
+
+
+def stop() -> None:
+    global _started
+    if not _started:
+        return
+    event.remove(SessionLocal, "after_flush", _after_flush)
+    event.remove(SessionLocal, "after_commit", _after_commit)
+    event.remove(SessionLocal, "after_transaction_end", _after_transaction_end)
+    _started = False
+    cache.clear()
@@ -0,0 +1,82 @@
+# api/bookings/slot_inventory.py
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from database.models.booking.slot_model import Slot
+from api.bookings import hot_slots
+
+
+# ---------------------------------------------------------
+# Reserve tickets (hot path of create_booking)
+# ---------------------------------------------------------
+def reserve_slot_tickets(db: Session, slot_id: int, temple_id: int, count: int = 1) -> Optional[int]:
+    """
+    Take `count` online tickets from a slot inside the caller's transaction.
+
+    Uses one conditional UPDATE ... WHERE remaining >= count RETURNING remaining.
+    The row lock it takes is held until the caller commits (or rolls back) the
+    booking insert, so concurrent requests can never oversell the slot.
+    Returns the new remaining count, or None when the tickets came from the
+    in-memory hot-slot counters (see hot_slots.py).
+    """
+    if hot_slots.is_active() and hot_slots.try_reserve(db, slot_id, temple_id, count):
+        return None
+
+    row = db.execute(
+        update(Slot)
+        .where(
+            Slot.slotId == slot_id,
+            Slot.templeId == temple_id,
+            Slot.remaining >= count,
+        )
+        .values(remaining=Slot.remaining - count)
+        .returning(Slot.remaining)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    if row is not None:
+        return row.remaining
+
+    # Slow path: work out *why* nothing was updated
+    slot = db.query(Slot).filter(Slot.slotId == slot_id).first()
+    if not slot:
+        raise HTTPException(404, "Slot not found for given slotId")
+    if slot.templeId != temple_id:
+        raise HTTPException(400, "Slot does not belong to the given temple")
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Not enough tickets remaining for this slot",
+    )
+
+
+# ---------------------------------------------------------
+# Release tickets (booking cancelled / moved)
+# ---------------------------------------------------------
+def release_slot_tickets(db: Session, slot_id: int, count: int = 1) -> None:
+    """
+    Give `count` tickets back to a slot inside the caller's transaction.
+    Never raises remaining above the slot's online ticket pool.
+    """
+    restored = Slot.remaining + count
+    db.execute(
+        update(Slot)
+        .where(Slot.slotId == slot_id)
+        .values(
+            remaining=case(
+                (restored > Slot.onlineTickets, Slot.onlineTickets),
+                else_=restored,
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def booking_ticket_count(booking) -> int:
+    """Number of online tickets a booking holds (0 for kiosk/offline bookings)."""
+    if booking.slotId is None or booking.bookingType == "OFFLINE":
+        return 0
+    return booking.numberOfParticipants or 1
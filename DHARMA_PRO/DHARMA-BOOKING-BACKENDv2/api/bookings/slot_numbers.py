@@ -0,0 +1,63 @@
+# api/bookings/slot_numbers.py
+"""
+Per-temple slotNumber allocation.
+
+slot_counters holds the last number handed out for each temple. Taking
+numbers is one statement:
+
+    UPDATE slot_counters SET "lastSlotNumber" = "lastSlotNumber" + :count
+    WHERE "templeId" = :temple RETURNING "lastSlotNumber"
+
+run inside the transaction that inserts the slots. The row lock it takes
+is held until that transaction ends, so concurrent creates for a temple
+queue on it and get distinct, gap-free numbers (a rollback gives them back).
+Other temples are not blocked.
+
+A temple's first allocation creates its row, seeded from max(slotNumber)
+(INSERT ... ON CONFLICT DO NOTHING, so two first creates do not collide).
+"""
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database.models.booking.slot_counter_model import SlotCounter
+from database.models.booking.slot_model import Slot
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _bump(db: Session, temple_id: int, count: int):
+    stmt = (
+        update(SlotCounter)
+        .where(SlotCounter.templeId == temple_id)
+        .values(lastSlotNumber=SlotCounter.lastSlotNumber + count)
+        .returning(SlotCounter.lastSlotNumber)
+    )
+    return db.execute(stmt).scalar()
+
+
+def _create_counter(db: Session, temple_id: int) -> None:
+    seed = db.execute(select(func.max(Slot.slotNumber)).where(Slot.templeId == temple_id)).scalar() or 0
+    insert = _INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        try:
+            with db.begin_nested():
+                db.add(SlotCounter(templeId=temple_id, lastSlotNumber=seed))
+        except IntegrityError:
+            pass    # created concurrently
+        return
+    db.execute(
+        insert(SlotCounter)
+        .values(templeId=temple_id, lastSlotNumber=seed)
+        .on_conflict_do_nothing(index_elements=["templeId"])
+    )
+
+
+def allocate(db: Session, temple_id: int, count: int = 1) -> int:
+    """Reserve `count` consecutive slot numbers for the temple; returns the first."""
+    last = _bump(db, temple_id, count)
+    if last is None:
+        _create_counter(db, temple_id)
+        last = _bump(db, temple_id, count)
+    return last - count + 1
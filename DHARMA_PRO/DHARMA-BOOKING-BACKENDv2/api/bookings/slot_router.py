@@ -2,27 +2,71 @@
 from datetime import date as date_type
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from database.dependencies import get_current_user
-from database.get_db import get_db
-from database.models.booking.slot_model import Slot
+from database.get_db import get_async_db
+from database.models.booking.slot_model import SLOT_OVERLAP_CONSTRAINT, Slot
 from database.models.temple.temple_model import Temple
-from database.schemas.booking.slot_schema import SlotCreate, SlotUpdate, SlotResponse
+from database.schemas.booking.slot_schema import SlotBulkCreate, SlotBulkResponse, SlotCreate, SlotUpdate, SlotResponse
 from database.models.admin.admin_model import Admin
+from api.bookings import slot_availability, slot_numbers, slot_schedule, slot_stream
 
 router = APIRouter(prefix="/slots", tags=["Slots"])
 
+OVERLAP_DETAIL = "Another slot overlaps with this time range"
+
+
+def _check_overlap(db: Session, slot, exclude_id: Optional[int] = None):
+    """
+    PostgreSQL enforces this with the ex_slots_temple_time exclusion
+    constraint at commit (race-free, one GiST probe). Other databases have
+    no such constraint, so check with a SELECT first.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return
+
+    query = db.query(Slot.slotId).filter(
+        Slot.templeId == slot.templeId,
+        Slot.date == slot.date,
+        Slot.startTime < slot.endTime,
+        Slot.endTime > slot.startTime,
+    )
+    if exclude_id is not None:
+        query = query.filter(Slot.slotId != exclude_id)
+
+    if query.first():
+        raise HTTPException(status_code=400, detail=OVERLAP_DETAIL)
+
+
+def _commit(db: Session):
+    """Commit, turning an exclusion-constraint violation into a 400"""
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if SLOT_OVERLAP_CONSTRAINT in str(e.orig):
+            raise HTTPException(status_code=400, detail=OVERLAP_DETAIL)
+        raise
+
+
 @router.post("/", response_model=SlotResponse, status_code=status.HTTP_201_CREATED)
-def create_slot(
+async def create_slot(
     payload: SlotCreate, 
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     user=Depends(get_current_user)
 ):
     if user["role"] != "admin":
         raise HTTPException(403, "Not authorized")
 
-    admin = db.query(Admin).filter(Admin.adminId == user["id"]).first()
+    return await db.run_sync(_create_slot, payload, user["id"])
+
+
+def _create_slot(db: Session, payload: SlotCreate, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
 
     if not admin:
         raise HTTPException(404, "Admin not found")
@@ -38,19 +82,7 @@ def create_slot(
         raise HTTPException(status_code=400, detail="endTime must be after startTime")
 
     # CHECK FOR OVERLAPPING SLOTS (same temple + same date)
-    overlap = (
-        db.query(Slot)
-        .filter(
-            Slot.templeId == payload.templeId,
-            Slot.date == payload.date,
-            Slot.startTime < payload.endTime,
-            Slot.endTime > payload.startTime,
-        )
-        .first()
-    )
-
-    if overlap:
-        raise HTTPException(status_code=400, detail="Another slot overlaps with this time range")
+    _check_overlap(db, payload)
 
     # Map schema -> model field names (model uses totalTickets/reservedOfflineTickets/onlineTickets/remainingTickets)
     capacity = payload.capacity
@@ -69,11 +101,8 @@ def create_slot(
     if capacity <= 0 or remaining < 0:
         raise HTTPException(status_code=400, detail="capacity and remaining must be positive")
 
-    # Auto slotNumber (increment based on existing slots for temple)
-    last_slot = (
-        db.query(Slot).filter(Slot.templeId == payload.templeId).order_by(Slot.slotNumber.desc()).first()
-    )
-    slotNumber = (last_slot.slotNumber + 1) if last_slot else 1
+    # Auto slotNumber (per-temple counter, see slot_numbers)
+    slotNumber = slot_numbers.allocate(db, payload.templeId)
 
     new_slot = Slot(
         templeId=payload.templeId,
@@ -88,13 +117,49 @@ def create_slot(
     )
 
     db.add(new_slot)
-    db.commit()
+    _commit(db)
     db.refresh(new_slot)
 
     return new_slot
 
+
+@router.post("/bulk", response_model=SlotBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_slots_bulk(
+    payload: SlotBulkCreate,
+    db=Depends(get_async_db),
+    user=Depends(get_current_user)
+):
+    """Generate a recurring schedule in one transaction (see slot_schedule)"""
+    if user["role"] != "admin":
+        raise HTTPException(403, "Not authorized")
+
+    return await db.run_sync(_create_slots_bulk, payload, user["id"])
+
+
+def _create_slots_bulk(db: Session, payload: SlotBulkCreate, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
+
+    if not admin:
+        raise HTTPException(404, "Admin not found")
+
+    temple = db.query(Temple).filter(Temple.templeId == payload.templeId).first()
+    if not temple:
+        raise HTTPException(status_code=404, detail="Temple not found")
+
+    try:
+        result = slot_schedule.create_bulk(db, payload)
+    except slot_schedule.ScheduleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    _commit(db)
+    return result
+
 @router.get("/", response_model=List[SlotResponse])
-def get_all_slots(templeId: Optional[int] = None, date: Optional[date_type] = None, db: Session = Depends(get_db)):
+async def get_all_slots(templeId: Optional[int] = None, date: Optional[date_type] = None, db=Depends(get_async_db)):
+    return await db.run_sync(_slots, templeId, date)
+
+
+def _slots(db: Session, templeId: Optional[int], date: Optional[date_type]):
     query = db.query(Slot)
 
     if templeId is not None:
@@ -108,25 +173,82 @@ def get_all_slots(templeId: Optional[int] = None, date: Optional[date_type] = No
     return query.all()
 
 
+# Public and polled: always revalidate, a 304 via ETag costs no query
+AVAILABILITY_CACHE_CONTROL = "public, no-cache"
+
+
+@router.get("/availability")
+async def get_availability(
+    templeId: int,
+    date: date_type,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Compact remaining-tickets snapshot of a temple's day (see slot_availability)"""
+    snapshot = slot_availability.cached(templeId, date)
+    if snapshot is None:
+        # same worker pool (and limit) as the sync endpoints
+        snapshot = await run_in_threadpool(slot_availability.snapshot, templeId, date)
+    headers = {"ETag": snapshot.etag, "Cache-Control": AVAILABILITY_CACHE_CONTROL}
+
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if snapshot.etag in tags or if_none_match.strip() == "*":
+            slot_availability.NOT_MODIFIED.inc()
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/stream")
+async def stream_slots(templeId: int, date: Optional[date_type] = None):
+    """Server-sent slot events for a temple (optionally one date) as bookings and edits commit (see slot_stream)"""
+    try:
+        subscriber = slot_stream.hub.subscribe(templeId, date)
+    except slot_stream.TooManySubscribers:
+        raise HTTPException(503, "Too many live connections, poll /slots/availability instead")
+
+    async def events():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                chunk = await subscriber.next()
+                if chunk is None:
+                    return
+                if chunk:
+                    yield chunk
+        finally:
+            slot_stream.hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{slot_id}", response_model=SlotResponse)
-def get_slot_by_id(slot_id: int, db: Session = Depends(get_db)):
-    slot = db.query(Slot).filter(Slot.slotId == slot_id).first()  # CHANGED
+async def get_slot_by_id(slot_id: int, db=Depends(get_async_db)):
+    slot = await db.run_sync(lambda db: db.query(Slot).filter(Slot.slotId == slot_id).first())
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
     return slot
 
 
 @router.put("/{slot_id}", response_model=SlotResponse)
-def update_slot(
+async def update_slot(
     slot_id: int, payload: SlotUpdate, 
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     user=Depends(get_current_user)
 ):
 
     if user["role"] != "admin":
         raise HTTPException(403, "Not authorized")
 
-    admin = db.query(Admin).filter(Admin.adminId == user["id"]).first()
+    return await db.run_sync(_update_slot, slot_id, payload, user["id"])
+
+
+def _update_slot(db: Session, slot_id: int, payload: SlotUpdate, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
 
     if not admin:
         raise HTTPException(404, "Admin not found")
@@ -186,18 +308,25 @@ def update_slot(
     if slot.remaining > slot.capacity:
         raise HTTPException(status_code=400, detail="remaining cannot be greater than capacity")
 
-    db.commit()
+    _check_overlap(db, slot, exclude_id=slot.slotId)
+
+    _commit(db)
     db.refresh(slot)
     return slot
 
 
 @router.delete("/{slot_id}", status_code=status.HTTP_200_OK)
-def delete_slot(slot_id: int, db: Session = Depends(get_db), 
+async def delete_slot(slot_id: int, db=Depends(get_async_db), 
     user=Depends(get_current_user)):
     if user["role"] != "admin":
         raise HTTPException(403, "Not authorized")
 
-    admin = db.query(Admin).filter(Admin.adminId == user["id"]).first()
+    await db.run_sync(_delete_slot, slot_id, user["id"])
+    return {"message": "Slot deleted successfully"}
+
+
+def _delete_slot(db: Session, slot_id: int, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
 
     if not admin:
         raise HTTPException(404, "Admin not found")
@@ -208,4 +337,3 @@ def delete_slot(slot_id: int, db: Session = Depends(get_db),
 
     db.delete(slot)
     db.commit()
-    return {"message": "Slot deleted successfully"}
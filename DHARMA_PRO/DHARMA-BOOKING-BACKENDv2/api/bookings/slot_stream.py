@@ -0,0 +1,305 @@
+# api/bookings/slot_stream.py
+"""
+Live slot availability over server-sent events (GET /slots/stream).
+
+Subscribers (dashboards, kiosks) follow one temple, optionally one date,
+and receive an event whenever a commit changes one of its slots:
+
+    event: slot
+    data: {"slotId": 7, "templeId": 1, "date": "2026-03-01", "startTime": "06:00:00",
+           "endTime": "06:30:00", "capacity": 500, "onlineTickets": 400, "remaining": 123}
+
+    event: slot
+    data: {"slotId": 7, "templeId": 1, "deleted": true}
+
+Flow
+----
+* SessionLocal events note the slots touched by a flush (Booking / Slot
+  inserts, updates, deletes) -- only for temples someone is watching, so an
+  unwatched commit costs a dict lookup.
+* after_commit hands the slot ids to the publisher task on the event loop
+  (call_soon_threadsafe). The publisher drains everything queued, reads the
+  slots in one query (worker thread), encodes each event once and offers
+  the same bytes to every matching subscriber.
+* Backpressure: a subscriber's mailbox holds the latest event per slot.
+  A connection that reads slowly (or not at all) gets its older updates
+  replaced, never queued without bound, and never slows the publisher or
+  the other connections.
+* Idle connections get a comment line every SLOT_STREAM_HEARTBEAT_SECONDS
+  (keeps proxies from closing them), from one shared timer; at most
+  SLOT_STREAM_MAX_SUBSCRIBERS connections per process.
+
+Events carry the slot's full state, so a client that missed some (e.g.
+reconnecting) loses nothing after it reloads GET /slots/availability.
+"""
+import asyncio
+import json
+import os
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from api.bookings import hot_slots
+from api.monitoring import metrics
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.booking.slot_model import Slot
+
+SLOT_STREAM_MAX_SUBSCRIBERS = int(os.getenv("SLOT_STREAM_MAX_SUBSCRIBERS", "10000"))
+SLOT_STREAM_HEARTBEAT_SECONDS = float(os.getenv("SLOT_STREAM_HEARTBEAT_SECONDS", "15"))
+
+SUBSCRIBERS = metrics.gauge("dharma_slot_stream_subscribers", "Open /slots/stream connections")
+PUBLISHED = metrics.counter("dharma_slot_stream_events_total", "Slot events published to subscribers")
+COALESCED = metrics.counter(
+    "dharma_slot_stream_coalesced_total", "Slot events replaced by a newer one before a slow subscriber read them"
+)
+
+_CHANGED = "slot_stream_changed"   # key in Session.info: {slot id: {temple ids}}
+
+HEARTBEAT = b": ping\n\n"
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+# ---------------------------------------------------------
+# Subscribers
+# ---------------------------------------------------------
+class Subscriber:
+    """One connection: latest pending event per slot, and a wake-up flag."""
+
+    __slots__ = ("temple_id", "day", "pending", "wake", "closed")
+
+    def __init__(self, temple_id: int, day: Optional[date]):
+        self.temple_id = temple_id
+        self.day = day
+        self.pending: Dict[int, bytes] = {}
+        self.wake = asyncio.Event()
+        self.closed = False
+
+    def offer(self, slot_id: int, message: bytes) -> None:
+        if slot_id in self.pending:
+            COALESCED.inc()
+        self.pending[slot_id] = message
+        self.wake.set()
+
+    async def next(self) -> Optional[bytes]:
+        """Pending events as one chunk, HEARTBEAT when woken by the heartbeat tick, None once closed."""
+        await self.wake.wait()
+        self.wake.clear()
+        if self.closed:
+            return None
+        if not self.pending:
+            return HEARTBEAT
+        chunk = b"".join(self.pending.values())
+        self.pending.clear()
+        return chunk
+
+
+class Hub:
+    def __init__(self):
+        self._by_temple: Dict[int, Set[Subscriber]] = {}
+        self._count = 0
+        self._changed: Dict[int, Set[int]] = {}    # slot id -> temple ids, waiting for the publisher
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def watching(self, temple_id) -> bool:
+        return temple_id in self._by_temple
+
+    # loop thread
+    def subscribe(self, temple_id: int, day: Optional[date] = None) -> Subscriber:
+        if self._count >= SLOT_STREAM_MAX_SUBSCRIBERS:
+            raise TooManySubscribers()
+        subscriber = Subscriber(temple_id, day)
+        self._by_temple.setdefault(temple_id, set()).add(subscriber)
+        self._count += 1
+        SUBSCRIBERS.set(self._count)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._by_temple.get(subscriber.temple_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._by_temple[subscriber.temple_id]
+        self._count -= 1
+        SUBSCRIBERS.set(self._count)
+
+    # any thread
+    def notify(self, changed: Dict[int, Set[int]]) -> None:
+        if self._loop is None:
+            return
+        with self._lock:
+            first = not self._changed
+            for slot_id, temple_ids in changed.items():
+                self._changed.setdefault(slot_id, set()).update(temple_ids)
+        if first:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def _take(self) -> Dict[int, Set[int]]:
+        with self._lock:
+            changed, self._changed = self._changed, {}
+        return changed
+
+    # loop thread
+    def publish(self, rows: List[dict], deleted: Dict[int, Set[int]]) -> None:
+        """Offer one encoded event per slot to every subscriber that follows it."""
+        for row in rows:
+            message = _encode(row)
+            day = date.fromisoformat(row["date"]) if row["date"] else None
+            for subscriber in self._by_temple.get(row["templeId"], ()):
+                if subscriber.day is None or subscriber.day == day:
+                    subscriber.offer(row["slotId"], message)
+            PUBLISHED.inc()
+        for slot_id, temple_ids in deleted.items():
+            for temple_id in temple_ids:
+                message = _encode({"slotId": slot_id, "templeId": temple_id, "deleted": True})
+                for subscriber in self._by_temple.get(temple_id, ()):
+                    subscriber.offer(slot_id, message)
+                PUBLISHED.inc()
+
+    async def run(self) -> None:
+        """Publisher task: wait for commits, load the slots, fan out."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            changed = self._take()
+            if not changed:
+                continue
+            try:
+                rows = await run_in_threadpool(_load, list(changed))
+            except Exception as e:
+                print("❌ Slot stream load failed:", e)
+                continue
+            found = {row["slotId"] for row in rows}
+            self.publish(rows, {slot_id: t for slot_id, t in changed.items() if slot_id not in found})
+
+    def ping(self) -> None:
+        """Wake every connection; idle ones send HEARTBEAT."""
+        for subscribers in self._by_temple.values():
+            for subscriber in subscribers:
+                subscriber.wake.set()
+
+    async def heartbeats(self) -> None:
+        # one timer for every connection rather than a timeout per connection
+        while True:
+            await asyncio.sleep(SLOT_STREAM_HEARTBEAT_SECONDS)
+            self.ping()
+
+    def close_all(self) -> None:
+        for subscribers in self._by_temple.values():
+            for subscriber in subscribers:
+                subscriber.closed = True
+                subscriber.wake.set()
+
+
+hub = Hub()
+
+
+def _encode(data: dict) -> bytes:
+    return b"event: slot\ndata: " + json.dumps(data, separators=(",", ":")).encode() + b"\n\n"
+
+
+def _load(slot_ids: Iterable[int]) -> List[dict]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                Slot.slotId, Slot.templeId, Slot.date, Slot.startTime, Slot.endTime,
+                Slot.capacity, Slot.onlineTickets, Slot.remaining,
+            ).where(Slot.slotId.in_(slot_ids))
+        ).all()
+    finally:
+        db.close()
+    return [
+        {
+            "slotId": row.slotId,
+            "templeId": row.templeId,
+            "date": row.date.isoformat() if row.date else None,
+            "startTime": row.startTime.isoformat() if row.startTime else None,
+            "endTime": row.endTime.isoformat() if row.endTime else None,
+            "capacity": row.capacity,
+            "onlineTickets": row.onlineTickets,
+            "remaining": (row.remaining or 0) + hot_slots.unsold(row.slotId),
+        }
+        for row in rows
+    ]
+
+
+# ---------------------------------------------------------
+# Change tracking (SessionLocal events)
+# ---------------------------------------------------------
+def _history(obj, attr: str) -> set:
+    history = getattr(inspect(obj).attrs, attr).history
+    return {v for v in (*history.added, *history.unchanged, *history.deleted, getattr(obj, attr)) if v is not None}
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    if not hub._by_temple:
+        return
+    changed = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (Booking, Slot)):
+            continue
+        temple_ids = {t for t in _history(obj, "templeId") if hub.watching(t)}
+        if not temple_ids:
+            continue
+        slot_ids = _history(obj, "slotId")
+        if changed is None:
+            changed = session.info.setdefault(_CHANGED, {})
+        for slot_id in slot_ids:
+            changed.setdefault(slot_id, set()).update(temple_ids)
+
+
+def _after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED, None)
+    if changed:
+        hub.notify(changed)
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHANGED, None)
+
+
+# ---------------------------------------------------------
+# Lifecycle (from the app lifespan, on the event loop)
+# ---------------------------------------------------------
+_tasks: List[asyncio.Task] = []
+
+
+def start() -> None:
+    if _tasks:
+        return
+    hub._loop = asyncio.get_running_loop()
+    hub._ready = asyncio.Event()
+    event.listen(SessionLocal, "after_flush", _after_flush)
+    event.listen(SessionLocal, "after_commit", _after_commit)
+    event.listen(SessionLocal, "after_transaction_end", _after_transaction_end)
+    _tasks.append(asyncio.create_task(hub.run(), name="slot-stream-publisher"))
+    _tasks.append(asyncio.create_task(hub.heartbeats(), name="slot-stream-heartbeat"))
+
+
+async def stop() -> None:
+    if not _tasks:
+        return
+    event.remove(SessionLocal, "after_flush", _after_flush)
+    event.remove(SessionLocal, "after_commit", _after_commit)
+    event.remove(SessionLocal, "after_transaction_end", _after_transaction_end)
+    hub.close_all()
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    hub._loop = None
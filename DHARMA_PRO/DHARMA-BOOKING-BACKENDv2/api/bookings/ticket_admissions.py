@@ -0,0 +1,195 @@
+# api/bookings/ticket_admissions.py
+"""
+Scan-once admission ledger.
+
+A valid scan inserts a ticket_admissions row keyed by ticket id with
+
+    INSERT ... ON CONFLICT (ticket_id) DO NOTHING RETURNING ticket_id
+
+so the primary key index decides who was first: a returned row means
+ADMITTED, nothing returned means the ticket was already let in (by this or
+another gate / worker) and the existing row is read back for the reply.
+There is no read-then-write race and a rescan costs one index probe.
+Admissions are never undone, so each worker also remembers the ones it has
+seen (bounded LRU, TICKET_ADMISSION_MEMO_SIZE): a rescan on the same worker
+is answered from memory after token verification.
+
+Gates that buffer scans while offline upload them with admit_many(): one
+verification query for cache misses (ticket_verify.verify_many), one
+multi-row insert and one commit for the whole batch. Within a batch the
+earliest scan of a ticket wins; scanned_at is the device clock, recorded_at
+the server's.
+
+    ADMITTED           first valid scan
+    ALREADY_ADMITTED   valid ticket, admitted before (gate / time of the first scan)
+    INVALID            unknown ticket, wrong / expired token or revoked
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from api.bookings import ticket_verify
+from api.monitoring import metrics
+from database.models.common.ticket_admission_model import TicketAdmission
+
+TICKET_ADMISSION_BATCH_MAX = int(os.getenv("TICKET_ADMISSION_BATCH_MAX", "1000"))
+TICKET_ADMISSION_MEMO_SIZE = int(os.getenv("TICKET_ADMISSION_MEMO_SIZE", "50000"))
+
+ADMITTED = "ADMITTED"
+ALREADY_ADMITTED = "ALREADY_ADMITTED"
+INVALID = "INVALID"
+
+ADMISSIONS = metrics.counter("dharma_ticket_admissions_total", "Gate admission scans", ["status"])
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# ticket id, token, device scan time (None = now)
+Scan = Tuple[str, str, Optional[datetime]]
+
+
+class BatchLimitExceeded(ValueError):
+    pass
+
+
+class AdmittedMemo:
+    """Ticket id -> (gate id, scanned at) of admissions this worker has seen."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticket_id: str) -> Optional[Tuple[str, datetime]]:
+        with self._lock:
+            item = self._entries.get(ticket_id)
+            if item is not None:
+                self._entries.move_to_end(ticket_id)
+            return item
+
+    def put(self, ticket_id: str, gate_id: str, scanned_at: datetime) -> None:
+        with self._lock:
+            self._entries[ticket_id] = (gate_id, scanned_at)
+            self._entries.move_to_end(ticket_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+admitted = AdmittedMemo(TICKET_ADMISSION_MEMO_SIZE)
+
+
+def _naive(moment: Optional[datetime], now: datetime) -> datetime:
+    if moment is None:
+        return now
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _insert_if_absent(db: Session, rows: List[Dict[str, Any]]) -> set:
+    """Insert rows whose ticket id is not in the ledger yet. Returns the ids inserted."""
+    insert = _INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        # No ON CONFLICT: one savepoint per row, the primary key still decides
+        inserted = set()
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.add(TicketAdmission(**row))
+                inserted.add(row["ticket_id"])
+            except IntegrityError:
+                pass
+        return inserted
+
+    stmt = (
+        insert(TicketAdmission)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["ticket_id"])
+        .returning(TicketAdmission.ticket_id)
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def admit_many(db: Session, gate_id: str, scans: List[Scan]) -> List[Dict[str, Any]]:
+    """Record a batch of scans from one gate. Results in input order."""
+    if len(scans) > TICKET_ADMISSION_BATCH_MAX:
+        raise BatchLimitExceeded(f"At most {TICKET_ADMISSION_BATCH_MAX} scans per batch")
+
+    now = datetime.now()
+    entries = ticket_verify.verify_many(db, [(ticket_id, token) for ticket_id, token, _ in scans])
+
+    # earliest valid scan of each ticket in the batch not known to be admitted
+    previous = {}
+    first: Dict[str, int] = {}
+    for i, (ticket_id, _, scanned_at) in enumerate(scans):
+        if entries[i] is None:
+            continue
+        known = admitted.get(ticket_id)
+        if known is not None:
+            previous[ticket_id] = known
+            continue
+        j = first.get(ticket_id)
+        if j is None or _naive(scanned_at, now) < _naive(scans[j][2], now):
+            first[ticket_id] = i
+
+    inserted = set()
+    if first:
+        rows = [
+            {
+                "ticket_id": ticket_id,
+                "gate_id": gate_id,
+                "headcount": entries[i][2],
+                "scanned_at": _naive(scans[i][2], now),
+            }
+            for ticket_id, i in first.items()
+        ]
+        inserted = _insert_if_absent(db, rows)
+        db.commit()
+        for row in rows:
+            if row["ticket_id"] in inserted:
+                admitted.put(row["ticket_id"], gate_id, row["scanned_at"])
+                previous[row["ticket_id"]] = (gate_id, row["scanned_at"])
+
+    def admitted_now(i: int) -> bool:
+        return first.get(scans[i][0]) == i and scans[i][0] in inserted
+
+    # admitted earlier by another worker: read back gate / time once
+    missing = set(first) - inserted
+    if missing:
+        for row in db.query(TicketAdmission).filter(TicketAdmission.ticket_id.in_(missing)):
+            admitted.put(row.ticket_id, row.gate_id, row.scanned_at)
+            previous[row.ticket_id] = (row.gate_id, row.scanned_at)
+
+    results = []
+    for i, (ticket_id, _, _) in enumerate(scans):
+        entry = entries[i]
+        if entry is None:
+            result = {"ticket_id": ticket_id, "status": INVALID}
+        elif admitted_now(i):
+            result = {"ticket_id": ticket_id, "status": ADMITTED, "headcount": entry[2], "booking_id": entry[1]}
+        else:
+            gate, scanned_at = previous.get(ticket_id, (None, None))
+            result = {
+                "ticket_id": ticket_id,
+                "status": ALREADY_ADMITTED,
+                "headcount": entry[2],
+                "booking_id": entry[1],
+                "admitted_at": str(scanned_at) if scanned_at else None,
+                "admitted_gate": gate,
+            }
+        ADMISSIONS.inc(status=result["status"])
+        results.append(result)
+    return results
+
+
+def admit(db: Session, gate_id: str, ticket_id: str, token: str, scanned_at: Optional[datetime] = None) -> Dict[str, Any]:
+    return admit_many(db, gate_id, [(ticket_id, token, scanned_at)])[0]
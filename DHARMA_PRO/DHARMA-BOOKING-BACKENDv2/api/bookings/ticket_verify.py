@@ -0,0 +1,351 @@
+# api/bookings/ticket_verify.py
+"""
+Gate-scan verification cache.
+
+GET /ticket/{id}/verify answers "is this ticket valid, and for how many
+people" from an in-process cache keyed by ticket id, so QR scans at the gate
+do not need a database round trip:
+
+* bounded: at most TICKET_VERIFY_CACHE_SIZE tickets, least recently used
+  evicted first (an entry is a small tuple, no ORM objects)
+* TTL: entries expire after TICKET_VERIFY_TTL_SECONDS, which bounds how long
+  another worker process can serve a booking it did not see change
+* warm: a background thread loads every ticket for today's bookings at
+  start and again every TICKET_VERIFY_WARM_SECONDS
+* invalidation: commits that update or delete a booking, its participants
+  or its ticket drop the affected entries (SessionLocal events)
+
+Signed tokens (TICKET_TOKEN_MODE=signed, api/payments/ticket_tokens.py) skip
+the cache and the database: signature, expiry and ticket id are checked
+locally and the id against an in-memory revocation set. The warmer thread
+pulls new revocations every TICKET_REVOCATION_POLL_SECONDS; a revocation
+committed in this process is picked up by the next scan, through the scan's
+own session (so an async route does not block the event loop on a new one).
+
+Headcount is the number of booking participants, else the booking's
+numberOfParticipants, else 1. A ticket whose booking was deleted
+(cancelled) is invalid.
+"""
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session
+
+from api.monitoring import metrics
+from api.payments import ticket_tokens
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.booking.booking_participant_model import BookingParticipant
+from database.models.booking.slot_model import Slot
+from database.models.common.ticket_model import Ticket
+from database.models.common.ticket_revocation_model import TicketRevocation
+
+TICKET_VERIFY_CACHE_SIZE = int(os.getenv("TICKET_VERIFY_CACHE_SIZE", "50000"))
+TICKET_VERIFY_TTL_SECONDS = float(os.getenv("TICKET_VERIFY_TTL_SECONDS", "600"))
+TICKET_VERIFY_WARM_SECONDS = float(os.getenv("TICKET_VERIFY_WARM_SECONDS", "300"))
+TICKET_REVOCATION_POLL_SECONDS = float(os.getenv("TICKET_REVOCATION_POLL_SECONDS", "5"))
+
+LOOKUPS = metrics.counter("dharma_ticket_verify_lookups_total", "Gate verification cache lookups", ["result"])
+ENTRIES = metrics.gauge("dharma_ticket_verify_cache_entries", "Tickets held by the gate verification cache")
+
+_STALE = "ticket_verify_stale"   # key in Session.info: {"bookings": set(), "tickets": set(), "revoked": bool}
+
+# token, booking id, headcount, booking date
+Entry = Tuple[str, int, int, str]
+
+
+# ---------------------------------------------------------
+# Cache
+# ---------------------------------------------------------
+class VerifyCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()   # ticket id -> (expires, entry)
+        self._by_booking: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, ticket_id: str) -> Optional[Entry]:
+        with self._lock:
+            item = self._entries.get(ticket_id)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                self._drop(ticket_id)
+                return None
+            self._entries.move_to_end(ticket_id)
+            return item[1]
+
+    def put(self, ticket_id: str, entry: Entry) -> None:
+        with self._lock:
+            self._drop(ticket_id)
+            self._entries[ticket_id] = (time.monotonic() + self.ttl, entry)
+            self._by_booking.setdefault(entry[1], set()).add(ticket_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            ENTRIES.set(len(self._entries))
+
+    def invalidate(self, ticket_ids: Iterable[str] = (), booking_ids: Iterable[int] = ()) -> None:
+        with self._lock:
+            for booking_id in booking_ids:
+                for ticket_id in self._by_booking.get(booking_id, set()).copy():
+                    self._drop(ticket_id)
+            for ticket_id in ticket_ids:
+                self._drop(ticket_id)
+            ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_booking.clear()
+            ENTRIES.set(0)
+
+    def _drop(self, ticket_id: str) -> None:
+        item = self._entries.pop(ticket_id, None)
+        if item is None:
+            return
+        tickets = self._by_booking.get(item[1][1])
+        if tickets is not None:
+            tickets.discard(ticket_id)
+            if not tickets:
+                del self._by_booking[item[1][1]]
+
+
+cache = VerifyCache(TICKET_VERIFY_CACHE_SIZE, TICKET_VERIFY_TTL_SECONDS)
+
+
+class RevokedSet:
+    """Revoked ticket ids, pulled incrementally from ticket_revocations."""
+
+    def __init__(self):
+        self._ids: Set[str] = set()
+        self._last_id = 0
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return self.contains(None, ticket_id)
+
+    def contains(self, db: Optional[Session], ticket_id: str) -> bool:
+        if self.stale:
+            self.refresh(db)
+        return ticket_id in self._ids
+
+    def refresh(self, db: Optional[Session] = None) -> int:
+        """Load revocations added since the last refresh (through `db`, else a new session). Returns how many."""
+        # No lock held across the query: on the event loop it would block the
+        # other requests' run_sync; adding rows twice is harmless
+        self.stale = False
+        if db is not None:
+            rows = ticket_tokens.revocations_since(db, self._last_id)
+        else:
+            own = SessionLocal()
+            try:
+                rows = ticket_tokens.revocations_since(own, self._last_id)
+            finally:
+                own.close()
+        with self._lock:
+            for row in rows:
+                self._ids.add(row.ticket_id)
+                self._last_id = max(self._last_id, row.id)
+        return len(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self._last_id = 0
+            self.stale = True
+
+
+revoked = RevokedSet()
+
+
+# ---------------------------------------------------------
+# Loading
+# ---------------------------------------------------------
+def _entries_query():
+    participants = (
+        select(func.count(BookingParticipant.participantId))
+        .where(BookingParticipant.bookingId == Booking.bookingId)
+        .scalar_subquery()
+    )
+    return (
+        select(Ticket.id, Ticket.token, Booking.bookingId, participants, Booking.numberOfParticipants, Booking.bookingDate)
+        .join(Booking, Booking.bookingId == Ticket.booking_id)
+    )
+
+
+def _entry(row) -> Entry:
+    ticket_id, token, booking_id, participants, declared, booking_date = row
+    headcount = participants or declared or 1
+    return token, booking_id, headcount, str(booking_date.date() if isinstance(booking_date, datetime) else booking_date)
+
+
+def _load(db: Session, ticket_ids: Set[str]) -> Dict[str, Entry]:
+    rows = db.execute(_entries_query().where(Ticket.id.in_(ticket_ids))).all()
+    loaded = {}
+    for row in rows:
+        loaded[row[0]] = _entry(row)
+        cache.put(row[0], loaded[row[0]])
+    return loaded
+
+
+def _verify_signed(db: Session, ticket_id: str, token: str) -> Optional[Entry]:
+    claims = ticket_tokens.decode(token)
+    if claims is None or claims.get("i") != ticket_id or revoked.contains(db, ticket_id):
+        LOOKUPS.inc(result="signed_rejected")
+        return None
+    LOOKUPS.inc(result="signed")
+    return token, claims.get("b"), claims.get("h") or 1, claims.get("d")
+
+
+def verify_many(db: Session, scans: List[Tuple[str, str]]) -> List[Optional[Entry]]:
+    """
+    verify() for a batch of (ticket_id, token): cache misses are loaded with
+    one query. Results in input order.
+    """
+    results: List[Optional[Entry]] = [None] * len(scans)
+    pending = []   # indexes checked against cached / loaded rows
+    for i, (ticket_id, token) in enumerate(scans):
+        if ticket_tokens.is_signed(token) and ticket_tokens.can_sign():
+            results[i] = _verify_signed(db, ticket_id, token)
+        else:
+            pending.append(i)
+
+    entries = {}
+    for i in pending:
+        ticket_id = scans[i][0]
+        entry = cache.get(ticket_id)
+        if entry is not None:
+            LOOKUPS.inc(result="hit")
+            entries[ticket_id] = entry
+    misses = {scans[i][0] for i in pending} - entries.keys()
+    if misses:
+        LOOKUPS.inc(len(misses), result="miss")
+        entries.update(_load(db, misses))
+
+    for i in pending:
+        ticket_id, token = scans[i]
+        entry = entries.get(ticket_id)
+        if entry is None or not hmac.compare_digest(entry[0].encode(), token.encode()):
+            continue
+        if revoked.contains(db, ticket_id):   # revoked by an admin
+            continue
+        results[i] = entry
+    return results
+
+
+def verify(db: Session, ticket_id: str, token: str) -> Optional[Entry]:
+    """The ticket's entry if ticket_id + token are valid, else None."""
+    return verify_many(db, [(ticket_id, token)])[0]
+
+
+def warm(day: Optional[date] = None) -> int:
+    """Load every ticket for bookings on `day` (default today). Returns how many."""
+    day = day or date.today()
+    start = datetime.combine(day, datetime.min.time())
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            _entries_query()
+            .outerjoin(Slot, Slot.slotId == Booking.slotId)
+            .where(or_(
+                Slot.date == day,
+                (Booking.bookingDate >= start) & (Booking.bookingDate < start + timedelta(days=1)),
+            ))
+            .limit(cache.max_entries)
+        ).all()
+    finally:
+        db.close()
+    for row in rows:
+        cache.put(row[0], _entry(row))
+    return len(rows)
+
+
+# ---------------------------------------------------------
+# Invalidation (SessionLocal events)
+# ---------------------------------------------------------
+def _after_flush(session: Session, flush_context) -> None:
+    stale = session.info.setdefault(_STALE, {"bookings": set(), "tickets": set(), "revoked": False})
+    for obj in list(session.dirty) + list(session.deleted) + list(session.new):
+        if isinstance(obj, TicketRevocation):
+            stale["revoked"] = True
+        elif isinstance(obj, Booking) and obj not in session.new:
+            stale["bookings"].add(obj.bookingId)
+        elif isinstance(obj, BookingParticipant):
+            stale["bookings"].add(obj.bookingId)
+        elif isinstance(obj, Ticket) and obj not in session.new:
+            stale["tickets"].add(obj.id)
+
+
+def _after_commit(session: Session) -> None:
+    stale = session.info.pop(_STALE, None)
+    if stale:
+        cache.invalidate(stale["tickets"], stale["bookings"])
+        if stale["revoked"]:
+            revoked.stale = True
+
+
+def _after_transaction_end(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_STALE, None)
+
+
+# ---------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _run() -> None:
+    next_warm = 0.0
+    while True:
+        if time.monotonic() >= next_warm:
+            next_warm = time.monotonic() + TICKET_VERIFY_WARM_SECONDS
+            try:
+                warm()
+            except Exception as e:
+                print("❌ Ticket verify cache warm-up failed:", e)
+        try:
+            revoked.refresh()
+        except Exception as e:
+            print("❌ Ticket revocation refresh failed:", e)
+        if _stop.wait(min(TICKET_REVOCATION_POLL_SECONDS, TICKET_VERIFY_WARM_SECONDS)):
+            return
+
+
+def start() -> None:
+    global _thread
+    if _thread is not None:
+        return
+    event.listen(SessionLocal, "after_flush", _after_flush)
+    event.listen(SessionLocal, "after_commit", _after_commit)
+    event.listen(SessionLocal, "after_transaction_end", _after_transaction_end)
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run, name="ticket-verify-warmer", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join()
+    _thread = None
+    event.remove(SessionLocal, "after_flush", _after_flush)
+    event.remove(SessionLocal, "after_commit", _after_commit)
+    event.remove(SessionLocal, "after_transaction_end", _after_transaction_end)
+    cache.clear()
+    revoked.clear()
@@ -1,86 +1,325 @@
 # api/bookings/tickets.py
 
 import json
-from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException, Response
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
-from database.get_db import get_db
+from database.dependencies import get_current_user
+from database.get_db import get_async_db, get_db
+from database.models.admin.admin_model import Admin
 from database.models.common.ticket_model import Ticket
 from database.models.booking.booking_model import Booking
 from database.models.temple.temple_model import Temple
 from database.models.booking.slot_model import Slot
 from database.models.booking.booking_participant_model import BookingParticipant
+from database.schemas.payment.ticket_schema import AdmissionBatchRequest, AdmitRequest, BulkTicketRequest
+from api.bookings import ticket_admissions, ticket_verify
+from api.payments import ticket_bulk, ticket_renderer, ticket_image_cache, ticket_tokens
+from api.payments.ticket_service import ticket_fields_from_row
 
 router = APIRouter(prefix="/ticket", tags=["Ticket"])
 templates = Jinja2Templates(directory="templates")
 
+# Token-gated, so private; no-cache = always revalidate (a 304 via ETag)
+IMAGE_CACHE_CONTROL = "private, no-cache"
 
-@router.get("/{ticket_id}")
-def view_ticket(request: Request, ticket_id: str, t: str = "", db: Session = Depends(get_db)):
-    # 1. Verify Ticket Token
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
+
+def _image_url(ticket) -> str:
+    return f"/ticket/{ticket.id}/image?t={ticket.token}"
+
+
+# ---------------------------------------------------------
+# Offline verification for gate devices (signed tokens)
+# ---------------------------------------------------------
+REVOCATIONS_PAGE_MAX = 5000
+
+
+@router.get("/signing-key")
+def signing_key():
+    """Algorithm and public key for verifying signed ticket tokens offline."""
+    if not ticket_tokens.can_sign():
+        raise HTTPException(status_code=404, detail="Signed ticket tokens are not enabled")
+    return ticket_tokens.public_key()
+
+
+@router.get("/revocations")
+async def ticket_revocations(since: int = 0, limit: int = 1000, db=Depends(get_async_db)):
+    """
+    Revoked ticket ids after `since`, oldest first. Devices keep `next` and
+    pass it as `since` on their next poll; `more` means another page is ready.
+    """
+    limit = max(1, min(limit, REVOCATIONS_PAGE_MAX))
+    rows = await db.run_sync(ticket_tokens.revocations_since, since, limit + 1)
+    page = rows[:limit]
+    return {
+        "revocations": [
+            {"seq": r.id, "ticket_id": r.ticket_id, "revoked_at": str(r.revoked_at)} for r in page
+        ],
+        "next": page[-1].id if page else since,
+        "more": len(rows) > limit,
+    }
+
+
+@router.post("/{ticket_id}/revoke")
+async def revoke_ticket(
+    ticket_id: str,
+    reason: str = "revoked by admin",
+    db=Depends(get_async_db),
+    user=Depends(get_current_user)
+):
+    if user["role"] != "admin":
+        raise HTTPException(403, "Not authorized")
+
+    return await db.run_sync(_revoke_ticket, ticket_id, reason, user["id"])
+
+
+def _revoke_ticket(db: Session, ticket_id: str, reason: str, admin_id: int):
+    admin = db.query(Admin).filter(Admin.adminId == admin_id).first()
+
+    if not admin:
+        raise HTTPException(404, "Admin not found")
+
+    if not db.query(Ticket.id).filter(Ticket.id == ticket_id).first():
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    added = ticket_tokens.revoke(db, [ticket_id], reason)
+    db.commit()
+    return {"ticket_id": ticket_id, "revoked": True, "already_revoked": not added}
+
+
+# ---------------------------------------------------------
+# Gate scan: valid / invalid + headcount (served from ticket_verify cache)
+# ---------------------------------------------------------
+@router.get("/{ticket_id}/verify")
+async def verify_ticket(ticket_id: str, t: str = "", db=Depends(get_async_db)):
+    entry = await db.run_sync(ticket_verify.verify, ticket_id, t)
+    if entry is None:
+        return {"valid": False}
+    _, booking_id, headcount, booking_date = entry
+    return {"valid": True, "headcount": headcount, "booking_id": booking_id, "booking_date": booking_date}
+
+
+# ---------------------------------------------------------
+# Gate admission: scan-once ledger (api/bookings/ticket_admissions.py)
+# ---------------------------------------------------------
+@router.post("/admissions/batch")
+async def admit_batch(payload: AdmissionBatchRequest, db=Depends(get_async_db)):
+    """Upload scans a gate buffered while offline; one result per scan, in order."""
+    try:
+        results = await db.run_sync(
+            ticket_admissions.admit_many, payload.gateId, [(s.ticketId, s.t, s.scannedAt) for s in payload.scans]
+        )
+    except ticket_admissions.BatchLimitExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    counts = {status: 0 for status in (ticket_admissions.ADMITTED, ticket_admissions.ALREADY_ADMITTED, ticket_admissions.INVALID)}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "results": results,
+        "admitted": counts[ticket_admissions.ADMITTED],
+        "duplicates": counts[ticket_admissions.ALREADY_ADMITTED],
+        "invalid": counts[ticket_admissions.INVALID],
+    }
+
+
+@router.post("/{ticket_id}/admit")
+async def admit_ticket(ticket_id: str, payload: AdmitRequest, db=Depends(get_async_db)):
+    return await db.run_sync(ticket_admissions.admit, payload.gateId, ticket_id, payload.t, payload.scannedAt)
+
+
+# ---------------------------------------------------------
+# Ticket image (rendered on first request, then cached)
+# ---------------------------------------------------------
+@router.get("/{ticket_id}/image")
+def ticket_image(
+    request: Request,
+    ticket_id: str,
+    t: str = "",
+    format: str = "png",
+    db: Session = Depends(get_db),
+):
+    """Ticket image: png (default), or svg / pdf with a vector QR for printers."""
+    if format not in ticket_image_cache.FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format (use png, svg or pdf)")
+
+    row = (
+        db.query(Ticket, Booking.templeId)
+        .outerjoin(Booking, Booking.bookingId == Ticket.booking_id)
+        .filter(Ticket.id == ticket_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
+    ticket, temple_id = row
     if t != ticket.token:
         raise HTTPException(status_code=403, detail="Invalid token")
 
-    # 2. Deep Fetch Booking Data (Live from DB)
-    booking = (
-        db.query(Booking)
-        .options(
-            joinedload(Booking.temple),
-            joinedload(Booking.slot),
-            joinedload(Booking.participants),
-            joinedload(Booking.user)
+    fields = ticket_fields_from_row(ticket, temple_id)
+    db.close()   # don't hold a pooled connection while rendering
+
+    etag = f'"{ticket_image_cache.etag_for(fields, format)}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path, _ = ticket_renderer.render(fields, format)
+        with open(path, "rb") as f:
+            content = f.read()
+    except Exception as e:
+        print(f"❌ Ticket image render failed for {ticket_id}:", e)
+        raise HTTPException(status_code=500, detail="Ticket image could not be rendered")
+
+    return Response(content=content, media_type=ticket_image_cache.FORMATS[format], headers=headers)
+
+
+
+# ---------------------------------------------------------
+# Bulk print bundle (kiosk / festival batches)
+# ---------------------------------------------------------
+@router.post("/bulk")
+def bulk_tickets(
+    payload: BulkTicketRequest,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Tickets for every booking of a temple on a day (or the given bookingIds)
+    as one printable multi-page PDF. Missing Ticket rows are created.
+    """
+    if user["role"] != "admin":
+        raise HTTPException(403, "Not authorized")
+
+    admin = db.query(Admin).filter(Admin.adminId == user["id"]).first()
+
+    if not admin:
+        raise HTTPException(404, "Admin not found")
+
+    if not payload.bookingIds and (payload.templeId is None or payload.date is None):
+        raise HTTPException(status_code=400, detail="Provide templeId and date, or bookingIds")
+
+    try:
+        result = ticket_bulk.generate(
+            db,
+            temple_id=payload.templeId,
+            day=payload.date,
+            booking_ids=payload.bookingIds,
         )
-        .filter(Booking.bookingId == ticket.booking_id)
-        .first()
+    except ticket_bulk.BulkLimitExceeded as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print("❌ Bulk ticket generation failed:", e)
+        raise HTTPException(status_code=500, detail="Tickets could not be generated")
+
+    if not result["count"]:
+        raise HTTPException(status_code=404, detail="No bookings found")
+
+    label = f"temple{payload.templeId}-{payload.date}" if not payload.bookingIds else "selection"
+    return Response(
+        content=result["pdf"],
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="tickets-{label}.pdf"',
+            "X-Ticket-Count": str(result["count"]),
+            "X-Tickets-Created": str(result["created"]),
+            "X-Tickets-Per-Second": f"{result['tickets_per_second']:.1f}",
+        },
     )
 
-    # 3. Extract Live Data
-    if not booking:
+
+@router.get("/{ticket_id}")
+async def view_ticket(request: Request, ticket_id: str, t: str = "", db=Depends(get_async_db)):
+    return await db.run_sync(_view_ticket, request, ticket_id, t)
+
+
+def _view_ticket(db: Session, request: Request, ticket_id: str, t: str):
+    # 1. Ticket + live booking / temple / slot data in one query (plain columns, no ORM objects)
+    row = db.execute(
+        select(
+            Ticket.id,
+            Ticket.token,
+            Ticket.txn_id,
+            Ticket.slot_no,
+            Ticket.slot_time,
+            Ticket.booking_datetime,
+            Ticket.image_status,
+            Ticket.metadata_json,
+            Booking.bookingId,
+            Booking.bookingDate,
+            Temple.templeName,
+            Temple.location,
+            Slot.slotId,
+            Slot.slotNumber,
+            Slot.startTime,
+        )
+        .outerjoin(Booking, Booking.bookingId == Ticket.booking_id)
+        .outerjoin(Temple, Temple.templeId == Booking.templeId)
+        .outerjoin(Slot, Slot.slotId == Booking.slotId)
+        .where(Ticket.id == ticket_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    # 2. Verify Ticket Token
+    if t != row.token:
+        raise HTTPException(status_code=403, detail="Invalid token")
+
+    if row.bookingId is None:
         # Fallback: if booking deleted, try to render from stored metadata
-        return _render_with_fallback(request, ticket)
+        return _render_with_fallback(request, row)
+
+    # 3. Participants: second flat query (joining them above would repeat the row per participant)
+    participants = db.execute(
+        select(
+            BookingParticipant.name,
+            BookingParticipant.age,
+            BookingParticipant.gender,
+            BookingParticipant.photoIdType,
+            BookingParticipant.photoIdNumber,
+        )
+        .where(BookingParticipant.bookingId == row.bookingId)
+        .order_by(BookingParticipant.participantId)
+    ).all()
 
     # --- Live Temple Info ---
-    temple_name = getattr(booking.temple, "templeName", "Dharma Temple") if booking.temple else "Dharma Temple"
-    # Some temple models use 'location', some might not. Adjust as per your model.
-    location = getattr(booking.temple, "location", "India") if booking.temple else "India"
+    temple_name = row.templeName or "Dharma Temple"
+    location = row.location or "India"
 
     # --- Live Slot Info ---
-    if booking.slot:
-        slot_no = str(booking.slot.slotNumber)
-        slot_time = str(booking.slot.startTime)
+    if row.slotId is not None:
+        slot_no = str(row.slotNumber)
+        slot_time = str(row.startTime)
     else:
         # Fallback to ticket snapshot
-        slot_no = ticket.slot_no or "N/A"
-        slot_time = ticket.slot_time or ""
+        slot_no = row.slot_no or "N/A"
+        slot_time = row.slot_time or ""
 
     # --- Live Participants Info ---
-    participants = booking.participants
     participant_count = len(participants) if participants else 1
-    
+
     # Extract full details for "See More"
     participants_list = [
         {
-            "name": p.name, 
-            "age": p.age, 
+            "name": p.name,
+            "age": p.age,
             "gender": p.gender,
-            "id_type": getattr(p, "photoIdType", "N/A"),
-            "id_no": getattr(p, "photoIdNumber", "N/A")
-        } 
+            "id_type": p.photoIdType,
+            "id_no": p.photoIdNumber
+        }
         for p in participants
     ]
-    
+
     # Extract names for summary
     p_names = [p.name for p in participants]
-    
-    # Primary Name (User or First Participant)
-    primary_name = getattr(booking.user, "name", "") 
-    if not primary_name and participants:
-        primary_name = participants[0].name
+
+    # Primary Name (the User model has no display name: first participant)
+    primary_name = participants[0].name if participants else ""
     if not primary_name:
         primary_name = "Devotee"
 
@@ -90,13 +329,13 @@ def view_ticket(request: Request, ticket_id: str, t: str = "", db: Session = Dep
 
     # 4. Construct Full Dictionary
     ticket_dict = {
-        "id": ticket.id,
-        "booking_id": booking.bookingId,
-        "txn_id": ticket.txn_id or "N/A",  
+        "id": row.id,
+        "booking_id": row.bookingId,
+        "txn_id": row.txn_id or "N/A",
         "slot_no": slot_no,
         "slot_time": slot_time,
-        "booking_datetime": str(booking.bookingDate), # Ensure string for JSON
-        
+        "booking_datetime": str(row.bookingDate), # Ensure string for JSON
+
         # New Deep Fields
         "temple_name": temple_name,
         "location": location,
@@ -104,15 +343,17 @@ def view_ticket(request: Request, ticket_id: str, t: str = "", db: Session = Dep
         "participant_count": participant_count,
         "participant_names": participant_names_str,
         "participants_details": participants_list,  # <--- New Field
-        
-        "image_url": f"/{ticket.image_path}" if ticket.image_path else None,
+
+        "image_url": _image_url(row),
+        "image_status": row.image_status,
     }
 
     # Return JSON directly used by frontend
     return ticket_dict
 
 def _render_with_fallback(request, ticket):
-    """Render utilizing only the JSON metadata stored in the Ticket row (Snapshot mode)"""
+    """Render utilizing only the JSON metadata stored in the Ticket row (Snapshot mode)
+    ticket: Ticket row or a result row with the same column names"""
     try:
         md = json.loads(ticket.metadata_json or "{}")
     except:
@@ -129,7 +370,8 @@ def _render_with_fallback(request, ticket):
         "name": md.get("name", "Devotee"),
         "participant_count": md.get("count", 1),
         "participant_names": md.get("participant_names", "Devotee"),
-        "image_url": f"/{ticket.image_path}" if ticket.image_path else None,
+        "image_url": _image_url(ticket),
+        "image_status": ticket.image_status,
         "is_fallback": True
     }
     return t_dict
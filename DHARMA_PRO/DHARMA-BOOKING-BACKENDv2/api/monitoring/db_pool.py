@@ -0,0 +1,69 @@
+# api/monitoring/db_pool.py
+"""
+Connection pool metrics (GET /metrics), labelled pool="sync" / "async".
+
+    dharma_db_pool_size                   configured pool_size
+    dharma_db_pool_checked_out            connections in use right now
+    dharma_db_pool_overflow               connections open beyond pool_size
+    dharma_db_pool_wait_seconds           time to get a connection (histogram)
+    dharma_db_pool_checkout_failures_total{reason="timeout"|"error"}
+    dharma_db_pool_connections_opened_total / _invalidated_total
+
+Levels are read from the pools at scrape time; waits, failures, connects and
+invalidations arrive through the pool observer (database/pool.py), which
+install() registers. With DB_ASYNC, requests queue for a session before they
+reach the pool (database/get_db.py); that wait and its timeouts are reported
+as pool="async_gate". A high connections_opened rate means overflow
+connections are being opened and closed under load: raise DB_POOL_SIZE.
+"""
+from sqlalchemy.pool import QueuePool
+
+from api.monitoring import metrics
+from database import pool as db_pools
+
+# Mostly sub-millisecond; the tail is requests queued behind a full pool
+WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SIZE = metrics.gauge("dharma_db_pool_size", "Configured pool size", ["pool"])
+CHECKED_OUT = metrics.gauge("dharma_db_pool_checked_out", "Connections checked out of the pool", ["pool"])
+OVERFLOW = metrics.gauge("dharma_db_pool_overflow", "Connections open beyond the pool size", ["pool"])
+WAIT = metrics.histogram(
+    "dharma_db_pool_wait_seconds", "Time to get a connection from the pool", ["pool"], buckets=WAIT_BUCKETS
+)
+FAILURES = metrics.counter(
+    "dharma_db_pool_checkout_failures_total", "Connection checkouts that failed", ["pool", "reason"]
+)
+OPENED = metrics.counter("dharma_db_pool_connections_opened_total", "New database connections", ["pool"])
+INVALIDATED = metrics.counter(
+    "dharma_db_pool_connections_invalidated_total", "Connections discarded as broken or stale", ["pool"]
+)
+
+
+class _PoolMetrics(db_pools.PoolObserver):
+    def checkout(self, label: str, seconds: float) -> None:
+        WAIT.observe(seconds, pool=label)
+
+    def failure(self, label: str, reason: str) -> None:
+        FAILURES.inc(pool=label, reason=reason)
+
+    def connect(self, label: str) -> None:
+        OPENED.inc(pool=label)
+
+    def invalidate(self, label: str) -> None:
+        INVALIDATED.inc(pool=label)
+
+
+def install() -> None:
+    """Record the instrumented pools (database/pool.py) on /metrics."""
+    db_pools.set_observer(_PoolMetrics())
+    metrics.add_collector(_collect)
+
+
+def _collect() -> None:
+    for label, engine in db_pools.engines.items():
+        pool = engine.pool    # engine.dispose() replaces it
+        if not isinstance(pool, QueuePool):
+            continue
+        SIZE.set(pool.size(), pool=label)
+        CHECKED_OUT.set(pool.checkedout(), pool=label)
+        OVERFLOW.set(max(pool.overflow(), 0), pool=label)
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from api.monitoring import metrics
+from api.monitoring.query_profiler import profiler
+from database.dependencies import get_current_user
+from database.get_db import get_db
+from database.models.admin.admin_model import Admin
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of all process metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ---------------------------------------------------------
+# Query profiling (debug; see api/monitoring/query_profiler.py)
+# ---------------------------------------------------------
+class QueryProfileUpdate(BaseModel):
+    enabled: bool
+    slowMs: Optional[float] = Field(None, gt=0)
+
+
+def _require_admin(db: Session, user: dict) -> None:
+    if user["role"] != "admin":
+        raise HTTPException(403, "Not authorized")
+
+    admin = db.query(Admin).filter(Admin.adminId == user["id"]).first()
+
+    if not admin:
+        raise HTTPException(404, "Admin not found")
+
+
+def _query_profile_state(limit: int = 20) -> dict:
+    return {
+        "enabled": profiler.enabled,
+        "slowMs": profiler.slow_seconds * 1000,
+        "routes": profiler.report(limit),
+    }
+
+
+@router.get("/debug/query-profile")
+def get_query_profile(limit: int = 20, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Routes with the most duplicate statements (then statements per request) since profiling was switched on."""
+    _require_admin(db, user)
+    return _query_profile_state(max(1, limit))
+
+
+@router.put("/debug/query-profile")
+def update_query_profile(
+    payload: QueryProfileUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)
+):
+    """
+    Switch query profiling on or off in this process. Switching it on
+    starts a new report; while on, responses carry a Server-Timing header.
+    """
+    _require_admin(db, user)
+    profiler.configure(payload.enabled, payload.slowMs)
+    return _query_profile_state()
@@ -0,0 +1,145 @@
+# api/monitoring/query_profiler.py
+"""
+Query profiling mode: which endpoints run too many, repeated or slow SQL
+statements. Off by default; switched at runtime by an admin
+
+    PUT /debug/query-profile   {"enabled": true, "slowMs": 50}
+    GET /debug/query-profile   routes with the most duplicates / statements so far
+
+While it is on, every response carries
+
+    Server-Timing: db;dur=12.4, db-statements;desc="7", db-dup;desc="2", db-slow;dur=8.1;desc="1"
+
+(database time and statements of the request; duplicates: the same SQL
+with the same parameters run again within the request; slow: statements
+over the threshold), and each request with duplicates or slow statements
+prints its worst QUERY_PROFILE_TOP statements.
+
+Statements are seen through the request metrics cursor events
+(request_metrics.py). Off, that costs one flag check per request and one
+None check per statement; listeners are not added or removed at runtime
+(unsafe while other threads execute). The switch is per process: with
+several workers, start them with QUERY_PROFILE=true instead.
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+QUERY_PROFILE = os.getenv("QUERY_PROFILE", "false").lower() in ("1", "true", "yes")
+QUERY_PROFILE_SLOW_MS = float(os.getenv("QUERY_PROFILE_SLOW_MS", "100"))
+QUERY_PROFILE_TOP = int(os.getenv("QUERY_PROFILE_TOP", "5"))
+
+
+def _short(statement: str, width: int = 160) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+class RequestProfile:
+    """Statements of one request: (sql, parameters) -> durations."""
+
+    __slots__ = ("statements", "db_seconds", "executions")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.executions: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, statement: str, parameters, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        self.executions.setdefault((statement, repr(parameters)), []).append(seconds)
+
+    def duplicates(self) -> List[Tuple[str, List[float]]]:
+        return [(sql, runs) for (sql, _), runs in self.executions.items() if len(runs) > 1]
+
+    def slow(self, threshold: float) -> List[Tuple[str, float]]:
+        return [(sql, s) for (sql, _), runs in self.executions.items() for s in runs if s >= threshold]
+
+    def server_timing(self, threshold: float) -> str:
+        slow = self.slow(threshold)
+        return ", ".join((
+            f"db;dur={self.db_seconds * 1000:.1f}",
+            f'db-statements;desc="{self.statements}"',
+            f'db-dup;desc="{sum(len(runs) - 1 for _, runs in self.duplicates())}"',
+            f'db-slow;dur={sum(s for _, s in slow) * 1000:.1f};desc="{len(slow)}"',
+        ))
+
+
+class QueryProfiler:
+    def __init__(self):
+        self.enabled = QUERY_PROFILE
+        self.slow_seconds = QUERY_PROFILE_SLOW_MS / 1000
+        self._lock = threading.Lock()
+        # (method, route) -> [requests, statements, duplicates, slow, db seconds]
+        self._routes: Dict[Tuple[str, str], List[float]] = {}
+        self._repeated: Dict[Tuple[str, str], Dict[str, int]] = {}   # route -> sql -> duplicate runs
+
+    def configure(self, enabled: bool, slow_ms: Optional[float] = None) -> None:
+        if slow_ms is not None:
+            self.slow_seconds = slow_ms / 1000
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+        print(f"Query profiling {'on' if enabled else 'off'} (slow >= {self.slow_seconds * 1000:.0f} ms)")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._repeated.clear()
+
+    def start(self) -> Optional[RequestProfile]:
+        return RequestProfile() if self.enabled else None
+
+    def finish(self, method: str, route: str, profile: RequestProfile) -> None:
+        duplicates = profile.duplicates()
+        slow = profile.slow(self.slow_seconds)
+        extra = sum(len(runs) - 1 for _, runs in duplicates)
+
+        with self._lock:
+            totals = self._routes.setdefault((method, route), [0, 0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += profile.statements
+            totals[2] += extra
+            totals[3] += len(slow)
+            totals[4] += profile.db_seconds
+            repeated = self._repeated.setdefault((method, route), {})
+            for sql, runs in duplicates:
+                repeated[sql] = repeated.get(sql, 0) + len(runs) - 1
+
+        if not duplicates and not slow:
+            return
+        offenders = [(sum(runs), f"{len(runs)}x", sql) for sql, runs in duplicates]
+        offenders += [(s, "slow", sql) for sql, s in slow]
+        offenders.sort(key=lambda o: o[0], reverse=True)
+        lines = [
+            f"🐢 {method} {route}: {profile.statements} statements, {profile.db_seconds * 1000:.1f} ms in DB, "
+            f"{extra} duplicate, {len(slow)} slow"
+        ]
+        lines += [f"    {kind:>5} {seconds * 1000:7.1f} ms  {_short(sql)}" for seconds, kind, sql in offenders[:QUERY_PROFILE_TOP]]
+        print("\n".join(lines))
+
+    def report(self, limit: int = 20) -> List[dict]:
+        """Routes by duplicate statements, then statements per request."""
+        with self._lock:
+            items = [(key, list(totals), dict(self._repeated.get(key, {}))) for key, totals in self._routes.items()]
+        rows = []
+        for (method, route), (requests, statements, duplicates, slow, db_seconds), repeated in items:
+            rows.append({
+                "method": method,
+                "route": route,
+                "requests": requests,
+                "statementsPerRequest": round(statements / requests, 2),
+                "duplicatesPerRequest": round(duplicates / requests, 2),
+                "slowStatements": slow,
+                "dbMsPerRequest": round(db_seconds * 1000 / requests, 2),
+                "repeated": [
+                    {"statement": _short(sql), "extraRuns": n}
+                    for sql, n in sorted(repeated.items(), key=lambda r: r[1], reverse=True)[:QUERY_PROFILE_TOP]
+                ],
+            })
+        rows.sort(key=lambda r: (r["duplicatesPerRequest"], r["statementsPerRequest"]), reverse=True)
+        return rows[:limit]
+
+
+profiler = QueryProfiler()
@@ -0,0 +1,144 @@
+# api/monitoring/request_metrics.py
+"""
+Per-route request metrics (GET /metrics).
+
+    dharma_http_requests_total{method, route, status}
+    dharma_http_request_seconds{method, route}          latency histogram
+    dharma_http_requests_in_flight
+    dharma_http_request_db_queries{method, route}       statements per request
+    dharma_http_request_db_seconds{method, route}       time in the database per request
+
+`route` is the path template ("/bookings/{booking_id}"), so ids in the URL
+do not create a series each; requests that match no route share
+"<unmatched>". Latency runs until the response body is sent, so streaming
+routes (/slots/stream, /bookings/export) report their connection time.
+
+Database time comes from cursor events on the engines (track_queries). The
+request's counters travel in a context variable, which reaches threadpool
+routes and the async engine's greenlets; statements outside a request
+(background threads) are not counted.
+
+With query profiling on (query_profiler.py) the same events also record
+each statement for the request's Server-Timing header.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from api.monitoring import metrics
+from api.monitoring.query_profiler import RequestProfile, profiler
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUESTS = metrics.counter("dharma_http_requests_total", "HTTP requests", ["method", "route", "status"])
+LATENCY = metrics.histogram("dharma_http_request_seconds", "HTTP request latency", ["method", "route"])
+IN_FLIGHT = metrics.gauge("dharma_http_requests_in_flight", "HTTP requests being served")
+DB_QUERIES = metrics.histogram(
+    "dharma_http_request_db_queries", "SQL statements per HTTP request", ["method", "route"], buckets=QUERY_BUCKETS
+)
+DB_SECONDS = metrics.histogram("dharma_http_request_db_seconds", "Database time per HTTP request", ["method", "route"])
+
+UNMATCHED = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "profile")
+
+    def __init__(self, profile: Optional[RequestProfile] = None):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.profile = profile      # statement detail, only while query profiling is on
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    """Database counters of the request being served, None outside a request."""
+    return _current.get()
+
+
+# ---------------------------------------------------------
+# Cursor events
+# ---------------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._request_metrics_started = time.perf_counter()
+    return statement, parameters
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        elapsed = time.perf_counter() - context._request_metrics_started
+        stats.db_seconds += elapsed
+        stats.queries += 1
+        if stats.profile is not None:
+            stats.profile.record(statement, parameters, elapsed)
+
+
+def track_queries(*engines) -> None:
+    """Count statements and database time per request on these (sync) engines."""
+    for engine in engines:
+        if engine is None or event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            continue
+        # retval=True: called as is, without SQLAlchemy's pass-through wrapper
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute, retval=True)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------------------------------------------------------
+# Middleware (plain ASGI: no per-request task, streams untouched)
+# ---------------------------------------------------------
+def route_template(scope, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    mounted = scope.get("root_path", "")
+    if mounted != root_path:         # a Mount (e.g. /static) rewrote root_path
+        return mounted[len(root_path):]
+    return UNMATCHED
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        status = 500
+        stats = RequestStats(profiler.start())
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats.profile is not None:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.profile.server_timing(profiler.slow_seconds)
+                    )
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            _current.reset(token)
+            method, route = scope["method"], route_template(scope, root_path)
+            REQUESTS.inc(method=method, route=route, status=status)
+            LATENCY.observe(elapsed, method=method, route=route)
+            DB_QUERIES.observe(stats.queries, method=method, route=route)
+            DB_SECONDS.observe(stats.db_seconds, method=method, route=route)
+            if stats.profile is not None:
+                profiler.finish(method, route, stats.profile)
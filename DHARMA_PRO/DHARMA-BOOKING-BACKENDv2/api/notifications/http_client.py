@@ -0,0 +1,194 @@
+# api/notifications/http_client.py
+"""
+Shared, application-lifetime async HTTP client for outbound integrations
+(SMS relay today; any future notification provider).
+
+* one httpx.AsyncClient with keep-alive pooling (started/stopped in lifespan)
+* connect / read / write / pool timeouts
+* per-host concurrency limit (asyncio.Semaphore per host)
+* per-host circuit breaker: opens after HTTP_BREAKER_FAILURES consecutive
+  failures, fails fast for HTTP_BREAKER_RESET_SECONDS, then lets one trial
+  request through (half-open)
+* metrics on /metrics: latency, outcomes, in-flight, queued, breaker state
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from api.monitoring import metrics
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5"))
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_RESET_SECONDS = float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+
+REQUEST_SECONDS = metrics.histogram(
+    "dharma_http_client_request_seconds", "Outbound HTTP request latency", ["host"]
+)
+QUEUE_SECONDS = metrics.histogram(
+    "dharma_http_client_queue_seconds", "Time spent waiting for a per-host slot", ["host"]
+)
+REQUESTS = metrics.counter(
+    "dharma_http_client_requests_total", "Outbound HTTP requests by outcome", ["host", "outcome"]
+)
+IN_FLIGHT = metrics.gauge("dharma_http_client_in_flight", "Outbound requests in flight", ["host"])
+QUEUED = metrics.gauge("dharma_http_client_queued", "Outbound requests waiting for a per-host slot", ["host"])
+BREAKER_STATE = metrics.gauge(
+    "dharma_http_client_circuit_state", "Circuit breaker state (0=closed, 1=half-open, 2=open)", ["host"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+# ---------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold: int = HTTP_BREAKER_FAILURES, reset_seconds: float = HTTP_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self._trial_in_flight = False
+
+    def is_open(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight)
+
+    def allow(self) -> bool:
+        if self.is_open():
+            return False
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = self.CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    host = _host(url)
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker()
+    return breaker
+
+
+def is_circuit_open(url: str) -> bool:
+    return breaker_for(url).is_open()
+
+
+# ---------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------
+def start() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=HTTP_CONNECT_TIMEOUT,
+                read=HTTP_READ_TIMEOUT,
+                write=HTTP_READ_TIMEOUT,
+                pool=HTTP_CONNECT_TIMEOUT,
+            ),
+        )
+    return _client
+
+
+async def stop() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _semaphores.clear()
+
+
+# ---------------------------------------------------------
+# Requests
+# ---------------------------------------------------------
+async def post_json(url: str, payload: dict) -> httpx.Response:
+    """
+    POST JSON through the shared client. Raises CircuitOpenError when the host
+    is failing, httpx.HTTPError on transport errors/timeouts. 5xx responses are
+    returned but count as failures for the breaker.
+    """
+    client = start()
+    host = _host(url)
+    breaker = breaker_for(url)
+
+    if not breaker.allow():
+        REQUESTS.inc(host=host, outcome="circuit_open")
+        BREAKER_STATE.set(breaker.state, host=host)
+        raise CircuitOpenError(f"Circuit open for {host}")
+
+    semaphore = _semaphores.get(host)
+    if semaphore is None:
+        semaphore = _semaphores[host] = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+
+    queued_at = time.perf_counter()
+    QUEUED.inc(host=host)
+    try:
+        await semaphore.acquire()
+    finally:
+        QUEUED.dec(host=host)
+    QUEUE_SECONDS.observe(time.perf_counter() - queued_at, host=host)
+
+    IN_FLIGHT.inc(host=host)
+    started = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+    except httpx.HTTPError as e:
+        breaker.record_failure()
+        REQUESTS.inc(host=host, outcome=type(e).__name__)
+        BREAKER_STATE.set(breaker.state, host=host)
+        raise
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, host=host)
+        IN_FLIGHT.dec(host=host)
+        semaphore.release()
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    REQUESTS.inc(host=host, outcome=f"{response.status_code // 100}xx")
+    BREAKER_STATE.set(breaker.state, host=host)
+    return response
@@ -0,0 +1,205 @@
+# api/notifications/sms_outbox.py
+"""
+Durable SMS outbox.
+
+Request handlers call enqueue_sms() before committing, so the SMSLog row is
+written in the same transaction as the booking, then wake() after the commit.
+A background asyncio task drains due rows in batches, posts them to the SMS
+relay (env URL) through the shared pooled client (http_client.py) and
+records the outcome:
+
+    PENDING --claim--> SENDING --2xx--> SENT
+                          |--error--> PENDING (nextAttemptAt = now + backoff)
+                          '--error, attempts >= SMS_MAX_ATTEMPTS--> FAILED
+
+A claimed row's nextAttemptAt doubles as a visibility timeout: if the process
+dies mid-send the row is claimed again once it expires (at-least-once delivery).
+
+Nothing is claimed while the relay's circuit breaker is open, and only one
+row while it is half-open (it lets a single trial through). A row the
+breaker still refused goes back to PENDING with its attempt refunded.
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from api.notifications import http_client
+from database.database import SessionLocal
+from database.models.common.sms_model import SMSLog
+
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", "50"))
+SMS_MAX_ATTEMPTS = int(os.getenv("SMS_MAX_ATTEMPTS", "5"))
+SMS_BACKOFF_SECONDS = float(os.getenv("SMS_BACKOFF_SECONDS", "2"))
+SMS_POLL_SECONDS = float(os.getenv("SMS_POLL_SECONDS", "1"))
+SMS_CLAIM_SECONDS = float(os.getenv("SMS_CLAIM_SECONDS", "30"))   # visibility timeout
+
+_task: Optional[asyncio.Task] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_wake_event: Optional[asyncio.Event] = None
+_warned_no_url = False
+
+CIRCUIT_OPEN = "circuit open"   # _post() result: not sent, the attempt does not count
+
+
+# ---------------------------------------------------------
+# Producer side (called from request handlers)
+# ---------------------------------------------------------
+def enqueue_sms(db: Session, mobile: str, message: str, user_id: Optional[int] = None) -> SMSLog:
+    """Add a PENDING outbox row to the caller's transaction (no commit)."""
+    sms = SMSLog(userId=user_id, mobileNumber=mobile, message=message, status="PENDING", attempts=0)
+    db.add(sms)
+    return sms
+
+
+def wake() -> None:
+    """Nudge the dispatcher after a commit. Safe to call from any thread."""
+    if _loop is not None and _wake_event is not None:
+        _loop.call_soon_threadsafe(_wake_event.set)
+
+
+# ---------------------------------------------------------
+# Dispatcher
+# ---------------------------------------------------------
+def _claim_batch(limit: int) -> List[Tuple[int, str, str, int]]:
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        rows = (
+            db.query(SMSLog)
+            .filter(
+                SMSLog.status.in_(("PENDING", "SENDING")),
+                or_(SMSLog.nextAttemptAt.is_(None), SMSLog.nextAttemptAt <= now),
+            )
+            .order_by(SMSLog.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed = []
+        for row in rows:
+            row.status = "SENDING"
+            row.attempts = (row.attempts or 0) + 1
+            row.nextAttemptAt = now + timedelta(seconds=SMS_CLAIM_SECONDS)
+            claimed.append((row.id, row.mobileNumber, row.message, row.attempts))
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def _record_results(results: List[Tuple[int, int, Optional[str]]]) -> None:
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        for sms_id, attempts, error in results:
+            row = db.get(SMSLog, sms_id)
+            if row is None:
+                continue
+            if error == CIRCUIT_OPEN:
+                row.status = "PENDING"
+                row.attempts = attempts - 1
+                row.nextAttemptAt = None
+            elif error is None:
+                row.status = "SENT"
+                row.sentAt = now
+                row.lastError = None
+                row.nextAttemptAt = None
+            elif attempts >= SMS_MAX_ATTEMPTS:
+                row.status = "FAILED"
+                row.lastError = error
+                row.nextAttemptAt = None
+            else:
+                backoff = SMS_BACKOFF_SECONDS * (2 ** (attempts - 1))
+                row.status = "PENDING"
+                row.lastError = error
+                row.nextAttemptAt = now + timedelta(seconds=backoff * random.uniform(0.8, 1.2))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _post(url: str, mobile: str, message: str) -> Optional[str]:
+    """Send one SMS through the relay (shared pooled client). Returns an error string or None."""
+    try:
+        response = await http_client.post_json(url, {"mobile": mobile, "message": message})
+        if response.status_code >= 400:
+            return f"HTTP {response.status_code}: {response.text[:200]}"
+        return None
+    except http_client.CircuitOpenError:
+        return CIRCUIT_OPEN
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+async def dispatch_once(limit: int = SMS_BATCH_SIZE) -> int:
+    """Claim and send one batch of due messages. Returns how many were sent/attempted."""
+    global _warned_no_url
+    url = os.getenv("URL")
+    if not url:
+        if not _warned_no_url:
+            print("⚠️ SMS relay URL not configured; messages stay queued in sms_logs")
+            _warned_no_url = True
+        return 0
+
+    # Relay is failing: leave rows queued instead of burning their attempts
+    breaker = http_client.breaker_for(url)
+    if breaker.is_open():
+        return 0
+    if breaker.state == breaker.HALF_OPEN:
+        limit = 1   # one trial request
+
+    batch = await asyncio.to_thread(_claim_batch, limit)
+    if not batch:
+        return 0
+
+    errors = await asyncio.gather(*(_post(url, mobile, message) for _, mobile, message, _ in batch))
+    results = [(sms_id, attempts, error) for (sms_id, _, _, attempts), error in zip(batch, errors)]
+    await asyncio.to_thread(_record_results, results)
+
+    failed = sum(1 for error in errors if error and error != CIRCUIT_OPEN)
+    if failed:
+        print(f"SMS dispatcher: {failed}/{len(batch)} failed, will retry")
+    return len(batch)
+
+
+async def _run() -> None:
+    while True:
+        _wake_event.clear()
+        try:
+            sent = await dispatch_once()
+        except Exception as e:
+            print("❌ SMS dispatcher error:", e)
+            sent = 0
+
+        if sent >= SMS_BATCH_SIZE:
+            continue   # backlog: keep draining
+        try:
+            await asyncio.wait_for(_wake_event.wait(), timeout=SMS_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start() -> None:
+    global _task, _loop, _wake_event
+    if _task is not None:
+        return
+    _loop = asyncio.get_running_loop()
+    _wake_event = asyncio.Event()
+    _task = _loop.create_task(_run())
+
+
+async def stop() -> None:
+    global _task, _loop, _wake_event
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = _loop = _wake_event = None
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from pydantic import BaseModel
 
-from database.get_db import get_db
+from database.get_db import get_async_db
 from database.models.payment.payment_model import Payment
 from database.models.booking.booking_model import Booking
 from database.schemas.payment.payment_schema import PaymentCreate, PaymentResponse
@@ -16,7 +16,11 @@ router = APIRouter(prefix="/payment", tags=["Payment"])
 # Create Payment (initial pending record)
 # ---------------------------------------------------------
 @router.post("/create", response_model=PaymentResponse)
-def create_payment(payload: PaymentCreate, db: Session = Depends(get_db)):
+async def create_payment(payload: PaymentCreate, db=Depends(get_async_db)):
+    return await db.run_sync(_create_payment, payload)
+
+
+def _create_payment(db: Session, payload: PaymentCreate):
 
     booking = db.query(Booking).filter(Booking.bookingId == payload.bookingId).first()
     if not booking:
@@ -53,9 +57,14 @@ class WebhookPayload(BaseModel):
 @router.post("/webhook")
 async def gateway_webhook(
     payload: WebhookPayload,
-    db: Session = Depends(get_db),
+    db=Depends(get_async_db),
     x_gateway_sig: str | None = Header(None),   # optional validation header
 ):
+    # ORM work off the event loop (it used to run here, blocking every request)
+    return await db.run_sync(_apply_webhook, payload)
+
+
+def _apply_webhook(db: Session, payload: WebhookPayload):
 
     # Fetch payment row
     payment = (
@@ -84,7 +93,7 @@ async def gateway_webhook(
         # Fetch associated booking
         booking = db.query(Booking).filter(Booking.bookingId == payment.bookingId).first()
 
-        # Generate Ticket
+        # Generate Ticket (row now, image rendered by the ticket_renderer pool)
         try:
             from api.payments.ticket_service import create_ticket_and_persist
             ticket_info = create_ticket_and_persist(
@@ -106,7 +115,8 @@ async def gateway_webhook(
             "ticket": ticket_info,
             "error": error_msg if not ticket_info else None,
             "ticket_url": ticket_info.get("ticket_url") if ticket_info else None,
-            "image_url": ticket_info.get("image_url") if ticket_info else None
+            "image_url": ticket_info.get("image_url") if ticket_info else None,
+            "image_status": ticket_info.get("image_status") if ticket_info else None,
         }
 
 
@@ -126,8 +136,8 @@ async def gateway_webhook(
 # Get Payment By ID
 # ---------------------------------------------------------
 @router.get("/{payment_id}", response_model=PaymentResponse)
-def get_payment(payment_id: int, db: Session = Depends(get_db)):
-    p = db.query(Payment).filter(Payment.paymentId == payment_id).first()
+async def get_payment(payment_id: int, db=Depends(get_async_db)):
+    p = await db.run_sync(lambda db: db.query(Payment).filter(Payment.paymentId == payment_id).first())
     if not p:
         raise HTTPException(status_code=404, detail="Payment not found")
     return p
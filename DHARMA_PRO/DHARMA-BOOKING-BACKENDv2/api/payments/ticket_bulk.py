@@ -0,0 +1,157 @@
+# api/payments/ticket_bulk.py
+"""
+Bulk ticket pre-generation for kiosk and festival batches.
+
+Given a temple + day or an explicit list of booking ids, make sure every
+booking has a Ticket row (creating the missing ones in a single commit) and
+print them all into one multi-page PDF:
+
+    1 query   count of matching bookings (TICKET_BULK_MAX checked before loading)
+    1 query   bookings with slot / temple / user / participants / payment
+    1 query   existing tickets for those bookings
+    1 commit  new Ticket rows (extract_ticket_fields + ticket_row)
+    pool      per-page QR content streams, spread over the render workers
+    1 pass    PDF bundle, each template embedded once (ticket_vector)
+
+Only admissible bookings get tickets: ONLINE bookings with a confirmed
+payment, and OFFLINE (counter / kiosk) bookings, which have no online
+payment, unless one was cancelled. Unpaid ONLINE bookings are skipped.
+"""
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from api.payments import ticket_renderer, ticket_vector
+from api.payments.ticket_service import (
+    _qr_url,
+    extract_ticket_fields,
+    template_cache,
+    ticket_fields_from_row,
+    ticket_row,
+)
+from database.models.booking.booking_model import Booking
+from database.models.common.ticket_model import Ticket
+from database.models.payment.payment_model import Payment
+
+TICKET_BULK_MAX = int(os.getenv("TICKET_BULK_MAX", "5000"))
+
+
+class BulkLimitExceeded(ValueError):
+    pass
+
+
+def select_bookings(
+    db: Session,
+    *,
+    temple_id: Optional[int] = None,
+    day: Optional[date] = None,
+    booking_ids: Optional[List[int]] = None,
+    limit: Optional[int] = None,
+) -> List[Booking]:
+    """
+    Bookings for temple_id on `day`, or the given ids, with everything a
+    ticket reads preloaded. Raises BulkLimitExceeded above `limit`, after
+    counting and before loading anything.
+    """
+    query = (
+        db.query(Booking)
+        .outerjoin(Payment, Payment.bookingId == Booking.bookingId)
+        .filter(or_(
+            Payment.paymentStatus == "confirmed",
+            and_(
+                Booking.bookingType == "OFFLINE",
+                or_(Payment.paymentStatus.is_(None), Payment.paymentStatus != "cancelled"),
+            ),
+        ))
+    )
+    if booking_ids:
+        query = query.filter(Booking.bookingId.in_(booking_ids))
+    else:
+        start = datetime.combine(day, datetime.min.time())
+        query = query.filter(
+            Booking.templeId == temple_id,
+            Booking.bookingDate >= start,
+            Booking.bookingDate < start + timedelta(days=1),
+        )
+
+    if limit is not None:
+        total = query.with_entities(func.count(Booking.bookingId)).scalar()
+        if total > limit:
+            raise BulkLimitExceeded(f"{total} bookings in batch (max {limit})")
+
+    return (
+        query.options(
+            joinedload(Booking.slot),
+            joinedload(Booking.temple),
+            joinedload(Booking.user),
+            joinedload(Booking.payment),
+            selectinload(Booking.participants),
+        )
+        .order_by(Booking.slotId, Booking.bookingId)
+        .all()
+    )
+
+
+def ensure_tickets(db: Session, bookings: List[Booking]) -> Tuple[List[Dict[str, Any]], int]:
+    """Ticket fields for each booking (in order), creating missing rows. Returns (fields, created)."""
+    ids = [b.bookingId for b in bookings]
+    existing: Dict[int, Ticket] = {}
+    for ticket in db.query(Ticket).filter(Ticket.booking_id.in_(ids)).order_by(Ticket.created_at):
+        existing.setdefault(ticket.booking_id, ticket)   # oldest ticket wins, as in the webhook flow
+
+    fields_list, new_rows = [], []
+    for booking in bookings:
+        ticket = existing.get(booking.bookingId)
+        if ticket is not None:
+            fields_list.append(ticket_fields_from_row(ticket, booking.templeId))
+            continue
+        fields = extract_ticket_fields(booking, booking.payment, {"batch": True})
+        new_rows.append(ticket_row(booking, fields))
+        fields_list.append(fields)
+
+    if new_rows:
+        db.add_all(new_rows)
+        db.commit()
+    return fields_list, len(new_rows)
+
+
+def bundle_pdf(fields_list: List[Dict[str, Any]]) -> bytes:
+    """Multi-page PDF for fields_list; QR pages are built in the render pool."""
+    urls, heights, scales = [], [], []
+    for fields in fields_list:
+        k, _, page_h = ticket_vector.page_scale(*template_cache.size(fields.get("temple_id")))
+        urls.append(_qr_url(fields))
+        heights.append(page_h)
+        scales.append(k)
+    qr_ops = ticket_renderer.map_in_pool(ticket_vector.qr_page_ops, urls, heights, scales)
+    return ticket_vector.tickets_pdf(fields_list, qr_ops)
+
+
+def generate(
+    db: Session,
+    *,
+    temple_id: Optional[int] = None,
+    day: Optional[date] = None,
+    booking_ids: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Tickets for a batch as one PDF. Blocks (rendering), so call it from a
+    worker thread. Raises BulkLimitExceeded above TICKET_BULK_MAX bookings.
+    """
+    started = time.perf_counter()
+    bookings = select_bookings(db, temple_id=temple_id, day=day, booking_ids=booking_ids, limit=TICKET_BULK_MAX)
+
+    fields_list, created = ensure_tickets(db, bookings)
+    pdf = bundle_pdf(fields_list) if fields_list else b""
+    seconds = time.perf_counter() - started
+    return {
+        "pdf": pdf,
+        "count": len(fields_list),
+        "created": created,
+        "seconds": seconds,
+        "tickets_per_second": len(fields_list) / seconds if seconds else 0.0,
+    }
@@ -0,0 +1,129 @@
+# api/payments/ticket_image_cache.py
+"""
+Bounded on-disk LRU cache for rendered ticket images (png / svg / pdf).
+
+Files are named <ticket_id>-<etag>.<format>, where the etag covers everything
+the file depends on (the URL in the QR code: FRONTEND_URL + ticket id +
+token, template file + mtime, format and RENDER_VERSION), so a changed template simply produces a new file and the
+old one ages out.
+
+The directory lives outside /static on purpose: images are only served
+through /ticket/{id}/image, which checks the ticket token.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from api.monitoring import metrics
+from api.payments.ticket_service import _qr_url, template_cache
+
+TICKET_IMAGE_CACHE_DIR = os.getenv("TICKET_IMAGE_CACHE_DIR", os.path.join("cache", "tickets"))
+TICKET_IMAGE_CACHE_MAX_MB = float(os.getenv("TICKET_IMAGE_CACHE_MAX_MB", "512"))
+
+# Bump when the ticket layout or QR drawing changes (invalidates every file)
+RENDER_VERSION = "2"
+
+FORMATS = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+LOOKUPS = metrics.counter("dharma_ticket_image_cache_lookups_total", "Ticket image cache lookups", ["result"])
+CACHE_BYTES = metrics.gauge("dharma_ticket_image_cache_bytes", "Bytes held by the ticket image cache")
+
+
+class DiskLRU:
+    """
+    Size-bounded directory of files, evicting least recently used first.
+    Recency survives restarts through file mtimes (touched on every hit).
+    Files written by other processes are picked up on first lookup.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()   # name -> size
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+        CACHE_BYTES.set(self._total)
+
+    def get(self, name: str) -> Optional[str]:
+        """Path of a cached file (marked most recently used), or None."""
+        path = self.path(name)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if name in self._entries:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    # evicted by another worker process
+                    self._total -= self._entries.pop(name)
+                    LOOKUPS.inc(result="miss")
+                    return None
+                self._entries.move_to_end(name)
+                LOOKUPS.inc(result="hit")
+                return path
+        if os.path.exists(path):
+            self.add(name)
+            LOOKUPS.inc(result="hit")
+            return path
+        LOOKUPS.inc(result="miss")
+        return None
+
+    def add(self, name: str) -> None:
+        """Register a file just written to the cache directory."""
+        try:
+            size = os.path.getsize(self.path(name))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._total -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._total += size
+            self._evict()
+
+
+image_cache = DiskLRU(TICKET_IMAGE_CACHE_DIR, int(TICKET_IMAGE_CACHE_MAX_MB * 1024 * 1024))
+
+
+def etag_for(fields: Dict[str, Any], fmt: str = "png") -> str:
+    """Content hash of a ticket image, computed without rendering it."""
+    template = template_cache.path_for(fields.get("temple_id"))
+    try:
+        mtime = os.stat(template).st_mtime
+    except FileNotFoundError:
+        mtime = 0
+    key = f"{RENDER_VERSION}:{fmt}:{_qr_url(fields)}:{template}:{mtime}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def name_for(fields: Dict[str, Any], etag: str, fmt: str = "png") -> str:
+    return f"{fields['id']}-{etag}.{fmt}"
@@ -0,0 +1,254 @@
+# api/payments/ticket_renderer.py
+"""
+Ticket image rendering off the event loop.
+
+The CPU-bound Pillow/qrcode work runs in a process pool and writes into the
+ticket image cache (ticket_image_cache.py). Two entry points:
+
+* render(fields, fmt) - on demand, for /ticket/{id}/image: returns the cached
+  file, rendering it first if needed (concurrent requests for one ticket share a
+  single render).
+* submit(fields) - eager pre-render after payment (TICKET_PRERENDER=true).
+* map_in_pool(fn, items) - bulk jobs (ticket_bulk.py) fan pure functions out
+  across every worker.
+  The Ticket row is committed with image_status PENDING and a done-callback
+  records the outcome:
+
+    PENDING --rendered--> READY
+            '--error----> FAILED
+
+start() re-submits rows a previous process left PENDING (crash / restart).
+TICKET_RENDER_MODE=inline renders in the calling thread instead (useful for
+one-off scripts and as a benchmark baseline).
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from api.monitoring import metrics
+from api.payments import ticket_image_cache
+from api.payments.ticket_service import ticket_fields_from_row
+from database.database import SessionLocal
+from database.models.booking.booking_model import Booking
+from database.models.common.ticket_model import Ticket
+
+TICKET_RENDER_MODE = os.getenv("TICKET_RENDER_MODE", "pool")   # pool | inline
+TICKET_RENDER_WORKERS = int(os.getenv("TICKET_RENDER_WORKERS", "0")) or (os.cpu_count() or 1)
+TICKET_PRERENDER = os.getenv("TICKET_PRERENDER", "false").lower() in ("1", "true", "yes")
+
+RENDERS = metrics.counter("dharma_ticket_renders_total", "Ticket images rendered by outcome", ["status"])
+RENDER_SECONDS = metrics.histogram("dharma_ticket_render_seconds", "Ticket image render time (submit to done)")
+QUEUED = metrics.gauge("dharma_ticket_renders_queued", "Ticket images waiting for or being rendered")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_inflight: Dict[str, Future] = {}   # cache file name -> render in progress
+
+
+def _init_worker() -> None:
+    """Pool initializer: decode ticket templates once per worker process."""
+    from api.payments.ticket_service import warm_template_cache
+    warm_template_cache()
+
+
+def _render(fields: Dict[str, Any], outpath: str, fmt: str = "png") -> str:
+    """Worker entry point (runs in a pool process). Writes outpath atomically."""
+    tmp = f"{outpath}.{os.getpid()}.tmp"
+    if fmt == "png":
+        from api.payments.ticket_service import _compose_ticket_image
+        _compose_ticket_image(fields, tmp)
+    else:
+        from api.payments import ticket_vector
+        data = ticket_vector.ticket_svg(fields).encode() if fmt == "svg" else ticket_vector.ticket_pdf(fields)
+        with open(tmp, "wb") as f:
+            f.write(data)
+    os.replace(tmp, outpath)
+    return outpath
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the API process runs background threads
+            # (SMS dispatcher, hot-slot reconciler) that must not be forked
+            _pool = ProcessPoolExecutor(
+                max_workers=TICKET_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def _pool_submit(fields: Dict[str, Any], outpath: str, fmt: str) -> Future:
+    global _pool
+    try:
+        return _get_pool().submit(_render, fields, outpath, fmt)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); replace the pool and try once more
+        with _lock:
+            _pool = None
+        return _get_pool().submit(_render, fields, outpath, fmt)
+
+
+def _copy_result(source: Future, target: Future) -> None:
+    if source.exception() is None:
+        target.set_result(source.result())
+    else:
+        target.set_exception(source.exception())
+
+
+def _start_render(fields: Dict[str, Any], name: str, fmt: str = "png") -> Future:
+    """Future for rendering cache file `name`, shared with a render already running."""
+    with _lock:
+        future = _inflight.get(name)
+        if future is not None:
+            return future
+        future = _inflight[name] = Future()
+
+    outpath = ticket_image_cache.image_cache.path(name)
+    started = time.perf_counter()
+    QUEUED.inc()
+    future.add_done_callback(lambda f: _finish_render(name, started, f))
+
+    os.makedirs(os.path.dirname(outpath), exist_ok=True)
+    if TICKET_RENDER_MODE == "inline":
+        try:
+            future.set_result(_render(fields, outpath, fmt))
+        except Exception as e:
+            future.set_exception(e)
+    else:
+        try:
+            _pool_submit(fields, outpath, fmt).add_done_callback(lambda f: _copy_result(f, future))
+        except Exception as e:
+            future.set_exception(e)
+    return future
+
+
+def _finish_render(name: str, started: float, future: Future) -> None:
+    with _lock:
+        _inflight.pop(name, None)
+    QUEUED.dec()
+    RENDER_SECONDS.observe(time.perf_counter() - started)
+    if future.exception() is None:
+        ticket_image_cache.image_cache.add(name)
+        RENDERS.inc(status="READY")
+    else:
+        RENDERS.inc(status="FAILED")
+
+
+# ---------------------------------------------------------
+# On demand
+# ---------------------------------------------------------
+def render(fields: Dict[str, Any], fmt: str = "png") -> Tuple[str, str]:
+    """
+    Path of the ticket image (png | svg | pdf) in the image cache, rendering
+    it if missing. Blocks until ready, so call it from a worker thread (sync
+    route). Returns (path, etag).
+    """
+    etag = ticket_image_cache.etag_for(fields, fmt)
+    name = ticket_image_cache.name_for(fields, etag, fmt)
+    path = ticket_image_cache.image_cache.get(name)
+    if path is None:
+        path = _start_render(fields, name, fmt).result()
+    return path, etag
+
+
+# ---------------------------------------------------------
+# Bulk
+# ---------------------------------------------------------
+def map_in_pool(fn: Callable, *iterables: Iterable) -> List[Any]:
+    """
+    map() over the render pool, results in input order. fn must be a
+    module-level (picklable) function. Blocks; call from a worker thread.
+    """
+    if TICKET_RENDER_MODE == "inline":
+        return list(map(fn, *iterables))
+    items = [list(it) for it in iterables]
+    count = len(items[0]) if items else 0
+    chunksize = max(1, count // (TICKET_RENDER_WORKERS * 4))
+    return list(_get_pool().map(fn, *items, chunksize=chunksize))
+
+
+# ---------------------------------------------------------
+# Eager pre-render
+# ---------------------------------------------------------
+def _mark(ticket_id: str, status: str, image_path: Optional[str] = None) -> None:
+    db = SessionLocal()
+    try:
+        values = {"image_status": status}
+        if image_path:
+            values["image_path"] = image_path
+        db.query(Ticket).filter(Ticket.id == ticket_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _on_prerendered(ticket_id: str, future: Future) -> None:
+    try:
+        if future.exception() is None:
+            _mark(ticket_id, "READY", future.result())
+        else:
+            print(f"❌ Ticket image render failed for {ticket_id}:", future.exception())
+            _mark(ticket_id, "FAILED")
+    except Exception as e:
+        print(f"❌ Could not record render result for {ticket_id}:", e)
+
+
+def submit(fields: Dict[str, Any]) -> str:
+    """
+    Queue rendering for a committed Ticket row. Returns the ticket's
+    image_status after the call (PENDING, or READY/FAILED in inline mode).
+    """
+    etag = ticket_image_cache.etag_for(fields)
+    future = _start_render(fields, ticket_image_cache.name_for(fields, etag))
+    future.add_done_callback(lambda f: _on_prerendered(fields["id"], f))
+    if future.done():
+        return "READY" if future.exception() is None else "FAILED"
+    return "PENDING"
+
+
+def recover() -> int:
+    """Re-submit tickets left PENDING by a previous process. Returns how many."""
+    db = SessionLocal()
+    try:
+        pending = (
+            db.query(Ticket, Booking.templeId)
+            .outerjoin(Booking, Booking.bookingId == Ticket.booking_id)
+            .filter(Ticket.image_status == "PENDING")
+            .all()
+        )
+        fields = [ticket_fields_from_row(t, temple_id) for t, temple_id in pending]
+    finally:
+        db.close()
+    for f in fields:
+        submit(f)
+    if fields:
+        print(f"Ticket renderer: re-queued {len(fields)} pending ticket image(s)")
+    return len(fields)
+
+
+# ---------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------
+def start() -> None:
+    if TICKET_RENDER_MODE == "inline":
+        _init_worker()   # renders happen in this process
+    try:
+        recover()
+    except Exception as e:
+        print("⚠️ Ticket renderer recovery skipped:", e)
+
+
+def stop() -> None:
+    """Finish queued renders (so their rows are not left PENDING) and exit workers."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -2,79 +2,201 @@
 import os
 import uuid
 import json
-from io import BytesIO
+import threading
 from PIL import Image, ImageDraw, ImageFont
 import qrcode
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from database.models.common.ticket_model import Ticket
+from database.models.common.ticket_revocation_model import TicketRevocation
+from api.payments import ticket_tokens
 
 # Config — adjust to your environment
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173") # Default to local Vite
 
 TEMPLATE_PATH = os.path.join("static", "template_ticket_v2.jpg")   # put your sample image here
+TEMPLATE_DIR = os.path.join("static", "ticket_templates")          # optional per-temple: <templeId>.png / .jpg
 OUT_DIR = os.path.join("static", "tickets")
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# Helpers
-def _generate_qr_bytes(data: str, size: int = 300) -> BytesIO:
-    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+
+# ---------------------------------------------------------
+# Template cache
+# ---------------------------------------------------------
+class TemplateCache:
+    """
+    Decoded ticket templates kept in memory as pristine RGBA images.
+    A template is decoded once and again only when its file's mtime changes;
+    get() hands out a copy so callers can draw on it freely.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Image.Image]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, temple_id: Optional[int] = None) -> str:
+        if temple_id is not None:
+            for ext in (".png", ".jpg"):
+                candidate = os.path.join(TEMPLATE_DIR, f"{temple_id}{ext}")
+                if os.path.exists(candidate):
+                    return candidate
+        return TEMPLATE_PATH
+
+    def _base(self, path: str) -> Image.Image:
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            raise RuntimeError(f"Template not found at {path}. Place your template image there.")
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime:
+                with Image.open(path) as img:
+                    entry = (mtime, img.convert("RGBA"))
+                self._entries[path] = entry
+                self.misses += 1
+        return entry[1]
+
+    def get(self, temple_id: Optional[int] = None) -> Image.Image:
+        """Writable RGBA copy of the template for temple_id (or the default)."""
+        return self._base(self.path_for(temple_id)).copy()
+
+    def size(self, temple_id: Optional[int] = None) -> Tuple[int, int]:
+        return self._base(self.path_for(temple_id)).size
+
+    def warm(self) -> None:
+        """Decode the default template and every per-temple template up front."""
+        paths = [TEMPLATE_PATH]
+        if os.path.isdir(TEMPLATE_DIR):
+            paths += [
+                os.path.join(TEMPLATE_DIR, name)
+                for name in sorted(os.listdir(TEMPLATE_DIR))
+                if name.lower().endswith((".png", ".jpg"))
+            ]
+        for path in paths:
+            if os.path.exists(path):
+                self._base(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+template_cache = TemplateCache()
+
+
+def warm_template_cache() -> None:
+    """Render-pool initializer: decode templates before the first ticket."""
+    try:
+        template_cache.warm()
+    except Exception as e:
+        print("⚠️ Ticket template warm-up failed:", e)
+
+
+# ---------------------------------------------------------
+# QR drawing
+# ---------------------------------------------------------
+# QR Code centered in the template's box
+# Box Center: (512, 567)
+# Target QR Size: 520
+# Top Left: (252, 307)
+QR_X, QR_Y, QR_SIZE = 252, 307, 520
+
+def _qr_url(ticket_fields: Dict[str, Any]) -> str:
+    # UPDATED: Point QR to Frontend URL so scanning opens the app
+    return f"{FRONTEND_URL}/ticket/{ticket_fields.get('id') or ''}?t={ticket_fields.get('token')}"
+
+def qr_matrix(data: str) -> List[List[bool]]:
+    """QR module matrix including the quiet zone; True = dark module."""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=4)
     qr.add_data(data)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
-    img = img.resize((size, size))
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
-def _compose_ticket_image(ticket_fields: Dict[str, Any]) -> str:
+    return qr.get_matrix()
+
+def qr_runs(matrix: List[List[bool]]) -> Iterator[Tuple[int, int, int]]:
+    """Horizontal runs of dark modules as (row, first column, length)."""
+    for r, row in enumerate(matrix):
+        c, n = 0, len(row)
+        while c < n:
+            if row[c]:
+                start = c
+                while c < n and row[c]:
+                    c += 1
+                yield r, start, c - start
+            else:
+                c += 1
+
+def _draw_qr(img: Image.Image, matrix: List[List[bool]], x: int, y: int, size: int) -> None:
     """
-    Draws QR on top of TEMPLATE_PATH and saves PNG to OUT_DIR.
-    Returns relative image path (e.g. static/tickets/<filename>.png)
+    Draws the matrix onto img at exactly size x size pixels. Module edges are
+    rounded to whole pixels, so there is no intermediate bitmap or resample.
     """
-    if not os.path.exists(TEMPLATE_PATH):
-        raise RuntimeError(f"Template not found at {TEMPLATE_PATH}. Place your template image there.")
+    n = len(matrix)
+    edge = [round(i * size / n) for i in range(n + 1)]
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((x, y, x + size - 1, y + size - 1), fill="white")
+    for r, c, length in qr_runs(matrix):
+        draw.rectangle(
+            (x + edge[c], y + edge[r], x + edge[c + length] - 1, y + edge[r + 1] - 1),
+            fill="black",
+        )
 
-    base = Image.open(TEMPLATE_PATH).convert("RGBA")
-    # W, H = base.size # Unused now
-    
-    # defensive extraction with defaults
-    booking_no = ticket_fields.get("id") or ""
-    
-    # QR Code centered in the box
-    # Box Center: (512, 567)
-    # Target QR Size: 520
-    # Top Left: (252, 307)
+def _draw_ticket(ticket_fields: Dict[str, Any]) -> Image.Image:
+    """Draws the QR on top of the (cached) template and returns the RGBA image."""
+    base = template_cache.get(ticket_fields.get("temple_id"))
+    _draw_qr(base, qr_matrix(_qr_url(ticket_fields)), QR_X, QR_Y, QR_SIZE)
+    return base
+
+def _compose_ticket_image(ticket_fields: Dict[str, Any], outpath: Optional[str] = None) -> str:
+    """
+    Draws QR on top of the ticket template and saves PNG to outpath
+    (default OUT_DIR/<id>.png). Returns the path written.
+    """
+    base = _draw_ticket(ticket_fields)
 
-    # UPDATED: Point QR to Frontend URL so scanning opens the app
-    qr_url = f"{FRONTEND_URL}/ticket/{booking_no}?t={ticket_fields.get('token')}"
-    
-    qr_size = 520
-    qr_buf = _generate_qr_bytes(qr_url, size=qr_size)
-    qr_img = Image.open(qr_buf).convert("RGBA")
-    
-    qr_x = 252
-    qr_y = 307
-    base.paste(qr_img, (qr_x, qr_y), qr_img)
-    
     # Save
-    filename = f"{booking_no}.png"
-    outpath = os.path.join(OUT_DIR, filename)
+    if outpath is None:
+        outpath = os.path.join(OUT_DIR, f"{ticket_fields.get('id') or ''}.png")
     base.convert("RGB").save(outpath, "PNG", quality=95)
-    return os.path.join("static", "tickets", filename)
+    return outpath
+
+def ticket_fields_from_row(ticket: Ticket, temple_id: Optional[int] = None) -> Dict[str, Any]:
+    """Image composition fields rebuilt from a persisted Ticket row."""
+    try:
+        metadata = json.loads(ticket.metadata_json or "{}")
+    except ValueError:
+        metadata = {}
+    return {
+        "id": ticket.id,
+        "token": ticket.token,
+        "temple_id": temple_id,
+        "booking_datetime": ticket.booking_datetime or "",
+        "txn_id": ticket.txn_id or "",
+        "slot_no": ticket.slot_no or "",
+        "slot_time": ticket.slot_time or "",
+        "metadata": metadata,
+    }
 
-def create_ticket_and_persist(db: Session, *, booking_obj, payment_obj=None, extra: Dict[str,Any]=None) -> Dict[str,Any]:
+def extract_ticket_fields(booking_obj, payment_obj=None, extra: Dict[str,Any]=None, signed: Optional[bool]=None) -> Dict[str,Any]:
     """
-    Create ticket row, generate image and return info dict.
+    Ticket fields (new id + token, slot, date, names, metadata) read from a
+    Booking and its loaded relationships.
     booking_obj: SQLAlchemy Booking instance (we read slot/time/name from it)
     payment_obj: Payment instance (for txn_id)
     extra: optional dict for metadata like count
+    signed: signed offline-verifiable token (ticket_tokens.py); default TICKET_TOKEN_MODE
     """
     ticket_id = (str(uuid.uuid4())[:12]).upper()
-    token = uuid.uuid4().hex
+    token = ticket_tokens.new_token(booking_obj, ticket_id, signed)
     txn_id = getattr(payment_obj, "transactionId", None) or getattr(payment_obj, "transaction_id", None) or ""
 
     # --- Extract Details from Booking Relationship ---
@@ -118,14 +240,15 @@ def create_ticket_and_persist(db: Session, *, booking_obj, payment_obj=None, ext
     booking_dt = str(booking_dt) if booking_dt else ""
     name = str(name) if name else "Devotee"
 
-    metadata = extra or {}
+    metadata = dict(extra or {})
     metadata["count"] = participant_count 
     metadata["participant_names"] = participant_names_str
 
     # image composition fields
-    fields = {
+    return {
         "id": ticket_id,
         "token": token,
+        "temple_id": getattr(booking_obj, "templeId", None),
         "booking_datetime": booking_dt,
         "txn_id": txn_id,
         "slot_no": slot_no,
@@ -136,25 +259,89 @@ def create_ticket_and_persist(db: Session, *, booking_obj, payment_obj=None, ext
         "location": location
     }
 
-    image_path = _compose_ticket_image(fields)
-
-    # persist ticket row
-    db_ticket = Ticket(
-        id=ticket_id,
-        token=token,
+def ticket_row(booking_obj, fields: Dict[str,Any], image_status: str = "ON_DEMAND") -> Ticket:
+    """Unsaved Ticket row for fields produced by extract_ticket_fields()."""
+    return Ticket(
+        id=fields["id"],
+        token=fields["token"],
         booking_id=getattr(booking_obj, "bookingId", None) or getattr(booking_obj, "id", None),
         user_id=getattr(booking_obj, "userId", None) or None,
-        txn_id=txn_id,
-        slot_no=slot_no,
-        slot_time=slot_time,
-        booking_datetime=booking_dt,
-        image_path=image_path,
-        metadata_json=json.dumps(metadata),   # <<-- use metadata_json (not reserved 'metadata')
+        txn_id=fields["txn_id"],
+        slot_no=fields["slot_no"],
+        slot_time=fields["slot_time"],
+        booking_datetime=fields["booking_datetime"],
+        image_path=None,
+        image_status=image_status,
+        metadata_json=json.dumps(fields["metadata"]),   # <<-- use metadata_json (not reserved 'metadata')
     )
-    db.add(db_ticket)
+
+def reissue_signed_tickets(db: Session, booking_obj, reason: Optional[str] = None) -> List[Dict[str,Any]]:
+    """
+    Replace a booking's signed tickets after its slot, date or headcount
+    changed (caller commits). Gates check those claims offline, so the old
+    ids are revoked and each ticket gets a new id and token; tickets revoked
+    before stay revoked. Returns {"ticket_id", "ticket_url"} per new ticket.
+    """
+    booking_id = booking_obj.bookingId
+    tickets = [t for t in db.query(Ticket).filter(Ticket.booking_id == booking_id) if ticket_tokens.is_signed(t.token)]
+    if not tickets:
+        return []
+    already = {
+        row.ticket_id
+        for row in db.query(TicketRevocation.ticket_id).filter(TicketRevocation.ticket_id.in_([t.id for t in tickets]))
+    }
+    ticket_tokens.revoke_booking(db, booking_id, reason)
+
+    reissued = []
+    for old in tickets:
+        if old.id in already:
+            continue
+        try:
+            extra = json.loads(old.metadata_json or "{}")
+        except ValueError:
+            extra = {}
+        fields = extract_ticket_fields(booking_obj, extra=extra, signed=True)
+        fields["txn_id"] = old.txn_id or ""
+        db.delete(old)
+        db.add(ticket_row(booking_obj, fields))
+        reissued.append({
+            "ticket_id": fields["id"],
+            "ticket_url": f"{BASE_URL}/ticket/{fields['id']}?t={fields['token']}",
+        })
+    return reissued
+
+def create_ticket_and_persist(db: Session, *, booking_obj, payment_obj=None, extra: Dict[str,Any]=None, signed: Optional[bool]=None) -> Dict[str,Any]:
+    """
+    Create ticket row and return info dict.
+    booking_obj: SQLAlchemy Booking instance (we read slot/time/name from it)
+    payment_obj: Payment instance (for txn_id)
+    extra: optional dict for metadata like count
+    signed: issue a signed QR token gates can verify offline (default: TICKET_TOKEN_MODE)
+
+    The image is rendered on first view of /ticket/{id}/image (image_status
+    ON_DEMAND). With TICKET_PRERENDER on, it is queued on the ticket_renderer
+    pool instead and image_status moves PENDING -> READY (or FAILED).
+    """
+    from api.payments import ticket_renderer
+
+    fields = extract_ticket_fields(booking_obj, payment_obj, extra, signed)
+    ticket_id, token = fields["id"], fields["token"]
+    prerender = ticket_renderer.TICKET_PRERENDER
+
+    # persist ticket row
+    db.add(ticket_row(booking_obj, fields, "PENDING" if prerender else "ON_DEMAND"))
     db.commit()
 
+    # Render off the request path (row must be committed first)
+    image_status = ticket_renderer.submit(fields) if prerender else "ON_DEMAND"
+
     ticket_url = f"{BASE_URL}/ticket/{ticket_id}?t={token}"
-    image_url = f"{BASE_URL}/{image_path}"
+    image_url = f"{BASE_URL}/ticket/{ticket_id}/image?t={token}"
 
-    return {"ticket_id": ticket_id, "ticket_url": ticket_url, "image_url": image_url, "txn_id": txn_id}
+    return {
+        "ticket_id": ticket_id,
+        "ticket_url": ticket_url,
+        "image_url": image_url,
+        "image_status": image_status,
+        "txn_id": fields["txn_id"],
+    }
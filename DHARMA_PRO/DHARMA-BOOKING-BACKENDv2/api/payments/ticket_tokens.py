@@ -0,0 +1,196 @@
+# api/payments/ticket_tokens.py
+"""
+Ticket tokens.
+
+TICKET_TOKEN_MODE=random (default): Ticket.token is a random hex string and
+checking it needs the Ticket row.
+
+TICKET_TOKEN_MODE=signed: the token is a signed, self-describing QR payload
+
+    <base64url(claims JSON)>.<base64url(signature)>
+
+    i ticket id   b booking id   t temple id   s slot id
+    d booking date (YYYY-MM-DD)  h headcount   e expiry (unix time, end of the booking day)
+
+signed with TICKET_SIGNING_ALG:
+
+* ed25519 - TICKET_SIGNING_KEY is a base64url 32-byte private key
+  (scripts/gen_ticket_signing_key.py). Gate devices only need the public
+  key from GET /ticket/signing-key.
+* hmac    - HMAC-SHA256 with TICKET_SIGNING_KEY as a shared secret that
+  gate devices hold too.
+
+A gate checks signature, expiry and ticket id locally, then looks the id up
+in its copy of the revocation list, polled incrementally from
+GET /ticket/revocations?since=<last id>. Cancelling a booking revokes its
+signed tickets; changing its slot, date or headcount revokes them and issues
+new ones (new ids). The token still goes in the ticket URL (?t=) like a random
+one, so the view / image endpoints work unchanged.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database.models.common.ticket_model import Ticket
+from database.models.common.ticket_revocation_model import TicketRevocation
+
+TICKET_TOKEN_MODE = os.getenv("TICKET_TOKEN_MODE", "random")      # random | signed
+TICKET_SIGNING_ALG = os.getenv("TICKET_SIGNING_ALG", "ed25519")   # ed25519 | hmac
+TICKET_SIGNING_KEY = os.getenv("TICKET_SIGNING_KEY", "")
+
+_ed25519_key = None
+_ed25519_public = None
+_warned_no_key = False
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _private_key():
+    global _ed25519_key
+    if _ed25519_key is None:
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        _ed25519_key = Ed25519PrivateKey.from_private_bytes(_unb64(TICKET_SIGNING_KEY))
+    return _ed25519_key
+
+
+def _public_key():
+    global _ed25519_public
+    if _ed25519_public is None:
+        _ed25519_public = _private_key().public_key()
+    return _ed25519_public
+
+
+# ---------------------------------------------------------
+# Signing / verification
+# ---------------------------------------------------------
+def can_sign() -> bool:
+    return bool(TICKET_SIGNING_KEY)
+
+
+def is_signed(token: str) -> bool:
+    """Signed tokens contain a '.', random hex tokens never do."""
+    return "." in token
+
+
+def _signature(payload: bytes) -> bytes:
+    if TICKET_SIGNING_ALG == "hmac":
+        return hmac.new(TICKET_SIGNING_KEY.encode(), payload, hashlib.sha256).digest()
+    return _private_key().sign(payload)
+
+
+def sign(claims: Dict[str, Any]) -> str:
+    payload = _b64(json.dumps(claims, separators=(",", ":"), sort_keys=True).encode())
+    return f"{payload}.{_b64(_signature(payload.encode('ascii')))}"
+
+
+def decode(token: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Claims of a correctly signed, unexpired token, else None."""
+    try:
+        payload, signature = token.split(".", 1)
+        signature = _unb64(signature)
+        if TICKET_SIGNING_ALG == "hmac":
+            if not hmac.compare_digest(signature, _signature(payload.encode("ascii"))):
+                return None
+        else:
+            _public_key().verify(signature, payload.encode("ascii"))
+        claims = json.loads(_unb64(payload))
+    except Exception:
+        return None
+    if claims.get("e", 0) < (now if now is not None else time.time()):
+        return None
+    return claims
+
+
+def public_key() -> Dict[str, Any]:
+    """What a gate device needs to verify tokens offline (no secret for hmac)."""
+    if TICKET_SIGNING_ALG == "hmac":
+        return {"alg": "HS256", "public_key": None}
+    from cryptography.hazmat.primitives import serialization
+    raw = _public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    return {"alg": "EdDSA", "public_key": _b64(raw)}
+
+
+# ---------------------------------------------------------
+# Issuing
+# ---------------------------------------------------------
+def headcount(booking_obj) -> int:
+    participants = getattr(booking_obj, "participants", None) or []
+    return len(participants) or getattr(booking_obj, "numberOfParticipants", None) or 1
+
+
+def claims_for(booking_obj, ticket_id: str) -> Dict[str, Any]:
+    booking_date = getattr(booking_obj, "bookingDate", None)
+    if isinstance(booking_date, datetime):
+        booking_date = booking_date.date()
+    if isinstance(booking_date, date):
+        expires = datetime.combine(booking_date + timedelta(days=1), datetime.min.time()).timestamp()
+    else:
+        expires = time.time() + 86400
+    return {
+        "i": ticket_id,
+        "b": getattr(booking_obj, "bookingId", None),
+        "t": getattr(booking_obj, "templeId", None),
+        "s": getattr(booking_obj, "slotId", None),
+        "d": booking_date.isoformat() if isinstance(booking_date, date) else None,
+        "h": headcount(booking_obj),
+        "e": int(expires),
+    }
+
+
+def new_token(booking_obj, ticket_id: str, signed: Optional[bool] = None) -> str:
+    """Token for a new ticket: signed if asked to (default: TICKET_TOKEN_MODE) and a key is set."""
+    global _warned_no_key
+    if signed is None:
+        signed = TICKET_TOKEN_MODE == "signed"
+    if signed and not can_sign():
+        if not _warned_no_key:
+            print("⚠️ TICKET_SIGNING_KEY not configured; issuing random ticket tokens")
+            _warned_no_key = True
+        signed = False
+    if signed:
+        return sign(claims_for(booking_obj, ticket_id))
+    return uuid.uuid4().hex
+
+
+# ---------------------------------------------------------
+# Revocation
+# ---------------------------------------------------------
+def revoke(db: Session, ticket_ids: Iterable[str], reason: Optional[str] = None) -> int:
+    """Add revocation rows for tickets not revoked yet (caller commits). Returns how many."""
+    ticket_ids = set(ticket_ids)
+    if not ticket_ids:
+        return 0
+    already = {
+        row.ticket_id
+        for row in db.query(TicketRevocation.ticket_id).filter(TicketRevocation.ticket_id.in_(ticket_ids))
+    }
+    new = [TicketRevocation(ticket_id=ticket_id, reason=reason) for ticket_id in sorted(ticket_ids - already)]
+    db.add_all(new)
+    return len(new)
+
+
+def revoke_booking(db: Session, booking_id: int, reason: Optional[str] = None) -> int:
+    """Revoke the signed tickets of a booking (random tokens die with the booking row)."""
+    tickets = db.query(Ticket.id, Ticket.token).filter(Ticket.booking_id == booking_id).all()
+    return revoke(db, [t.id for t in tickets if is_signed(t.token)], reason)
+
+
+def revocations_since(db: Session, since: int = 0, limit: Optional[int] = None) -> List[TicketRevocation]:
+    query = db.query(TicketRevocation).filter(TicketRevocation.id > since).order_by(TicketRevocation.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
@@ -0,0 +1,143 @@
+# api/payments/ticket_vector.py
+"""
+Printer-friendly ticket output. The template stays raster, but the QR code is
+emitted as vector paths, so it prints crisp at any printer resolution.
+
+    ticket_svg(fields) -> str     template embedded as a data URI
+    ticket_pdf(fields) -> bytes   single page, template embedded as JPEG
+    tickets_pdf([fields, ...])    one page per ticket (bulk print bundles)
+"""
+import base64
+import os
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.payments.ticket_service import (
+    QR_SIZE,
+    QR_X,
+    QR_Y,
+    _qr_url,
+    qr_matrix,
+    qr_runs,
+    template_cache,
+)
+
+# Physical size of the PDF page: template pixels printed at this density
+TICKET_PDF_DPI = float(os.getenv("TICKET_PDF_DPI", "150"))
+
+
+def ticket_svg(fields: Dict[str, Any]) -> str:
+    temple_id = fields.get("temple_id")
+    template = template_cache.path_for(temple_id)
+    width, height = template_cache.size(temple_id)
+    with open(template, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    mime = "image/png" if template.lower().endswith(".png") else "image/jpeg"
+
+    matrix = qr_matrix(_qr_url(fields))
+    n = len(matrix)
+    d = "".join(f"M{c} {r}h{length}v1h-{length}z" for r, c, length in qr_runs(matrix))
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<image width="{width}" height="{height}" xlink:href="data:{mime};base64,{data}"/>'
+        f'<g transform="translate({QR_X} {QR_Y}) scale({QR_SIZE / n:.6f})" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/>'
+        f'<path d="{d}" fill="#000"/>'
+        f"</g></svg>"
+    )
+
+
+def _pdf_stream(header: str, data: bytes) -> bytes:
+    return header.encode("ascii") + b"\nstream\n" + data + b"\nendstream"
+
+
+def page_scale(width: int, height: int):
+    """(points per pixel, page width, page height) for a template size."""
+    k = 72.0 / TICKET_PDF_DPI
+    return k, width * k, height * k
+
+
+def qr_page_ops(url: str, page_h: float, k: float) -> bytes:
+    """
+    PDF content operators drawing the QR for `url` as vector rectangles
+    (PDF user space: points, origin bottom-left). Pure function, so bulk
+    jobs can compute pages in the render pool.
+    """
+    matrix = qr_matrix(url)
+    module = QR_SIZE * k / len(matrix)
+    left, top = QR_X * k, page_h - QR_Y * k
+
+    ops = [
+        f"1 g {left:.3f} {top - QR_SIZE * k:.3f} {QR_SIZE * k:.3f} {QR_SIZE * k:.3f} re f",
+        "0 g",
+    ]
+    ops += [
+        f"{left + c * module:.3f} {top - (r + 1) * module:.3f} {length * module:.3f} {module:.3f} re"
+        for r, c, length in qr_runs(matrix)
+    ]
+    ops.append("f")
+    return "\n".join(ops).encode("ascii")
+
+
+def _template_jpeg(temple_id: Optional[int]) -> Tuple[bytes, int, int]:
+    base = template_cache.get(temple_id).convert("RGB")
+    buf = BytesIO()
+    base.save(buf, "JPEG", quality=92)
+    return buf.getvalue(), base.width, base.height
+
+
+def tickets_pdf(fields_list: List[Dict[str, Any]], qr_ops: Optional[List[bytes]] = None) -> bytes:
+    """
+    One PDF page per ticket. Each distinct template is embedded once and
+    shared by every page that uses it. qr_ops may carry precomputed
+    qr_page_ops() output (one per ticket, in order).
+    """
+    images: Dict[str, Tuple[int, bytes, int, int]] = {}   # template path -> (object no., jpeg, w, h)
+    objects: List[bytes] = [b"", b""]                     # 1: catalog, 2: page tree (filled in below)
+    page_numbers = []
+
+    for i, fields in enumerate(fields_list):
+        temple_id = fields.get("temple_id")
+        template = template_cache.path_for(temple_id)
+        if template not in images:
+            jpeg, width, height = _template_jpeg(temple_id)
+            objects.append(_pdf_stream(
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceRGB "
+                f"/BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpeg)} >>",
+                jpeg,
+            ))
+            images[template] = (len(objects), jpeg, width, height)
+        image_no, _, width, height = images[template]
+
+        k, page_w, page_h = page_scale(width, height)
+        ops = qr_ops[i] if qr_ops is not None else qr_page_ops(_qr_url(fields), page_h, k)
+        content = f"q {page_w:.2f} 0 0 {page_h:.2f} 0 0 cm /Im0 Do Q\n".encode("ascii") + ops
+        objects.append(_pdf_stream(f"<< /Length {len(content)} >>", content))
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w:.2f} {page_h:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_no} 0 R >> >> /Contents {len(objects)} 0 R >>"
+        ).encode("ascii"))
+        page_numbers.append(len(objects))
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{n} 0 R" for n in page_numbers)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>".encode("ascii")
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+    return out.getvalue()
+
+
+def ticket_pdf(fields: Dict[str, Any]) -> bytes:
+    return tickets_pdf([fields])
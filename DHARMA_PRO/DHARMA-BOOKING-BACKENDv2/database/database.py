@@ -1,19 +1,80 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
 
-print("Loading dotenv file")
+from database import pool as db_pools
+
 load_dotenv()
 
 url = os.getenv("DATABASE_URL")
-print(url)
 
-engine = create_engine(url, echo=False)
-print("engine made")
+# Connection pool, per engine (per process). Requests beyond
+# DB_POOL_SIZE + DB_MAX_OVERFLOW wait up to DB_POOL_TIMEOUT seconds for a
+# connection, then fail. Overflow connections are closed as soon as they are
+# returned, so sustained load above DB_POOL_SIZE reconnects constantly: size
+# the pool for the peak instead. Keep workers x (size + overflow) below the
+# server's max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this (seconds), before the server or a
+# proxy drops idle ones; -1 keeps them forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection on checkout. Costs a round trip per checkout; without
+# it a database restart fails the requests that hit a dead connection (the
+# pool is then discarded and reconnects)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+
+
+def pool_options(sync_url, poolclass):
+    """create_engine() pool arguments for DATABASE_URL (in-memory SQLite keeps its single-connection pool)"""
+    u = make_url(sync_url)
+    if u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(url, echo=False, **pool_options(url, db_pools.TimedQueuePool))
+db_pools.instrument(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-print("Session made")
 
 Base = declarative_base()
-print("Base made")
+
+# Async request path (DB_ASYNC=true): `async def` routes reach the same
+# database through an async driver instead of holding a threadpool worker
+# for the whole request (see database/get_db.py: get_async_db)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(sync_url):
+    """DATABASE_URL with its async driver (postgresql -> asyncpg, sqlite -> aiosqlite)"""
+    u = make_url(sync_url)
+    return u.set(drivername=ASYNC_DRIVERS[u.get_backend_name()])
+
+
+async_engine = (
+    create_async_engine(async_url(url), **pool_options(url, db_pools.TimedAsyncQueuePool))
+    if DB_ASYNC else None
+)
+if async_engine is not None:
+    db_pools.instrument(async_engine.sync_engine, "async")
+
+# sync_session_class: the SessionLocal listeners (cache invalidation, slot
+# events, hot-slot confirmation) fire for async sessions too
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, sync_session_class=SessionLocal.class_, autoflush=False)
+    if DB_ASYNC else None
+)
@@ -1,6 +1,15 @@
 # database/get_db.py
 
-from database.database import SessionLocal
+import asyncio
+import time
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exc
+
+from database import pool as db_pools
+from database.database import DB_ASYNC, DB_POOL_TIMEOUT, AsyncSessionLocal, SessionLocal, async_engine
 
 def get_db():
     db = SessionLocal()
@@ -8,3 +17,85 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class ThreadedSession:
+    """
+    A sync session behind AsyncSession's run_sync() interface: each call
+    runs in the threadpool. Used by async routes when DB_ASYNC is off.
+    """
+
+    def __init__(self):
+        self.sync_session = SessionLocal()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        # Not through the shared threadpool limit: with every worker waiting
+        # for a pooled connection, the close that would free one could never
+        # start (as FastAPI does for `def` dependencies)
+        await anyio.to_thread.run_sync(self.sync_session.close, limiter=CapacityLimiter(1))
+
+
+_async_slots = None
+
+
+def _async_session_slots():
+    """
+    One slot per pooled connection, handed out first come first served.
+    The async pool's own wait queue lets newcomers take a returned
+    connection ahead of coroutines already waiting, which under load
+    starves some requests up to the pool timeout. None: unlimited overflow.
+    """
+    global _async_slots
+    if _async_slots is None:
+        pool = async_engine.pool
+        if getattr(pool, "_max_overflow", -1) < 0:
+            return None
+        _async_slots = asyncio.Semaphore(pool.size() + pool._max_overflow)
+    return _async_slots
+
+
+async def _acquire(slots: asyncio.Semaphore) -> None:
+    # The queueing happens here rather than in the pool, so this wait gets
+    # the pool's timeout and shows up in the pool metrics
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(slots.acquire(), DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        db_pools.observer.failure("async_gate", "timeout")
+        raise exc.TimeoutError(
+            f"No database connection free after {DB_POOL_TIMEOUT:.0f} s", code="3o7r"
+        ) from None
+    db_pools.observer.checkout("async_gate", time.perf_counter() - started)
+
+
+async def get_async_db():
+    """
+    Session for `async def` routes: `await db.run_sync(fn, *args)` calls
+    fn(session, *args) with a regular Session, so route logic and helpers
+    stay sync ORM code. With DB_ASYNC the session is an AsyncSession (I/O
+    through asyncpg / aiosqlite, no worker thread held); otherwise each
+    run_sync hops to the threadpool as a `def` route would.
+    """
+    if not DB_ASYNC:
+        db = ThreadedSession()
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    slots = _async_session_slots()
+    if slots is not None:
+        await _acquire(slots)
+    try:
+        db = AsyncSessionLocal()
+        try:
+            yield db
+        finally:
+            await db.close()
+    finally:
+        if slots is not None:
+            slots.release()
@@ -1,5 +1,5 @@
 # database/booking_model.py
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey , func , DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey , func , DateTime, Index
 from sqlalchemy.orm import relationship
 
 from database.database import Base
@@ -45,5 +45,16 @@ class Booking(Base):
         cascade="all, delete-orphan",
     )
 
+    # Keyset pagination of GET /bookings/: filter column, then bookingId order
+    # (temple + day lists use ix_bookings_temple_date). The temple / slot ones
+    # also serve plain templeId / slotId lookups, the user one /bookings/user/{id}.
+    __table_args__ = (
+        Index("ix_bookings_temple_booking", "templeId", "bookingId"),
+        Index("ix_bookings_temple_date", "templeId", "bookingDate"),
+        Index("ix_bookings_slot_booking", "slotId", "bookingId"),
+        Index("ix_bookings_date_booking", "bookingDate", "bookingId"),
+        Index("ix_bookings_user_booking", "userId", "bookingId"),
+    )
+
     def __repr__(self):
         return f"<Booking(id={self.bookingId})>"
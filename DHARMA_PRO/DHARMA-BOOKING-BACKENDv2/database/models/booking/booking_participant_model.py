@@ -6,7 +6,7 @@ class BookingParticipant(Base):
     __tablename__ = "booking_participants"
 
     participantId = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    bookingId = Column(Integer, ForeignKey("bookings.bookingId"), nullable=False)
+    bookingId = Column(Integer, ForeignKey("bookings.bookingId"), nullable=False, index=True)
     
     name = Column(String, nullable=False)
     age = Column(Integer, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database.database import Base
+
+class SlotCounter(Base):
+    """
+    Last slotNumber handed out per temple (api/bookings/slot_numbers.py).
+    Bumped with an atomic UPDATE ... RETURNING in the transaction that
+    inserts the slots, so concurrent creates get distinct numbers.
+    """
+    __tablename__ = "slot_counters"
+
+    templeId = Column(Integer, ForeignKey("temples.templeId", ondelete="CASCADE"), primary_key=True)
+    lastSlotNumber = Column(Integer, nullable=False, default=0)
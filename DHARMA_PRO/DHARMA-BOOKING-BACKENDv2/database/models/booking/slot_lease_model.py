@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from database.database import Base
+
+class SlotLease(Base):
+    """
+    Tickets taken out of slots.remaining and held in process memory by the
+    hot-slot counters (api/bookings/hot_slots.py). Used for crash recovery.
+    """
+    __tablename__ = "slot_leases"
+
+    slotId = Column(Integer, ForeignKey("slots.slotId", ondelete="CASCADE"), primary_key=True)
+    tokens = Column(Integer, nullable=False, default=0)   # leased and not yet checkpointed as sold
+    updatedAt = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,14 @@
-from sqlalchemy import Column, Integer, Date, DateTime, Time, ForeignKey, func
+from sqlalchemy import DDL, Column, Integer, Date, DateTime, Time, ForeignKey, Index, event, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from database.database import Base
 
+# A temple's slots may not overlap in time (PostgreSQL only; elsewhere the
+# router checks before inserting). Half-open ranges: 06:00-07:00 and
+# 07:00-08:00 are fine. Needs btree_gist for "templeId" WITH =.
+SLOT_OVERLAP_CONSTRAINT = "ex_slots_temple_time"
+SLOT_TIME_RANGE = text("""tsrange(date + "startTime", date + "endTime", '[)')""")
+
 class Slot(Base):
     __tablename__ = "slots"
 
@@ -24,9 +31,31 @@ class Slot(Base):
     # Relationship
     temple = relationship("Temple", back_populates="slots")
     bookings = relationship("Booking", back_populates="slot")
-    
+
+    __table_args__ = (
+        # temple's slots for a day (list, overlap check), in time order
+        Index("ix_slots_temple_date_start", "templeId", "date", "startTime"),
+        # every temple's slots for a day (list, gate cache warm-up)
+        Index("ix_slots_date_start", "date", "startTime"),
+        # next slotNumber for a temple
+        Index("ix_slots_temple_number", "templeId", "slotNumber"),
+        ExcludeConstraint(
+            ("templeId", "="),
+            (SLOT_TIME_RANGE, "&&"),
+            name=SLOT_OVERLAP_CONSTRAINT,
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def __repr__(self):
         return (
             f"<Slot slotId={self.slotId} templeId={self.templeId} "
             f"date={self.date} {self.startTime}-{self.endTime}>"
         )
+
+
+event.listen(
+    Slot.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
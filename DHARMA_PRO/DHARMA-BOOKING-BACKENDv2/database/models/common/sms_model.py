@@ -1,12 +1,27 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
 from database.database import Base
 
 class SMSLog(Base):
+    """
+    SMS outbox. Rows are written PENDING in the same transaction as the booking
+    and delivered by the background dispatcher (api/notifications/sms_outbox.py).
+    Status: PENDING -> SENDING -> SENT, or back to PENDING (retry) / FAILED.
+    """
     __tablename__ = "sms_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    userId = Column(Integer, nullable=False)
+    userId = Column(Integer, nullable=True)          # NULL for kiosk bookings
     mobileNumber = Column(String(20), nullable=False)
     message = Column(Text, nullable=False)
     status = Column(Text, default="PENDING")
     created_at = Column(DateTime, server_default=func.now())
+
+    # Delivery bookkeeping
+    attempts = Column(Integer, nullable=False, default=0)
+    nextAttemptAt = Column(DateTime, nullable=True)  # also the SENDING visibility timeout
+    lastError = Column(Text, nullable=True)
+    sentAt = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_sms_logs_status_next_attempt", "status", "nextAttemptAt"),
+    )
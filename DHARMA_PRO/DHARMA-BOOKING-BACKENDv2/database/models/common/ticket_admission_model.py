@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from database.database import Base
+
+class TicketAdmission(Base):
+    """
+    Admission ledger: one row per ticket that has been let in (api/bookings/ticket_admissions.py).
+    The primary key is the ticket id, so a second scan is rejected by the index.
+    """
+    __tablename__ = "ticket_admissions"
+
+    ticket_id = Column(String(64), primary_key=True)
+    gate_id = Column(String(64), nullable=False)
+    headcount = Column(Integer, nullable=True)
+    scanned_at = Column(DateTime, nullable=False)                  # device clock (offline gates upload later)
+    recorded_at = Column(DateTime, server_default=func.now())
@@ -1,17 +1,28 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, func, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, func, ForeignKey, Index, text
 from database.database import Base
 
 class Ticket(Base):
     __tablename__ = "tickets"
 
     id = Column(String(64), primary_key=True, index=True)        # e.g. short uuid
-    token = Column(String(128), nullable=False, index=True)
-    booking_id = Column(Integer, ForeignKey("bookings.bookingId"), nullable=True)
+    token = Column(String(512), nullable=False, index=True)         # random hex or signed QR payload
+    booking_id = Column(Integer, ForeignKey("bookings.bookingId", ondelete="CASCADE"), nullable=True, index=True)
     user_id = Column(Integer, nullable=True)
     txn_id = Column(String(256), nullable=True)
     slot_no = Column(String(128), nullable=True)
     slot_time = Column(String(128), nullable=True)
     booking_datetime = Column(String(128), nullable=True)
     image_path = Column(String(512), nullable=True)
+    image_status = Column(String(16), nullable=False, default="PENDING")   # ON_DEMAND (ticket_row default) | PENDING | READY | FAILED
     metadata_json = Column(Text, nullable=True)      # <- renamed, store JSON string here
     created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Only PENDING rows (queued pre-renders), for re-queueing them at startup;
+        # ON_DEMAND, READY and FAILED rows are not in the index
+        Index(
+            "ix_tickets_pending_image", "image_status",
+            postgresql_where=text("image_status = 'PENDING'"),
+            sqlite_where=text("image_status = 'PENDING'"),
+        ),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from database.database import Base
+
+class TicketRevocation(Base):
+    """
+    Signed ticket tokens that must no longer be admitted (api/payments/ticket_tokens.py).
+    id only grows, so gate devices poll incrementally: /ticket/revocations?since=<last id>.
+    """
+    __tablename__ = "ticket_revocations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticket_id = Column(String(64), nullable=False, unique=True)
+    reason = Column(String(128), nullable=True)
+    revoked_at = Column(DateTime, server_default=func.now())
@@ -8,7 +8,7 @@ class Payment(Base):
     __tablename__ = "payments"
 
     paymentId = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    bookingId = Column(Integer, ForeignKey("bookings.bookingId"), nullable=False)
+    bookingId = Column(Integer, ForeignKey("bookings.bookingId"), nullable=False, index=True)
 
     amount = Column(Float, nullable=False)
     paymentMethod = Column(String(50), nullable=False)      # UPI / Card / NetBanking
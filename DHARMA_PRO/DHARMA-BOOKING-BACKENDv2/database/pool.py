@@ -0,0 +1,81 @@
+# database/pool.py
+"""
+Connection pools that time their checkouts, and the observer hook that pool
+metrics attach to (api/monitoring/db_pool.py installs one at startup).
+
+The pool has no "checkout started" event, so the wait is timed in the pool
+classes below (database.py creates the engines with them). Each engine is
+instrumented under a label, pool="sync" / "async"; the async session gate in
+get_db.py reports as "async_gate". Without an observer the reports are
+dropped.
+"""
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolObserver:
+    """What the pools report. The default ignores everything."""
+
+    def checkout(self, label: str, seconds: float) -> None:
+        pass
+
+    def failure(self, label: str, reason: str) -> None:
+        pass
+
+    def connect(self, label: str) -> None:
+        pass
+
+    def invalidate(self, label: str) -> None:
+        pass
+
+
+observer = PoolObserver()
+engines: Dict[str, Engine] = {}     # label -> instrumented engine (for scrape-time levels)
+
+
+def set_observer(new: PoolObserver) -> None:
+    global observer
+    observer = new
+
+
+class _TimedGet:
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            observer.failure(self.metrics_label, "timeout")
+            raise
+        except Exception:
+            observer.failure(self.metrics_label, "error")
+            raise
+        observer.checkout(self.metrics_label, time.perf_counter() - started)
+        return record
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+class TimedQueuePool(_TimedGet, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedGet, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def instrument(engine: Engine, label: str) -> None:
+    """Report `engine`'s pool (a sync Engine; for async, .sync_engine) under `label`."""
+    if isinstance(engine.pool, _TimedGet):
+        engine.pool.metrics_label = label
+    event.listen(engine, "connect", lambda *args: observer.connect(label))
+    event.listen(engine, "invalidate", lambda *args: observer.invalidate(label))
+    engines[label] = engine
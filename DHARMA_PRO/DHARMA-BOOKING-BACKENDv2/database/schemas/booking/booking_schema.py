@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 
 
@@ -10,6 +10,7 @@ class BookingCreate(BaseModel):
     templeId: int
     userId: int
     slotId: Optional[int] = None
+    numberOfParticipants: int = Field(default=1, ge=1)
 
 
     class Config:
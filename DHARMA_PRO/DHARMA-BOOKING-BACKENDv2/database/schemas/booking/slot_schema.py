@@ -1,6 +1,6 @@
 # database/slot_schema.py
 from datetime import date as DateType, time as TimeType, datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -35,3 +35,27 @@ class SlotResponse(SlotBase):
     class Config:
         # Pydantic v2 style (replaces orm_mode = True)
         from_attributes = True
+
+
+class SlotBulkCreate(BaseModel):
+    """Recurring schedule: every day in [startDate, endDate] whose weekday is
+    listed (0 = Monday; all days if omitted) gets back-to-back slots of
+    durationMinutes from openTime until closeTime."""
+    templeId: int
+    startDate: DateType
+    endDate: DateType
+    weekdays: Optional[List[int]] = None
+    openTime: TimeType
+    closeTime: TimeType
+    durationMinutes: int = Field(gt=0)
+    capacity: int = Field(gt=0)
+    reservedOfflineTickets: int = Field(default=0, ge=0)
+    skipOverlapping: bool = False   # leave out slots that clash with existing ones instead of rejecting
+
+
+class SlotBulkResponse(BaseModel):
+    created: int
+    skipped: int
+    days: int
+    firstSlotNumber: Optional[int] = None
+    lastSlotNumber: Optional[int] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from datetime import date as date_type, datetime
+from typing import Optional, Dict, Any, List
 
 class TicketCreateResponse(BaseModel):
     ticket_id: str
@@ -19,3 +20,24 @@ class TicketOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class BulkTicketRequest(BaseModel):
+    # Either templeId + date (whole day) or an explicit list of bookingIds
+    templeId: Optional[int] = None
+    date: Optional[date_type] = None
+    bookingIds: Optional[List[int]] = None
+
+class AdmitRequest(BaseModel):
+    gateId: str
+    t: str
+    scannedAt: Optional[datetime] = None    # device clock; default: now
+
+class AdmissionScan(BaseModel):
+    ticketId: str
+    t: str
+    scannedAt: Optional[datetime] = None
+
+class AdmissionBatchRequest(BaseModel):
+    # Scans buffered by a gate while offline
+    gateId: str
+    scans: List[AdmissionScan]
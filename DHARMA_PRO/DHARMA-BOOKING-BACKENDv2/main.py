@@ -3,11 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from fastapi import Request
+from contextlib import asynccontextmanager
 
 import os
 
 # Database imports
-from database.database import Base, engine
+from database.database import Base, engine, async_engine
 
 # Routers
 from api.user_authentication.user_registration import router as user_registration_router
@@ -32,6 +33,14 @@ from api.parking.parking_slot_router import router as parking_slot_router
 from api.bookings.tickets import router as ticket_router
 from api.sarima.sarima_router import router as sarima_router
 
+# Background services
+from api.bookings import hot_slots, slot_availability, slot_stream, ticket_verify
+from api.notifications import sms_outbox, http_client
+from api.payments import ticket_renderer
+from api.monitoring import db_pool
+from api.monitoring.metrics_router import router as metrics_router
+from api.monitoring.request_metrics import RequestMetricsMiddleware, track_queries
+
 
 
 # ============================================================
@@ -52,6 +61,44 @@ if not os.path.exists("static/template_ticket.jpg"):
 
 
 
+# ============================================================
+#            STARTUP / SHUTDOWN (BACKGROUND SERVICES)
+# ============================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Hot-slot mode: in-memory sharded counters for today's slots
+    if hot_slots.HOT_SLOT_MODE:
+        hot_slots.start()
+
+    # Shared outbound HTTP client + SMS outbox dispatcher
+    http_client.start()
+    sms_outbox.start()
+
+    # Ticket image render pool (re-queues images left PENDING by a restart)
+    ticket_renderer.start()
+
+    # Gate-scan verification cache (warmed with today's tickets)
+    ticket_verify.start()
+
+    # Devotee availability snapshots (dropped on booking / slot commits)
+    slot_availability.start()
+
+    # Live slot events for /slots/stream subscribers
+    slot_stream.start()
+
+    yield
+
+    await slot_stream.stop()
+    slot_availability.stop()
+    ticket_verify.stop()
+    ticket_renderer.stop()
+    await sms_outbox.stop()
+    await http_client.stop()
+    hot_slots.stop()
+
+
+
 # ============================================================
 #                   FASTAPI APP INIT
 # ============================================================
@@ -59,7 +106,8 @@ if not os.path.exists("static/template_ticket.jpg"):
 app = FastAPI(
     title="DHARMA Booking Backend",
     version="2.0.0",
-    description="Temple Booking and Darshan Slot Management System"
+    description="Temple Booking and Darshan Slot Management System",
+    lifespan=lifespan,
 )
 
 
@@ -104,10 +152,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],   # GET /bookings/ pagination
 )
 
 
 
+# ============================================================
+#                   REQUEST METRICS (/metrics)
+# ============================================================
+
+# Outermost: counts every request, CORS preflights included
+app.add_middleware(RequestMetricsMiddleware)
+track_queries(engine, async_engine.sync_engine if async_engine is not None else None)
+db_pool.install()
+
+
+
 # ============================================================
 #                CREATE ALL DATABASE TABLES
 # ============================================================
@@ -162,4 +222,5 @@ app.include_router(parking_slot_router)
 
 # ⬇️ NEW — TICKET ROUTER
 app.include_router(ticket_router)
-app.include_router(sarima_router)
\ No newline at end of file
+app.include_router(sarima_router)
+app.include_router(metrics_router)
\ No newline at end of file
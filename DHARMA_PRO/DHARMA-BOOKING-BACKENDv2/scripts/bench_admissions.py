@@ -0,0 +1,106 @@
+"""
+Benchmark: gate admissions (POST /ticket/{id}/admit and /ticket/admissions/batch).
+
+Creates COUNT confirmed tickets (same setup as bench_ticket_view.py), then
+from CLIENTS concurrent connections:
+
+    1. admits the first half of them once each         (first scans, inserts)
+    2. rescans admitted tickets for DURATION seconds   (ALREADY_ADMITTED)
+    3. uploads the second half in batches of BATCH     (offline gates)
+
+    uvicorn main:app --port 8000
+    python scripts/bench_admissions.py --base-url http://localhost:8000 --count 600 --batch 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_ticket_view import _setup
+
+
+def _report(name: str, latencies: list, scans: int, elapsed: float) -> None:
+    latencies.sort()
+    pct = lambda xs, p: xs[min(len(xs) - 1, int(len(xs) * p))] * 1000
+    print(f"{name}: {scans / elapsed:.1f} scans/s  ({scans} scans in {elapsed:.2f}s)  "
+          f"latency ms p50={pct(latencies, 0.50):.1f} p95={pct(latencies, 0.95):.1f} "
+          f"p99={pct(latencies, 0.99):.1f} mean={statistics.mean(latencies) * 1000:.1f}")
+
+
+async def _run(base_url: str, count: int, clients: int, duration: float, batch: int) -> None:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        tickets = await _setup(client, count, 0)
+        single, offline = tickets[: count // 2], tickets[count // 2:]
+
+        async def admit(ticket_id, token, expected):
+            t0 = time.perf_counter()
+            r = await client.post(f"/ticket/{ticket_id}/admit", json={"gateId": "bench", "t": token})
+            latency = time.perf_counter() - t0
+            r.raise_for_status()
+            assert r.json()["status"] == expected, r.json()
+            return latency
+
+        # 1. first scans
+        queue = list(single)
+        latencies = []
+
+        async def first_scans():
+            while queue:
+                latencies.append(await admit(*queue.pop(), "ADMITTED"))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(first_scans() for _ in range(clients)))
+        _report("First scans   ", latencies, len(latencies), time.perf_counter() - started)
+
+        # 2. duplicate rescans
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def rescans():
+            while time.perf_counter() < deadline:
+                latencies.append(await admit(*random.choice(single), "ALREADY_ADMITTED"))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(rescans() for _ in range(clients)))
+        _report("Rescans       ", latencies, len(latencies), time.perf_counter() - started)
+
+        # 3. offline batch uploads
+        chunks = [offline[i:i + batch] for i in range(0, len(offline), batch)]
+        latencies = []
+
+        async def uploads():
+            while chunks:
+                chunk = chunks.pop()
+                t0 = time.perf_counter()
+                r = await client.post("/ticket/admissions/batch", json={
+                    "gateId": "bench-offline",
+                    "scans": [{"ticketId": ticket_id, "t": token} for ticket_id, token in chunk],
+                })
+                latencies.append(time.perf_counter() - t0)
+                r.raise_for_status()
+                assert r.json()["admitted"] == len(chunk), r.json()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(uploads() for _ in range(clients)))
+        print(f"(batches of {batch}; latency is per upload)")
+        _report("Batch uploads ", latencies, len(offline), time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--count", type=int, default=600)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.count, args.clients, args.duration, args.batch))
@@ -0,0 +1,103 @@
+"""
+Load test: the request path with sync sessions vs DB_ASYNC=true, side by side.
+
+Start the app twice on the same database, once per mode:
+
+    DB_ASYNC=false uvicorn main:app --port 8000
+    DB_ASYNC=true  uvicorn main:app --port 8001
+    python scripts/bench_async_db.py --sync-url http://localhost:8000 --async-url http://localhost:8001
+
+Each server gets a temple, slot, user and a few bookings (load_test_hot_slot.py
+setup), then CONCURRENCY connections send requests back to back for DURATION
+seconds (closed loop), mixing
+
+    GET /slots/{id}, GET /bookings/{id}, GET /slots/?templeId&date, POST /bookings/
+
+(--writes sets the share of POSTs). Reports req/s, p50 / p99 latency and
+errors per mode. Run it at a concurrency above the threadpool size (40) to
+see the difference; with DB_ASYNC=false requests beyond that queue for a
+worker thread even while the database is idle.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_availability import _Connection
+from load_test_hot_slot import _setup
+
+
+async def _prepare(base_url: str) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        ctx = await _setup(client, 10_000_000)
+        booking = {"bookingType": "ONLINE", "special": False, "numberOfParticipants": 1, **ctx}
+        ids = []
+        for _ in range(20):
+            response = await client.post("/bookings/", json=booking)
+            response.raise_for_status()
+            ids.append(response.json()["bookingId"])
+    return {"ctx": ctx, "booking": json.dumps(booking).encode(), "booking_ids": ids}
+
+
+async def _load(base_url: str, data: dict, concurrency: int, duration: float, writes: float) -> dict:
+    ctx = data["ctx"]
+    reads = [
+        lambda: ("GET", f"/slots/{ctx['slotId']}", b""),
+        lambda: ("GET", f"/bookings/{random.choice(data['booking_ids'])}", b""),
+        lambda: ("GET", f"/slots/?templeId={ctx['templeId']}&date={ctx['bookingDate']}", b""),
+    ]
+    latencies, errors = [], 0
+
+    async def worker(deadline):
+        nonlocal errors
+        connection = await _Connection.open(base_url)
+        try:
+            while time.perf_counter() < deadline:
+                if random.random() < writes:
+                    method, target, body = "POST", "/bookings/", data["booking"]
+                else:
+                    method, target, body = random.choice(reads)()
+                started = time.perf_counter()
+                status, _, _ = await connection.request(method, target, body=body)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors += 1
+        finally:
+            connection.writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return {"rps": len(latencies) / elapsed, "p50": pct(0.5), "p99": pct(0.99), "errors": errors}
+
+
+async def _run(urls: dict, concurrency: int, duration: float, writes: float) -> None:
+    prepared = {mode: await _prepare(url) for mode, url in urls.items()}
+    print(f"{concurrency} connections, {duration:.0f} s per mode, {writes:.0%} POST /bookings/")
+    print(f"  {'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, url in urls.items():
+        await _load(url, prepared[mode], min(concurrency, 20), 2, writes)   # warm up
+        r = await _load(url, prepared[mode], concurrency, duration, writes)
+        print(f"  {mode:<6} {r['rps']:8.0f} {r['p50']:8.1f} {r['p99']:8.1f} {r['errors']:7d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", default="http://localhost:8000")
+    parser.add_argument("--async-url", default="http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--writes", type=float, default=0.1, help="share of requests that are POST /bookings/")
+    args = parser.parse_args()
+
+    asyncio.run(_run({"sync": args.sync_url, "async": args.async_url}, args.concurrency, args.duration, args.writes))
@@ -0,0 +1,169 @@
+"""
+Load test: devotee apps polling GET /slots/availability.
+
+Creates a temple with a day of SLOTS slots (same setup as
+load_test_hot_slot.py, plus POST /slots/bulk), then for DURATION seconds
+sends RATE requests/s (open loop: latency is measured from the scheduled
+send time, so queueing shows up). Requests come from DEVICES simulated
+apps; each remembers the last ETag it saw and sends If-None-Match, like a
+polling client, over CONNECTIONS keep-alive connections. Meanwhile WRITES bookings/s are made on the same day, each
+invalidating the temple's snapshot.
+
+Reports achieved rate, 200/304 mix, latency percentiles and the cache hit
+rate (from /metrics). --compare runs the same load against GET /slots/.
+
+    uvicorn main:app --port 8000
+    python scripts/bench_availability.py --base-url http://localhost:8000 --rate 2000 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from load_test_hot_slot import _setup
+
+
+async def _lookups(client: httpx.AsyncClient) -> dict:
+    text = (await client.get("/metrics")).text
+    return {
+        m.group(1): float(m.group(2))
+        for m in re.finditer(r'dharma_slot_availability_lookups_total\{result="(\w+)"\} (\S+)', text)
+    }
+
+
+class _Connection:
+    """
+    Bare keep-alive HTTP/1.1 client (Content-Length bodies only). The load
+    generator shares the CPU with the server, so it avoids httpx on the hot loop.
+    """
+
+    def __init__(self, reader, writer, host):
+        self.reader, self.writer, self.host = reader, writer, host
+
+    @classmethod
+    async def open(cls, base_url: str):
+        url = httpx.URL(base_url)
+        reader, writer = await asyncio.open_connection(url.host, url.port or 80)
+        return cls(reader, writer, url.host)
+
+    async def request(self, method: str, target: str, headers: dict = None, body: bytes = b"") -> tuple:
+        """(status, lowercased response headers, body)"""
+        headers = dict(headers or {})
+        if body:
+            headers.setdefault("Content-Type", "application/json")
+            headers["Content-Length"] = str(len(body))
+        extra = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        self.writer.write(f"{method} {target} HTTP/1.1\r\nHost: {self.host}\r\n{extra}\r\n".encode() + body)
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        fields = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in head[1:] if line)}
+        content = await self.reader.readexactly(int(fields.get("content-length", 0)))
+        return int(head[0].split()[1]), fields, content
+
+    async def get(self, target: str, headers: dict) -> tuple:
+        status, fields, _ = await self.request("GET", target, headers)
+        return status, fields.get("etag")
+
+
+async def _load(client, url, params, rate, duration, devices, connections, writer=None) -> None:
+    target = f"{url}?{httpx.QueryParams(params)}"
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(await _Connection.open(str(client.base_url)))
+    etags = {}
+    latencies, statuses = [], {}
+
+    async def poll(device, scheduled):
+        headers = {"If-None-Match": etags[device]} if device in etags else {}
+        connection = await pool.get()
+        try:
+            status, etag = await connection.get(target, headers)
+        finally:
+            pool.put_nowait(connection)
+        latencies.append(time.perf_counter() - scheduled)
+        statuses[status] = statuses.get(status, 0) + 1
+        if etag:
+            etags[device] = etag
+
+    before = await _lookups(client)
+    tasks = []
+    writes = asyncio.create_task(writer()) if writer else None
+    started = time.perf_counter()
+    n = 0
+    while True:
+        scheduled = started + n / rate
+        if scheduled - started >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(poll(random.randrange(devices), scheduled)))
+        n += 1
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    if writes:
+        writes.cancel()
+    while not pool.empty():
+        pool.get_nowait().writer.close()
+    after = await _lookups(client)
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"  {len(latencies) / elapsed:7.0f} req/s achieved ({rate} offered)  "
+          f"p50={pct(0.50):.1f} ms p95={pct(0.95):.1f} ms p99={pct(0.99):.1f} ms  status {dict(sorted(statuses.items()))}")
+    hits = after.get("hit", 0) - before.get("hit", 0)
+    misses = after.get("miss", 0) - before.get("miss", 0)
+    if hits + misses:
+        print(f"  cache: {hits:.0f} hits, {misses:.0f} misses, hit rate {hits / (hits + misses):.2%}")
+
+
+async def _run(base_url, rate, duration, devices, connections, writes, slots, compare) -> None:
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        ctx = await _setup(client, 100000)
+        # _setup's slot is 05:00-06:00; fill the rest of the day
+        admin = {"adminName": f"availbench{random.randint(100000, 999999)}", "password": "adminpass123"}
+        admin["email"] = f"{admin['adminName']}@example.com"
+        (await client.post("/admin/auth/register", json=admin)).raise_for_status()
+        login = await client.post("/admin/auth/login", data={"username": admin["email"], "password": admin["password"]})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        (await client.post("/slots/bulk", headers=headers, json={
+            "templeId": ctx["templeId"], "startDate": ctx["bookingDate"], "endDate": ctx["bookingDate"],
+            "openTime": "06:00:00", "closeTime": "22:00:00", "durationMinutes": 960 // (slots - 1),
+            "capacity": 1000,
+        })).raise_for_status()
+
+        async def writer():
+            booking = {"bookingType": "ONLINE", "special": False, **ctx}
+            while True:
+                await asyncio.sleep(1 / writes)
+                await client.post("/bookings/", json=booking)
+
+        params = {"templeId": ctx["templeId"], "date": ctx["bookingDate"]}
+        print(f"GET /slots/availability  ({slots} slots, {devices} devices, {writes} bookings/s)")
+        await _load(client, "/slots/availability", params, rate, duration, devices, connections, writer if writes else None)
+        if compare:
+            print("GET /slots/  (same load, no cache)")
+            await _load(client, "/slots/", params, rate, duration, devices, connections, writer if writes else None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--writes", type=float, default=5, help="bookings per second during the run (0 = none)")
+    parser.add_argument("--slots", type=int, default=33)
+    parser.add_argument("--compare", action="store_true", help="also run the load against GET /slots/")
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.rate, args.duration, args.devices, args.connections, args.writes,
+                     args.slots, args.compare))
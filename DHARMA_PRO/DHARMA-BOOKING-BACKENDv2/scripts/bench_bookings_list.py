@@ -0,0 +1,179 @@
+"""
+Benchmark: GET /bookings/ (admin list, keyset pagination) on a large table.
+
+Runs the app in-process against DATABASE_URL. --seed COUNT first inserts
+COUNT bookings spread over 20 temples, 200 slots and a year of dates (core
+inserts, in chunks), then times REPEAT requests for each page shape:
+
+    first page, deep page (cursor near the end), temple, temple + day,
+    slot, date range + bookingType + special
+
+--export runs the /bookings/export stream (every booking) as NDJSON, CSV
+and gzipped CSV, reporting rows/s and peak Python memory.
+--full also times the old behaviour (every row as an ORM object).
+
+    DATABASE_URL=sqlite:////tmp/bookings.db python scripts/bench_bookings_list.py --seed 1000000
+    DATABASE_URL=sqlite:////tmp/bookings.db python scripts/bench_bookings_list.py --full
+    DATABASE_URL=sqlite:////tmp/bookings.db python scripts/bench_bookings_list.py --export
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import create_tablesdb  # noqa: F401  (registers every model)
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert
+
+from api.bookings import booking_export
+from database.auth_utils import create_access_token
+from database.database import Base, SessionLocal, engine
+from database.models.admin.admin_model import Admin
+from database.models.booking.booking_model import Booking
+from database.models.booking.slot_model import Slot
+from database.models.temple.temple_model import Temple
+from main import app
+
+TEMPLES = 20
+SLOTS = 200
+START = date(2026, 1, 1)
+
+
+def _seed(count: int, chunk: int = 50000) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        temples = [Temple(templeName=f"List Bench Temple {n}", location="Bench") for n in range(TEMPLES)]
+        db.add_all(temples)
+        db.flush()
+        slots = [
+            Slot(templeId=temples[n % TEMPLES].templeId, date=START + timedelta(days=n % 365),
+                 startTime=datetime.min.time(), endTime=datetime.max.time().replace(microsecond=0), capacity=1000)
+            for n in range(SLOTS)
+        ]
+        db.add_all(slots)
+        db.commit()
+        temple_ids = [t.templeId for t in temples]
+        slot_ids = [s.slotId for s in slots]
+    finally:
+        db.close()
+
+    rng = random.Random(7)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, count, chunk):
+            conn.execute(insert(Booking), [
+                {
+                    "bookingType": rng.choice(("ONLINE", "ONLINE", "OFFLINE")),
+                    "special": rng.random() < 0.1,
+                    "bookingDate": datetime.combine(START + timedelta(days=rng.randrange(365)), datetime.min.time()),
+                    "templeId": rng.choice(temple_ids),
+                    "slotId": rng.choice(slot_ids) if rng.random() < 0.5 else None,
+                    "numberOfParticipants": rng.randint(1, 6),
+                }
+                for _ in range(min(chunk, count - offset))
+            ])
+    print(f"Seeded {count} bookings in {time.perf_counter() - started:.1f}s")
+
+
+def _admin_headers() -> dict:
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin).filter(Admin.email == "listbench@example.com").first()
+        if admin is None:
+            admin = Admin(adminName="listbench", email="listbench@example.com", password="x")
+            db.add(admin)
+            db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'id': admin.adminId, 'role': 'admin'})}"}
+    finally:
+        db.close()
+
+
+def _time(client: TestClient, headers: dict, params: dict, repeat: int) -> tuple:
+    latencies, rows = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = client.get("/bookings/", params=params, headers=headers)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        response.raise_for_status()
+        rows = len(response.json())
+    latencies.sort()
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], rows
+
+
+def _export(fmt: str, gzip: bool, total: int) -> None:
+    """
+    Drain the export generator in-process (TestClient would buffer the whole
+    body): one plain run for rows/s, one under tracemalloc for peak memory.
+    """
+    query = booking_export.export_query()
+    t0 = time.perf_counter()
+    sent = sum(len(chunk) for chunk in booking_export.stream(query, fmt, gzip))
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    for _ in booking_export.stream(query, fmt, gzip):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  export {fmt + (' gzip' if gzip else ''):<17} {total / elapsed:9.0f} rows/s  {elapsed:6.1f} s  "
+          f"{sent / 1e6:7.1f} MB  peak Python memory {peak / 1e6:5.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, metavar="COUNT", help="insert COUNT bookings first")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--full", action="store_true", help="also time loading every booking (the old endpoint)")
+    parser.add_argument("--export", action="store_true", help="also time streaming every booking via /bookings/export")
+    args = parser.parse_args()
+
+    if args.seed:
+        _seed(args.seed)
+
+    db = SessionLocal()
+    try:
+        total, last_id = db.query(func.count(Booking.bookingId), func.max(Booking.bookingId)).one()
+        temple_id = db.query(Temple.templeId).filter(Temple.templeName == "List Bench Temple 0").scalar()
+        slot_id = db.query(Slot.slotId).filter(Slot.templeId == temple_id).order_by(Slot.slotId).limit(1).scalar()
+    finally:
+        db.close()
+    day = (START + timedelta(days=100)).isoformat()
+
+    shapes = [
+        ("first page", {}),
+        ("deep page", {"after": max(0, (last_id or 0) - 10 * args.limit)}),
+        ("temple", {"templeId": temple_id}),
+        ("temple + day", {"templeId": temple_id, "dateFrom": day, "dateTo": day}),
+        ("slot", {"slotId": slot_id}),
+        ("range + type + special", {"dateFrom": day, "dateTo": (START + timedelta(days=130)).isoformat(),
+                                    "bookingType": "OFFLINE", "special": True}),
+    ]
+
+    client = TestClient(app)
+    headers = _admin_headers()
+    print(f"Bookings: {total}  Page size: {args.limit}  Repeat: {args.repeat}")
+    for name, params in shapes:
+        p50, p95, rows = _time(client, headers, dict(params, limit=args.limit), args.repeat)
+        print(f"  {name:<24} p50={p50:7.1f} ms  p95={p95:7.1f} ms  rows={rows}")
+
+    if args.export:
+        for fmt, gzip in (("ndjson", False), ("csv", False), ("csv", True)):
+            _export(fmt, gzip, total)
+
+    if args.full:
+        db = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            rows = len(db.query(Booking).all())
+            print(f"  {'old: every row (ORM)':<24} {(time.perf_counter() - t0) * 1000:9.1f} ms  rows={rows}  "
+                  f"(before JSON serialisation)")
+        finally:
+            db.close()
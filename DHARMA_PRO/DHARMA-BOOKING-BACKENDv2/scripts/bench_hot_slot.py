@@ -0,0 +1,106 @@
+"""
+Benchmark: bookings/sec on one hot slot, row-lock path vs hot-slot counters.
+
+Runs the core of create_booking (reserve tickets + insert Booking + commit)
+from THREADS worker threads against DATABASE_URL, first with the plain
+conditional-UPDATE path, then with hot_slots started. After each run checks
+that bookings + remaining == capacity.
+
+Usage:
+    python scripts/bench_hot_slot.py --threads 32 --bookings 20000
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from database.database import Base, SessionLocal, engine
+from database.models.booking.booking_model import Booking
+from database.models.booking.slot_model import Slot
+from database.models.temple.temple_model import Temple
+import database.models.user.user_model  # noqa: F401  (mapper relationships)
+import database.models.booking.booking_participant_model  # noqa: F401
+import database.models.payment.payment_model  # noqa: F401
+import database.models.parking.parking_model  # noqa: F401
+import database.models.parking.parking_slot_model  # noqa: F401
+from api.bookings import hot_slots
+from api.bookings.slot_inventory import reserve_slot_tickets
+
+
+def _make_slot(capacity: int):
+    db = SessionLocal()
+    try:
+        temple = Temple(templeName=f"Bench Temple {time.time_ns()}", location="Bench")
+        db.add(temple)
+        db.flush()
+        slot = Slot(
+            templeId=temple.templeId, slotNumber=1, date=date.today(),
+            capacity=capacity, reservedOfflineTickets=0, onlineTickets=capacity, remaining=capacity,
+        )
+        db.add(slot)
+        db.commit()
+        return temple.templeId, slot.slotId
+    finally:
+        db.close()
+
+
+def _book(temple_id: int, slot_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        reserve_slot_tickets(db, slot_id, temple_id, 1)
+        db.add(Booking(bookingType="ONLINE", special=False, templeId=temple_id, slotId=slot_id,
+                       bookingDate=date.today(), numberOfParticipants=1))
+        db.commit()
+        return True
+    except HTTPException:
+        return False
+    finally:
+        db.close()
+
+
+def _check(slot_id: int, capacity: int) -> str:
+    db = SessionLocal()
+    try:
+        remaining = db.query(Slot.remaining).filter(Slot.slotId == slot_id).scalar()
+        booked = db.query(Booking).filter(Booking.slotId == slot_id).count()
+    finally:
+        db.close()
+    ok = "OK" if booked + remaining == capacity else "MISMATCH"
+    return f"booked={booked} remaining={remaining} ({ok})"
+
+
+def _run(label: str, threads: int, bookings: int, capacity: int) -> None:
+    temple_id, slot_id = _make_slot(capacity)
+    if label == "hot-slot":
+        hot_slots.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: _book(temple_id, slot_id), range(bookings)))
+    elapsed = time.perf_counter() - started
+
+    if label == "hot-slot":
+        hot_slots.stop()   # returns unsold leased tickets to the slot row
+
+    ok = sum(results)
+    print(f"{label:>9}: {ok} bookings in {elapsed:.2f}s -> {ok / elapsed:8.1f} bookings/s  "
+          f"[{_check(slot_id, capacity)}]")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--capacity", type=int, default=None, help="defaults to --bookings")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    capacity = args.capacity or args.bookings
+    _run("row-lock", args.threads, args.bookings, capacity)
+    _run("hot-slot", args.threads, args.bookings, capacity)
@@ -0,0 +1,90 @@
+"""
+Benchmark: QR drawing, legacy bitmap path vs direct module drawing.
+
+legacy: qrcode bitmap at box_size=10 -> PNG encode -> PNG decode -> resize to
+        520px -> paste onto the template (the pre-vector code path)
+direct: module matrix drawn straight onto the template at 520px
+
+For COUNT tickets reports CPU time per ticket, Python allocations per ticket
+(tracemalloc peak) and Pillow image buffers created per ticket. The
+template copy and final PNG encode are the same for both paths and are
+left out. Also times the optional SVG and PDF outputs.
+
+Usage:
+    python scripts/bench_qr_render.py --count 200
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from io import BytesIO
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import qrcode
+from PIL import Image
+
+from api.payments.ticket_service import QR_SIZE, QR_X, QR_Y, _draw_qr, _qr_url, qr_matrix, template_cache
+from api.payments.ticket_vector import ticket_pdf, ticket_svg
+
+
+def _legacy(base, fields):
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=4)
+    qr.add_data(_qr_url(fields))
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+    img = img.resize((QR_SIZE, QR_SIZE))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    buf.seek(0)
+    qr_img = Image.open(buf).convert("RGBA")
+    base.paste(qr_img, (QR_X, QR_Y), qr_img)
+
+
+def _direct(base, fields):
+    _draw_qr(base, qr_matrix(_qr_url(fields)), QR_X, QR_Y, QR_SIZE)
+
+
+def _fields():
+    return {"id": uuid.uuid4().hex[:12].upper(), "token": uuid.uuid4().hex}
+
+
+def _bench(draw, count: int):
+    bases = [template_cache.get() for _ in range(count)]
+    fields = [_fields() for _ in range(count)]
+
+    Image.core.reset_stats()
+    cpu = time.process_time()
+    for base, f in zip(bases, fields):
+        draw(base, f)
+    cpu = (time.process_time() - cpu) / count
+    images = Image.core.get_stats()["new_count"] / count
+
+    tracemalloc.start()
+    peak = 0
+    for base, f in zip(bases[:20], fields[:20]):
+        tracemalloc.reset_peak()
+        draw(base, f)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return cpu, peak, images
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    template_cache.warm()
+    for label, draw in (("legacy", _legacy), ("direct", _direct)):
+        cpu, peak, images = _bench(draw, args.count)
+        print(f"{label:7s} cpu {cpu * 1000:6.2f} ms/ticket   python peak {peak / 1024:7.1f} KiB   "
+              f"pillow images {images:.1f}/ticket")
+
+    for label, fn in (("svg", ticket_svg), ("pdf", ticket_pdf)):
+        cpu = time.process_time()
+        size = sum(len(fn(_fields())) for _ in range(20))
+        print(f"{label:7s} cpu {(time.process_time() - cpu) / 20 * 1000:6.2f} ms/ticket   {size / 20 / 1024:.0f} KiB")
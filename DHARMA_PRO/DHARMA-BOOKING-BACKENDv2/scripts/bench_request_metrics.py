@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: cost of the request metrics (api/monitoring/request_metrics.py).
+
+Two numbers, in-process, no network or database server:
+
+* middleware: a bare FastAPI app with one templated route, called directly
+  through ASGI REQUESTS times, with and without RequestMetricsMiddleware
+* cursor events: STATEMENTS `SELECT 1` on in-memory SQLite inside a
+  request context, with and without track_queries() listening
+
+Each is run ROUNDS times; the best round counts (least disturbed by the
+rest of the machine). Compare the per-request / per-statement cost with
+the endpoints' own latency (dharma_http_request_seconds).
+
+    python scripts/bench_request_metrics.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.monitoring import request_metrics
+from api.monitoring.request_metrics import RequestMetricsMiddleware, RequestStats
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    return app
+
+
+async def _requests(app, count: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for n in range(count):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{n}", "raw_path": f"/items/{n}".encode(), "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / count
+
+
+def _statements(engine, count: int) -> float:
+    token = request_metrics._current.set(RequestStats())
+    try:
+        with engine.connect() as conn:
+            started = time.perf_counter()
+            for _ in range(count):
+                conn.execute(text("SELECT 1"))
+            return (time.perf_counter() - started) / count
+    finally:
+        request_metrics._current.reset(token)
+
+
+def main(requests: int, statements: int, rounds: int) -> None:
+    app = _app()
+    wrapped = RequestMetricsMiddleware(app)
+    plain = min(asyncio.run(_requests(app, requests)) for _ in range(rounds))
+    timed = min(asyncio.run(_requests(wrapped, requests)) for _ in range(rounds))
+    print(f"middleware:    {plain * 1e6:7.1f} us/request bare, {timed * 1e6:7.1f} us with metrics "
+          f"(+{(timed - plain) * 1e6:.1f} us)")
+
+    bare_engine, tracked_engine = create_engine("sqlite://"), create_engine("sqlite://")
+    request_metrics.track_queries(tracked_engine)
+    plain = min(_statements(bare_engine, statements) for _ in range(rounds))
+    timed = min(_statements(tracked_engine, statements) for _ in range(rounds))
+    print(f"cursor events: {plain * 1e6:7.1f} us/statement bare, {timed * 1e6:7.1f} us tracked "
+          f"(+{(timed - plain) * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--statements", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.requests, args.statements, args.rounds)
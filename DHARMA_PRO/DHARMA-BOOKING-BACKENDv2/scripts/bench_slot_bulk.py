@@ -0,0 +1,94 @@
+"""
+Benchmark: creating a temple's schedule with POST /slots/bulk versus one
+POST /slots/ call per slot.
+
+Runs the app in-process against DATABASE_URL. Each run uses a fresh temple.
+The bulk run creates COUNT slots (30-minute slots, 04:00-22:00, 36 per day,
+over as many days as needed); the one-by-one run creates SINGLE slots the
+old way and extrapolates to COUNT.
+
+    DATABASE_URL=sqlite:////tmp/slots.db python scripts/bench_slot_bulk.py --count 10000 --single 500
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import create_tablesdb  # noqa: F401  (registers every model)
+from fastapi.testclient import TestClient
+
+from database.auth_utils import create_access_token
+from database.database import Base, SessionLocal, engine
+from database.models.admin.admin_model import Admin
+from database.models.temple.temple_model import Temple
+from main import app
+
+PER_DAY = 36    # 04:00-22:00 in 30-minute slots
+START = date(2027, 1, 1)
+
+
+def _setup() -> tuple:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin).filter(Admin.email == "slotbench@example.com").first()
+        if admin is None:
+            admin = Admin(adminName="slotbench", email="slotbench@example.com", password="x")
+            db.add(admin)
+        temples = [Temple(templeName=f"Slot Bench Temple {uuid.uuid4().hex[:8]}", location="Bench") for _ in range(2)]
+        db.add_all(temples)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'id': admin.adminId, 'role': 'admin'})}"}
+        return headers, temples[0].templeId, temples[1].templeId
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--single", type=int, default=500, help="slots to create one by one (0 = skip)")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    headers, bulk_temple, single_temple = _setup()
+
+    days = math.ceil(args.count / PER_DAY)
+    rule = {
+        "templeId": bulk_temple,
+        "startDate": START.isoformat(),
+        "endDate": (START + timedelta(days=days - 1)).isoformat(),
+        "openTime": "04:00:00",
+        "closeTime": "22:00:00",
+        "durationMinutes": 30,
+        "capacity": 500,
+        "reservedOfflineTickets": 100,
+    }
+    t0 = time.perf_counter()
+    response = client.post("/slots/bulk", json=rule, headers=headers)
+    bulk = time.perf_counter() - t0
+    response.raise_for_status()
+    created = response.json()["created"]
+    print(f"POST /slots/bulk   {created} slots over {days} days in {bulk:6.2f} s  ({created / bulk:8.0f} slots/s)")
+
+    if args.single:
+        t0 = time.perf_counter()
+        for n in range(args.single):
+            start = datetime.combine(START + timedelta(days=n // PER_DAY), datetime.min.time()) \
+                + timedelta(hours=4, minutes=30 * (n % PER_DAY))
+            client.post("/slots/", headers=headers, json={
+                "templeId": single_temple,
+                "date": start.date().isoformat(),
+                "startTime": start.time().isoformat(),
+                "endTime": (start + timedelta(minutes=30)).time().isoformat(),
+                "capacity": 500,
+                "reservedOfflineTickets": 100,
+            }).raise_for_status()
+        single = time.perf_counter() - t0
+        print(f"POST /slots/ x{args.single:<5} {single:6.2f} s  ({args.single / single:8.0f} slots/s)  "
+              f"-> ~{single / args.single * created:.0f} s for {created}  ({single / args.single * created / bulk:.0f}x)")
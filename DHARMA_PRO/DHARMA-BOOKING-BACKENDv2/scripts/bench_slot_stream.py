@@ -0,0 +1,135 @@
+"""
+Load test: many dashboards / kiosks following GET /slots/stream.
+
+Creates a temple and slot (load_test_hot_slot.py setup), opens SUBSCRIBERS
+SSE connections to it, then reports
+
+* memory per idle connection: growth of the server's resident set (--pid,
+  read from /proc) between before and after the connections are open
+* fan-out latency: ROUNDS bookings, one at a time; for each, the time from
+  sending POST /bookings/ until every connection has received the event
+  (p50 / p99 / last subscriber over all deliveries)
+
+The subscribers run in this process as bare asyncio connections (no SSE
+parsing beyond spotting the event), so with the server on the same machine
+they share its CPU.
+
+    uvicorn main:app --port 8000 &
+    python scripts/bench_slot_stream.py --base-url http://localhost:8000 --pid $! --subscribers 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from load_test_hot_slot import _setup
+
+
+def _rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class _Subscriber:
+    def __init__(self):
+        self.received = []      # perf_counter() of each slot event
+
+    async def run(self, base_url: str, temple_id: int, opened: asyncio.Event) -> None:
+        url = httpx.URL(base_url)
+        reader, writer = await asyncio.open_connection(url.host, url.port or 80)
+        writer.write(f"GET /slots/stream?templeId={temple_id} HTTP/1.1\r\nHost: {url.host}\r\n\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(head.decode("latin-1").split("\r\n")[0])
+        opened.set()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                now = time.perf_counter()
+                self.received.extend([now] * data.count(b"event: slot"))
+        finally:
+            writer.close()
+
+
+async def _open(base_url: str, temple_id: int, count: int, batch: int = 200) -> tuple:
+    subscribers, tasks = [], []
+    for offset in range(0, count, batch):
+        opened = []
+        for _ in range(min(batch, count - offset)):
+            subscriber, event = _Subscriber(), asyncio.Event()
+            subscribers.append(subscriber)
+            opened.append(event)
+            tasks.append(asyncio.create_task(subscriber.run(base_url, temple_id, event)))
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in opened)), 60)
+    return subscribers, tasks
+
+
+async def _subscriber_gauge(client: httpx.AsyncClient) -> float:
+    for line in (await client.get("/metrics")).text.splitlines():
+        if line.startswith("dharma_slot_stream_subscribers "):
+            return float(line.split()[1])
+    return 0.0
+
+
+async def _run(base_url: str, pid: int, count: int, rounds: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        ctx = await _setup(client, 100000)
+        booking = {"bookingType": "ONLINE", "special": False, "numberOfParticipants": 1, **ctx}
+
+        await asyncio.sleep(1)
+        before = _rss(pid) if pid else 0
+        started = time.perf_counter()
+        subscribers, tasks = await _open(base_url, ctx["templeId"], count)
+        opened = time.perf_counter() - started
+        await asyncio.sleep(2)
+        after = _rss(pid) if pid else 0
+        print(f"{count} subscribers open in {opened:.1f} s (server gauge {await _subscriber_gauge(client):.0f})")
+        if pid:
+            print(f"  server RSS {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB: "
+                  f"{(after - before) / count / 1024:.1f} KiB per idle connection")
+
+        latencies, last, posts = [], [], []
+        for n in range(rounds):
+            sent = time.perf_counter()
+            (await client.post("/bookings/", json=booking)).raise_for_status()
+            posts.append(time.perf_counter() - sent)
+            deadline = time.monotonic() + 30
+            while any(len(s.received) <= n for s in subscribers) and time.monotonic() < deadline:
+                await asyncio.sleep(0.005)
+            arrivals = [s.received[n] - sent for s in subscribers if len(s.received) > n]
+            if len(arrivals) < count:
+                print(f"  round {n}: only {len(arrivals)} of {count} subscribers got the event")
+            latencies.extend(arrivals)
+            last.append(max(arrivals))
+            await asyncio.sleep(0.2)
+
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        print(f"  fan-out over {rounds} bookings: p50={pct(0.5):.1f} ms p99={pct(0.99):.1f} ms  "
+              f"last subscriber median={sorted(last)[len(last) // 2] * 1000:.1f} ms max={max(last) * 1000:.1f} ms  "
+              f"(POST /bookings/ itself median={sorted(posts)[len(posts) // 2] * 1000:.1f} ms)")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--pid", type=int, default=0, help="server process id, for its memory use")
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.pid, args.subscribers, args.rounds))
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: ticket render path with and without the template cache.
+
+Renders COUNT tickets in this process, first decoding the template for every
+ticket (cache cleared each time, the old behaviour), then from the warm
+in-memory template. Reports tickets/sec for drawing alone and for drawing +
+PNG encode (what a render worker does per ticket).
+
+Usage:
+    python scripts/bench_ticket_render.py --count 200
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from io import BytesIO
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from api.payments.ticket_service import _draw_ticket, template_cache
+
+
+def _fields():
+    return {"id": uuid.uuid4().hex[:12].upper(), "token": uuid.uuid4().hex}
+
+
+def _bench(count: int, cached: bool, encode: bool) -> float:
+    template_cache.clear()
+    template_cache.warm()
+    started = time.perf_counter()
+    for _ in range(count):
+        if not cached:
+            template_cache.clear()
+        img = _draw_ticket(_fields())
+        if encode:
+            img.convert("RGB").save(BytesIO(), "PNG")
+    return count / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    for encode in (False, True):
+        label = "draw + PNG encode" if encode else "draw only"
+        cold = _bench(args.count, cached=False, encode=encode)
+        warm = _bench(args.count, cached=True, encode=encode)
+        print(f"{label:18s} no cache: {cold:7.1f} tickets/s   cache: {warm:7.1f} tickets/s   ({warm / cold:.2f}x)")
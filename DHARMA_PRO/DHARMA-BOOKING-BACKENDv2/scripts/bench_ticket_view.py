@@ -0,0 +1,116 @@
+"""
+Benchmark: gate QR scans, i.e. GET /ticket/{id}?t=... throughput
+(or GET /ticket/{id}/verify?t=... with --verify).
+
+Creates a fresh admin, user and temple plus COUNT confirmed tickets, each
+booking with PARTICIPANTS participants, then scans random tickets from
+CLIENTS concurrent connections for DURATION seconds.
+
+    uvicorn main:app --port 8000
+    python scripts/bench_ticket_view.py --base-url http://localhost:8000 --count 50 --participants 6
+    python scripts/bench_ticket_view.py --base-url http://localhost:8000 --count 50 --participants 6 --verify
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+
+async def _setup(client: httpx.AsyncClient, count: int, participants: int) -> list:
+    suffix = random.randint(100000, 999999)
+
+    admin = {"adminName": f"benchadmin{suffix}", "email": f"benchadmin{suffix}@example.com", "password": "adminpass123"}
+    (await client.post("/admin/auth/register", json=admin)).raise_for_status()
+    login = await client.post("/admin/auth/login", data={"username": admin["email"], "password": admin["password"]})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    user = {
+        "userName": f"benchuser{suffix}", "firstName": "Bench", "lastName": "Test",
+        "mobileNumber": f"91000{suffix % 100000:05d}", "email": f"benchuser{suffix}@example.com",
+        "gender": "Male", "state": "Karnataka", "city": "Bangalore", "password": "testpass123",
+    }
+    (await client.post("/users/register", json=user)).raise_for_status()
+    user_login = await client.post("/auth/login", json={"identifier": user["email"], "password": user["password"]})
+    user_login.raise_for_status()
+
+    temple = await client.post(
+        "/temples/", json={"templeName": f"Bench Temple {suffix}", "location": "Bench"}, headers=headers
+    )
+    temple.raise_for_status()
+
+    tickets = []
+    for _ in range(count):
+        booking = await client.post("/bookings/", json={
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=1)).isoformat(),
+            "templeId": temple.json()["templeId"],
+            "userId": user_login.json()["userId"],
+        })
+        booking.raise_for_status()
+        booking_id = booking.json()["bookingId"]
+        for n in range(participants):
+            (await client.post("/participant/add", json={
+                "bookingId": booking_id, "name": f"Pilgrim {n}", "age": 30,
+                "gender": "Male", "photoIdType": "Aadhaar", "photoIdNumber": f"{suffix}{n}",
+            })).raise_for_status()
+        payment = await client.post("/payment/create", json={
+            "bookingId": booking_id, "amount": 100.0, "paymentMethod": "UPI",
+        })
+        payment.raise_for_status()
+        pid = payment.json()["paymentId"]
+        webhook = await client.post("/payment/webhook", json={
+            "our_payment_id": pid, "gateway_txn_id": f"BENCH{pid}", "status": "SUCCESS",
+        })
+        webhook.raise_for_status()
+        ticket_id, token = webhook.json()["ticket_url"].split("/ticket/", 1)[1].split("?t=", 1)
+        tickets.append((ticket_id, token))
+    return tickets
+
+
+async def _run(base_url: str, count: int, participants: int, clients: int, duration: float, verify: bool) -> None:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        tickets = await _setup(client, count, participants)
+        latencies = []
+        suffix = "/verify" if verify else ""
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                ticket_id, token = random.choice(tickets)
+                t0 = time.perf_counter()
+                r = await client.get(f"/ticket/{ticket_id}{suffix}", params={"t": token})
+                latencies.append(time.perf_counter() - t0)
+                r.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda xs, p: xs[min(len(xs) - 1, int(len(xs) * p))] * 1000
+
+    print(f"Endpoint: {'verify' if verify else 'view'}  Tickets: {count}  Participants/booking: {participants}  "
+          f"Clients: {clients}")
+    print(f"Scan throughput: {len(latencies) / elapsed:.1f} req/s  ({len(latencies)} scans in {elapsed:.2f}s)")
+    print(f"Scan latency ms  p50={pct(latencies, 0.50):.1f}  p95={pct(latencies, 0.95):.1f}  "
+          f"p99={pct(latencies, 0.99):.1f}  mean={statistics.mean(latencies) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--participants", type=int, default=6)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--verify", action="store_true", help="scan /ticket/{id}/verify instead of the full view")
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.count, args.participants, args.clients, args.duration, args.verify))
@@ -0,0 +1,143 @@
+"""
+Benchmark: payment webhook throughput with inline vs pooled ticket rendering.
+
+Creates a fresh admin, user and temple plus COUNT bookings with pending
+payments, then confirms all payments through /payment/webhook from CLIENTS
+concurrent connections. While the webhooks run, a probe requests /metrics
+every 50ms; its latency shows how long the event loop is blocked.
+With pre-rendering on, finally waits until every ticket image is READY.
+
+Run the server once per mode and compare:
+    TICKET_PRERENDER=true TICKET_RENDER_MODE=inline uvicorn main:app --port 8000
+    TICKET_PRERENDER=true TICKET_RENDER_MODE=pool   uvicorn main:app --port 8000
+    uvicorn main:app --port 8000     # default: images rendered on first view
+
+    python scripts/bench_ticket_webhook.py --base-url http://localhost:8000 --count 200 --clients 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+
+async def _setup(client: httpx.AsyncClient, count: int) -> list:
+    suffix = random.randint(100000, 999999)
+
+    admin = {"adminName": f"benchadmin{suffix}", "email": f"benchadmin{suffix}@example.com", "password": "adminpass123"}
+    (await client.post("/admin/auth/register", json=admin)).raise_for_status()
+    login = await client.post("/admin/auth/login", data={"username": admin["email"], "password": admin["password"]})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    user = {
+        "userName": f"benchuser{suffix}", "firstName": "Bench", "lastName": "Test",
+        "mobileNumber": f"91000{suffix % 100000:05d}", "email": f"benchuser{suffix}@example.com",
+        "gender": "Male", "state": "Karnataka", "city": "Bangalore", "password": "testpass123",
+    }
+    (await client.post("/users/register", json=user)).raise_for_status()
+    user_login = await client.post("/auth/login", json={"identifier": user["email"], "password": user["password"]})
+    user_login.raise_for_status()
+
+    temple = await client.post(
+        "/temples/", json={"templeName": f"Bench Temple {suffix}", "location": "Bench"}, headers=headers
+    )
+    temple.raise_for_status()
+
+    payment_ids = []
+    for _ in range(count):
+        booking = await client.post("/bookings/", json={
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=1)).isoformat(),
+            "templeId": temple.json()["templeId"],
+            "userId": user_login.json()["userId"],
+        })
+        booking.raise_for_status()
+        payment = await client.post("/payment/create", json={
+            "bookingId": booking.json()["bookingId"], "amount": 100.0, "paymentMethod": "UPI",
+        })
+        payment.raise_for_status()
+        payment_ids.append(payment.json()["paymentId"])
+    return payment_ids
+
+
+async def _run(base_url: str, count: int, clients: int) -> None:
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        payment_ids = await _setup(client, count)
+
+        queue = asyncio.Queue()
+        for pid in payment_ids:
+            queue.put_nowait(pid)
+        latencies, tickets = [], []
+        done = asyncio.Event()
+
+        async def worker():
+            while True:
+                try:
+                    pid = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                r = await client.post("/payment/webhook", json={
+                    "our_payment_id": pid, "gateway_txn_id": f"BENCH{pid}", "status": "SUCCESS",
+                })
+                latencies.append(time.perf_counter() - t0)
+                r.raise_for_status()
+                tickets.append(r.json()["ticket_url"].split("/ticket/", 1)[1])
+
+        probes = []
+
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/metrics")
+                probes.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+        # Wait for pre-rendered images (no-op in inline / on-demand mode)
+        pending = list(tickets)
+        while pending:
+            still = []
+            for path in pending:
+                ticket_id, token = path.split("?t=", 1)
+                body = (await client.get(f"/ticket/{ticket_id}", params={"t": token})).json()
+                if body.get("image_status", "READY") == "PENDING":
+                    still.append(path)
+            pending = still
+            if pending:
+                await asyncio.sleep(0.2)
+        rendered = time.perf_counter() - started
+
+    latencies.sort()
+    probes.sort()
+    pct = lambda xs, p: xs[min(len(xs) - 1, int(len(xs) * p))] * 1000
+
+    print(f"Webhooks: {count}  Clients: {clients}")
+    print(f"Webhook throughput: {count / elapsed:.1f} req/s  ({elapsed:.2f}s)")
+    print(f"Webhook latency ms  p50={pct(latencies, 0.50):.1f}  p95={pct(latencies, 0.95):.1f}  "
+          f"p99={pct(latencies, 0.99):.1f}  mean={statistics.mean(latencies) * 1000:.1f}")
+    print(f"Probe (/metrics) latency ms  p50={pct(probes, 0.50):.1f}  p99={pct(probes, 0.99):.1f}  "
+          f"max={probes[-1] * 1000:.1f}")
+    print(f"No ticket images pending after {rendered:.2f}s ({count / rendered:.1f} tickets/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.count, args.clients))
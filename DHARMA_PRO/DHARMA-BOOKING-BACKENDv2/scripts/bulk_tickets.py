@@ -0,0 +1,85 @@
+"""
+Print a batch of tickets (kiosk counter / festival day) into one PDF.
+
+Uses the same code as POST /ticket/bulk, in-process, against DATABASE_URL:
+selects the bookings, creates any missing Ticket rows in one commit, builds
+the QR pages on the render pool (TICKET_RENDER_MODE / TICKET_RENDER_WORKERS)
+and writes a single multi-page PDF. Reports tickets/sec.
+
+Usage:
+    python scripts/bulk_tickets.py --temple-id 3 --date 2026-01-14 --out tickets.pdf
+    python scripts/bulk_tickets.py --booking-ids 101 102 103 --out tickets.pdf
+
+    # benchmark: seed COUNT counter bookings on a scratch database first
+    DATABASE_URL=sqlite:////tmp/bulk.db python scripts/bulk_tickets.py --seed 2000 --out /tmp/bulk.pdf
+"""
+import argparse
+import os
+import sys
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import create_tablesdb  # noqa: F401  (registers every model)
+from api.payments import ticket_bulk, ticket_renderer
+from database.database import Base, SessionLocal, engine
+from database.models.booking.booking_model import Booking
+from database.models.booking.booking_participant_model import BookingParticipant
+from database.models.temple.temple_model import Temple
+
+
+def _seed(count: int, day: date) -> int:
+    """Create a temple with COUNT counter bookings (two participants each) on `day`."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        temple = Temple(templeName="Bulk Print Temple", location="Bench")
+        db.add(temple)
+        db.flush()
+        bookings = [
+            Booking(
+                bookingType="OFFLINE",
+                special=False,
+                bookingDate=datetime.combine(day, datetime.min.time()),
+                templeId=temple.templeId,
+                numberOfParticipants=2,
+                participants=[
+                    BookingParticipant(name=f"Devotee {i}-{n}", age=30, gender="Female") for n in range(2)
+                ],
+            )
+            for i in range(count)
+        ]
+        db.add_all(bookings)
+        db.commit()
+        return temple.templeId
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--temple-id", type=int)
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--booking-ids", type=int, nargs="+")
+    parser.add_argument("--seed", type=int, metavar="COUNT", help="create COUNT counter bookings first")
+    parser.add_argument("--out", default="tickets.pdf")
+    args = parser.parse_args()
+
+    temple_id = _seed(args.seed, args.date) if args.seed else args.temple_id
+    if temple_id is None and not args.booking_ids:
+        parser.error("give --temple-id (with --date), --booking-ids or --seed")
+
+    ticket_renderer.start()
+    db = SessionLocal()
+    try:
+        result = ticket_bulk.generate(db, temple_id=temple_id, day=args.date, booking_ids=args.booking_ids)
+    finally:
+        db.close()
+        ticket_renderer.stop()
+
+    with open(args.out, "wb") as f:
+        f.write(result["pdf"])
+    print(f"{result['count']} tickets ({result['created']} new) -> {args.out}  "
+          f"{len(result['pdf']) / 1e6:.1f} MB")
+    print(f"{result['seconds']:.2f}s  {result['tickets_per_second']:.1f} tickets/s "
+          f"(mode={ticket_renderer.TICKET_RENDER_MODE}, workers={ticket_renderer.TICKET_RENDER_WORKERS})")
@@ -0,0 +1,35 @@
+"""
+Generate an Ed25519 key pair for signed ticket tokens.
+
+Put the private key in the server environment (never on gate devices):
+    TICKET_TOKEN_MODE=signed
+    TICKET_SIGNING_ALG=ed25519
+    TICKET_SIGNING_KEY=<private key>
+
+Gate devices verify with the public key (also served at GET /ticket/signing-key).
+
+Usage:
+    python scripts/gen_ticket_signing_key.py
+"""
+import argparse
+import base64
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    key = Ed25519PrivateKey.generate()
+    private = key.private_bytes(
+        serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()
+    )
+    public = key.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    print(f"TICKET_SIGNING_KEY={_b64(private)}")
+    print(f"# public key (for gate devices): {_b64(public)}")
@@ -0,0 +1,137 @@
+"""
+Load test: many concurrent clients booking the same (hot) slot.
+
+Creates a fresh admin, user, temple and one slot with CAPACITY online tickets,
+then fires REQUESTS booking attempts from CLIENTS concurrent connections.
+Verifies that exactly CAPACITY bookings succeeded (zero oversell) and reports
+throughput and latency percentiles.
+
+Usage (server must be running):
+    python scripts/load_test_hot_slot.py --base-url http://localhost:8000 \
+        --clients 500 --requests 5000 --capacity 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+
+async def _setup(client: httpx.AsyncClient, capacity: int) -> dict:
+    suffix = random.randint(100000, 999999)
+
+    admin = {"adminName": f"loadadmin{suffix}", "email": f"loadadmin{suffix}@example.com", "password": "adminpass123"}
+    (await client.post("/admin/auth/register", json=admin)).raise_for_status()
+    login = await client.post("/admin/auth/login", data={"username": admin["email"], "password": admin["password"]})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    user = {
+        "userName": f"loaduser{suffix}", "firstName": "Load", "lastName": "Test",
+        "mobileNumber": f"90000{suffix % 100000:05d}", "email": f"loaduser{suffix}@example.com",
+        "gender": "Male", "state": "Karnataka", "city": "Bangalore", "password": "testpass123",
+    }
+    (await client.post("/users/register", json=user)).raise_for_status()
+    user_login = await client.post("/auth/login", json={"identifier": user["email"], "password": user["password"]})
+    user_login.raise_for_status()
+
+    temple = await client.post(
+        "/temples/", json={"templeName": f"Load Temple {suffix}", "location": "Bench"}, headers=headers
+    )
+    temple.raise_for_status()
+
+    slot_date = date.today() + timedelta(days=1)
+    slot = await client.post(
+        "/slots/",
+        json={
+            "templeId": temple.json()["templeId"],
+            "date": slot_date.isoformat(),
+            "startTime": "05:00:00",
+            "endTime": "06:00:00",
+            "capacity": capacity,
+            "reservedOfflineTickets": 0,
+        },
+        headers=headers,
+    )
+    slot.raise_for_status()
+
+    return {
+        "templeId": temple.json()["templeId"],
+        "slotId": slot.json()["slotId"],
+        "userId": user_login.json()["userId"],
+        "bookingDate": slot_date.isoformat(),
+    }
+
+
+async def _run(base_url: str, clients: int, total: int, capacity: int) -> None:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        ctx = await _setup(client, capacity)
+        booking = {
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": ctx["bookingDate"],
+            "templeId": ctx["templeId"],
+            "userId": ctx["userId"],
+            "slotId": ctx["slotId"],
+        }
+
+        latencies = []
+        codes = {}
+        queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+
+        async def worker():
+            while True:
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post("/bookings/", json=booking)
+                    code = r.status_code
+                except httpx.HTTPError as e:
+                    code = type(e).__name__
+                latencies.append(time.perf_counter() - t0)
+                codes[code] = codes.get(code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        slot = (await client.get(f"/slots/{ctx['slotId']}")).json()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(f"Clients: {clients}  Requests: {total}  Capacity: {capacity}")
+    print(f"Status codes: {codes}")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {total / elapsed:.1f} req/s "
+          f"({codes.get(201, 0) / elapsed:.1f} bookings/s)")
+    print(f"Latency ms  p50={pct(0.50):.1f}  p95={pct(0.95):.1f}  p99={pct(0.99):.1f}  "
+          f"mean={statistics.mean(latencies) * 1000:.1f}")
+    print(f"Slot remaining after run: {slot['remaining']}")
+
+    booked = codes.get(201, 0)
+    expected = min(total, capacity)
+    oversold = booked > capacity or slot["remaining"] < 0
+    if oversold or booked != expected or slot["remaining"] != capacity - booked:
+        print(f"❌ Inventory mismatch: booked={booked} expected={expected} remaining={slot['remaining']}")
+        raise SystemExit(1)
+    print("✅ Zero oversell: bookings + remaining == capacity")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.base_url, args.clients, args.requests, args.capacity))
@@ -1,6 +1,9 @@
 """
 Shared fixtures for API testing
 """
+import itertools
+import random
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
@@ -10,6 +13,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# 4-digit suffixes for emails / names: distinct within a run (random ones
+# collided once the suite registered a few hundred users and admins)
+_suffixes = itertools.count(random.randint(1000, 4999))
+
 @pytest.fixture(scope="session")
 def test_client():
     """Create a test client for the FastAPI app"""
@@ -26,8 +33,7 @@ def base_url():
 @pytest.fixture(scope="function")
 def test_user_data():
     """Sample user data for testing"""
-    import random
-    rand_num = random.randint(1000, 9999)
+    rand_num = next(_suffixes)
     return {
         "userName": f"testuser{rand_num}",
         "firstName": "Test",
@@ -44,8 +50,7 @@ def test_user_data():
 @pytest.fixture(scope="function")
 def test_admin_data():
     """Sample admin data for testing"""
-    import random
-    rand_num = random.randint(1000, 9999)
+    rand_num = next(_suffixes)
     return {
         "adminName": f"testadmin{rand_num}",
         "email": f"testadmin{rand_num}@example.com",
@@ -113,8 +118,7 @@ def registered_admin(test_client, test_admin_data):
 @pytest.fixture(scope="function")
 def test_temple_data():
     """Sample temple data for testing"""
-    import random
-    rand_num = random.randint(1000, 9999)
+    rand_num = next(_suffixes)
     return {
         "templeName": f"Test Temple {rand_num}",
         "location": f"Test Location {rand_num}"
@@ -133,3 +137,56 @@ def created_temple(test_client, registered_admin, test_temple_data):
     
     temple = response.json()
     return temple
+
+
+@pytest.fixture(scope="function")
+def fake_sms_server(monkeypatch):
+    """Local fake SMS relay; points the outbox dispatcher (env URL) at it"""
+    from tests.fake_sms_server import FakeSMSServer
+
+    server = FakeSMSServer().start()
+    monkeypatch.setenv("URL", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="function")
+def ticket_image_dir(tmp_path, monkeypatch):
+    """Point the ticket image cache at a temporary directory"""
+    from api.payments import ticket_image_cache
+
+    cache = ticket_image_cache.DiskLRU(str(tmp_path / "tickets"), 50 * 1024 * 1024)
+    monkeypatch.setattr(ticket_image_cache, "image_cache", cache)
+    return cache
+
+
+@pytest.fixture(scope="function")
+def confirmed_ticket(test_client, registered_user, created_temple):
+    """Booking + payment confirmed through the gateway webhook; returns the ticket info"""
+    from datetime import date, timedelta
+
+    booking = test_client.post("/bookings/", json={
+        "bookingType": "ONLINE",
+        "special": False,
+        "bookingDate": (date.today() + timedelta(days=2)).isoformat(),
+        "templeId": created_temple["templeId"],
+        "userId": registered_user["user_id"],
+    })
+    assert booking.status_code == 201, f"Booking creation failed: {booking.json()}"
+    payment = test_client.post("/payment/create", json={
+        "bookingId": booking.json()["bookingId"],
+        "amount": 100.0,
+        "paymentMethod": "UPI",
+    })
+    assert payment.status_code == 200, f"Payment creation failed: {payment.json()}"
+    response = test_client.post("/payment/webhook", json={
+        "our_payment_id": payment.json()["paymentId"],
+        "gateway_txn_id": f"TXN{payment.json()['paymentId']}",
+        "status": "SUCCESS",
+    })
+    assert response.status_code == 200, f"Webhook failed: {response.json()}"
+
+    ticket = response.json()["ticket"]
+    ticket["token"] = ticket["ticket_url"].split("t=", 1)[1]
+    ticket["bookingId"] = booking.json()["bookingId"]
+    return ticket
@@ -0,0 +1,103 @@
+"""
+Local stand-in for the ngrok -> Twilio SMS relay.
+
+Accepts POST {"mobile": ..., "message": ...} on any path and answers
+{"status": "sent"}. Can be slowed down (delay, or delay_for one mobile number)
+or made to fail the first N requests for a given mobile number, to exercise
+the outbox retry path.
+
+Standalone:
+    python tests/fake_sms_server.py --port 5055 --delay 2
+    URL=http://127.0.0.1:5055/send-sms uvicorn main:app
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSMSServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+        self.delay = delay
+        self.fail_counts = {}      # mobile -> number of requests still to fail
+        self.delays = {}           # mobile -> seconds, instead of delay
+        self.received = []         # list of payload dicts that were accepted
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/send-sms"
+
+    def fail_next(self, mobile: str, times: int = 1) -> None:
+        with self._lock:
+            self.fail_counts[mobile] = times
+
+    def delay_for(self, mobile: str, seconds: float) -> None:
+        with self._lock:
+            self.delays[mobile] = seconds
+
+    def messages_for(self, mobile: str):
+        with self._lock:
+            return [p for p in self.received if p.get("mobile") == mobile]
+
+    def start(self) -> "FakeSMSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    delay = fake.delays.get(payload.get("mobile"), fake.delay)
+                if delay:
+                    time.sleep(delay)
+
+                with fake._lock:
+                    mobile = payload.get("mobile")
+                    remaining_failures = fake.fail_counts.get(mobile, 0)
+                    if remaining_failures:
+                        fake.fail_counts[mobile] = remaining_failures - 1
+                    else:
+                        fake.received.append(payload)
+
+                code, body = (503, {"status": "unavailable"}) if remaining_failures else (200, {"status": "sent"})
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake SMS relay")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeSMSServer(port=args.port, delay=args.delay).start()
+    print(f"Fake SMS relay listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,6 +1,6 @@
 """
 Test suite for Booking APIs
-Tests: Create, Read All, Read One, Read by User, Update, Delete
+Tests: Create, Read All (keyset pages, filters), Export, Read One, Read by User, Update, Delete
 """
 import pytest
 from datetime import date, timedelta
@@ -52,6 +52,92 @@ class TestBookingAPIs:
         data = response.json()
         assert isinstance(data, list)
     
+    def test_get_all_bookings_keyset_pages(self, test_client, registered_user, registered_admin, created_temple):
+        """Pages follow X-Next-Cursor and stop when it is absent"""
+        day = date.today() + timedelta(days=11)
+        created = []
+        for special in (False, True, False, True, False):
+            response = test_client.post("/bookings/", json={
+                "bookingType": "ONLINE", "special": special, "bookingDate": day.isoformat(),
+                "templeId": created_temple["templeId"], "userId": registered_user["user_id"],
+            })
+            created.append(response.json()["bookingId"])
+
+        params = {"templeId": created_temple["templeId"], "dateFrom": day.isoformat(), "dateTo": day.isoformat(), "limit": 2}
+        seen, pages = [], 0
+        while True:
+            response = test_client.get("/bookings/", params=params, headers=registered_admin["headers"])
+            assert response.status_code == 200
+            seen += [b["bookingId"] for b in response.json()]
+            pages += 1
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["after"] = response.headers["X-Next-Cursor"]
+        assert seen == created
+        assert pages == 3
+
+        special = test_client.get("/bookings/", params={
+            "templeId": created_temple["templeId"], "special": True, "dateFrom": day.isoformat(),
+        }, headers=registered_admin["headers"]).json()
+        assert [b["bookingId"] for b in special] == created[1::2]
+
+        elsewhere = test_client.get("/bookings/", params={
+            "templeId": created_temple["templeId"], "dateTo": (day - timedelta(days=1)).isoformat(),
+        }, headers=registered_admin["headers"]).json()
+        assert not set(created) & {b["bookingId"] for b in elsewhere}
+
+    def test_get_all_bookings_page_size_capped(self, test_client, registered_admin, monkeypatch):
+        from api.bookings import booking_router
+
+        monkeypatch.setattr(booking_router, "BOOKINGS_PAGE_MAX", 1)
+        response = test_client.get("/bookings/", params={"limit": 500}, headers=registered_admin["headers"])
+        assert response.status_code == 200
+        assert len(response.json()) <= 1
+
+    def test_export_ndjson_csv_gzip(self, test_client, registered_user, registered_admin, created_temple):
+        """Export streams the filtered bookings as NDJSON / CSV, optionally gzipped"""
+        import csv
+        import gzip
+        import io
+        import json
+
+        day = date.today() + timedelta(days=13)
+        created = [
+            test_client.post("/bookings/", json={
+                "bookingType": "ONLINE", "special": False, "bookingDate": day.isoformat(),
+                "templeId": created_temple["templeId"], "userId": registered_user["user_id"],
+            }).json()["bookingId"]
+            for _ in range(3)
+        ]
+        params = {"templeId": created_temple["templeId"], "dateFrom": day.isoformat(), "dateTo": day.isoformat()}
+
+        response = test_client.get("/bookings/export", params=params, headers=registered_admin["headers"])
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["bookingId"] for r in rows] == created
+        assert rows[0]["templeId"] == created_temple["templeId"]
+        assert rows[0]["paymentStatus"] is None
+
+        response = test_client.get(
+            "/bookings/export", params=dict(params, format="csv"), headers=registered_admin["headers"]
+        )
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [int(r["bookingId"]) for r in rows] == created
+
+        with test_client.stream(
+            "GET", "/bookings/export", params=dict(params, format="csv", gzip="true"),
+            headers=registered_admin["headers"],
+        ) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            raw = b"".join(response.iter_raw())
+        assert len(gzip.decompress(raw).decode().splitlines()) == 4   # header + 3 bookings
+
+    def test_export_requires_admin_and_known_format(self, test_client, registered_user, registered_admin):
+        assert test_client.get("/bookings/export", headers=registered_user["headers"]).status_code == 403
+        response = test_client.get("/bookings/export", params={"format": "xml"}, headers=registered_admin["headers"])
+        assert response.status_code == 400
+
     def test_get_booking_by_id(self, test_client, registered_user, registered_admin, created_temple):
         """Test getting specific booking by ID"""
         # Create booking first
@@ -117,3 +203,189 @@ class TestBookingAPIs:
         # Delete the booking
         response = test_client.delete(f"/bookings/{booking_id}")
         assert response.status_code == 200
+
+
+@pytest.mark.booking
+class TestSlotInventory:
+
+    def _create_slot(self, test_client, registered_admin, temple_id, capacity, start="06:00:00", end="07:00:00"):
+        slot_data = {
+            "templeId": temple_id,
+            "date": (date.today() + timedelta(days=2)).isoformat(),
+            "startTime": start,
+            "endTime": end,
+            "capacity": capacity,
+            "reservedOfflineTickets": 0,
+        }
+        response = test_client.post("/slots/", json=slot_data, headers=registered_admin["headers"])
+        assert response.status_code == 201, response.json()
+        return response.json()
+
+    def _booking_data(self, registered_user, temple_id, slot_id):
+        return {
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=2)).isoformat(),
+            "templeId": temple_id,
+            "userId": registered_user["user_id"],
+            "slotId": slot_id,
+        }
+
+    def test_booking_decrements_remaining_and_rejects_when_sold_out(
+        self, test_client, registered_user, registered_admin, created_temple
+    ):
+        """Bookings take tickets from the slot and stop at zero"""
+        slot = self._create_slot(test_client, registered_admin, created_temple["templeId"], capacity=2)
+        booking_data = self._booking_data(registered_user, created_temple["templeId"], slot["slotId"])
+
+        assert test_client.post("/bookings/", json=booking_data).status_code == 201
+        assert test_client.post("/bookings/", json=booking_data).status_code == 201
+
+        response = test_client.post("/bookings/", json=booking_data)
+        assert response.status_code == 409
+
+        slot_after = test_client.get(f"/slots/{slot['slotId']}").json()
+        assert slot_after["remaining"] == 0
+
+    def test_delete_booking_releases_ticket(
+        self, test_client, registered_user, registered_admin, created_temple
+    ):
+        """Cancelling a booking gives its ticket back to the slot"""
+        slot = self._create_slot(
+            test_client, registered_admin, created_temple["templeId"], capacity=1, start="07:00:00", end="08:00:00"
+        )
+        booking_data = self._booking_data(registered_user, created_temple["templeId"], slot["slotId"])
+
+        booking_id = test_client.post("/bookings/", json=booking_data).json()["bookingId"]
+        assert test_client.get(f"/slots/{slot['slotId']}").json()["remaining"] == 0
+
+        assert test_client.delete(f"/bookings/{booking_id}").status_code == 200
+        assert test_client.get(f"/slots/{slot['slotId']}").json()["remaining"] == 1
+
+    def test_concurrent_bookings_never_oversell(
+        self, test_client, registered_user, registered_admin, created_temple
+    ):
+        """Many parallel requests for the last few tickets: exactly `capacity` succeed"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        capacity = 5
+        slot = self._create_slot(
+            test_client, registered_admin, created_temple["templeId"], capacity=capacity, start="08:00:00", end="09:00:00"
+        )
+        booking_data = self._booking_data(registered_user, created_temple["templeId"], slot["slotId"])
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            codes = list(pool.map(lambda _: test_client.post("/bookings/", json=booking_data).status_code, range(20)))
+
+        assert codes.count(201) == capacity
+        assert codes.count(409) == 20 - capacity
+        assert test_client.get(f"/slots/{slot['slotId']}").json()["remaining"] == 0
+
+
+@pytest.mark.booking
+class TestHotSlotMode:
+
+    def _today_slot(self, test_client, registered_admin, temple_id, capacity):
+        slot_data = {
+            "templeId": temple_id,
+            "date": date.today().isoformat(),
+            "startTime": "04:00:00",
+            "endTime": "05:00:00",
+            "capacity": capacity,
+            "reservedOfflineTickets": 0,
+        }
+        response = test_client.post("/slots/", json=slot_data, headers=registered_admin["headers"])
+        assert response.status_code == 201, response.json()
+        return response.json()
+
+    def test_hot_slot_sells_exactly_capacity(self, test_client, registered_user, registered_admin, created_temple):
+        """Today's slot served from sharded counters: no oversell, tickets reconciled on stop"""
+        from api.bookings import hot_slots
+
+        slot = self._today_slot(test_client, registered_admin, created_temple["templeId"], capacity=3)
+        booking_data = {
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": date.today().isoformat(),
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+            "slotId": slot["slotId"],
+        }
+
+        hot_slots.start()
+        try:
+            assert hot_slots.is_active()
+            codes = [test_client.post("/bookings/", json=booking_data).status_code for _ in range(4)]
+        finally:
+            hot_slots.stop()
+
+        assert codes == [201, 201, 201, 409]
+        assert test_client.get(f"/slots/{slot['slotId']}").json()["remaining"] == 0
+
+    def test_recover_returns_tickets_leased_by_dead_process(self, test_client, registered_admin, created_temple):
+        """A lease left behind by a crash is given back, capped by real bookings"""
+        from api.bookings import hot_slots
+        from database.database import SessionLocal
+        from database.models.booking.slot_model import Slot
+        from database.models.booking.slot_lease_model import SlotLease
+
+        slot = self._today_slot(test_client, registered_admin, created_temple["templeId"], capacity=10)
+
+        # Simulate a process that leased 6 tickets and died
+        db = SessionLocal()
+        try:
+            db.query(Slot).filter(Slot.slotId == slot["slotId"]).update({"remaining": 4})
+            db.add(SlotLease(slotId=slot["slotId"], tokens=6))
+            db.commit()
+        finally:
+            db.close()
+
+        hot_slots.recover()
+
+        assert test_client.get(f"/slots/{slot['slotId']}").json()["remaining"] == 10
+
+    def test_counter_spreads_one_thread_over_shards(self):
+        """Shards are picked per call, not per thread: with DB_ASYNC every request is on the loop thread"""
+        from api.bookings.hot_slots import HotSlotCounter
+
+        counter = HotSlotCounter(slot_id=1, temple_id=1, shards=4)
+        for _ in range(4):
+            counter.put(1)
+        assert [shard.tokens for shard in counter.shards] == [1, 1, 1, 1]
+
+    def test_lease_left_to_reconciler_on_event_loop(self, test_client, registered_admin, created_temple):
+        """On the event loop an empty counter queues its lease instead of blocking on the sync engine"""
+        import asyncio
+        from api.bookings import hot_slots
+        from database.database import SessionLocal
+        from database.models.booking.slot_model import Slot
+
+        slot = self._today_slot(test_client, registered_admin, created_temple["templeId"], capacity=5)
+        counter = hot_slots.HotSlotCounter(slot["slotId"], created_temple["templeId"], shards=2)
+        hot_slots._counters[slot["slotId"]] = counter
+
+        def remaining():
+            db = SessionLocal()
+            try:
+                return db.query(Slot.remaining).filter(Slot.slotId == slot["slotId"]).scalar()
+            finally:
+                db.close()
+
+        async def reserve():
+            db = SessionLocal()
+            try:
+                return hot_slots.try_reserve(db, slot["slotId"], created_temple["templeId"], 1)
+            finally:
+                db.close()
+
+        db = SessionLocal()
+        try:
+            assert asyncio.run(reserve()) is False   # caller falls back to the row lock
+            assert counter.available() == 0 and remaining() == 5
+
+            hot_slots._run_jobs()                    # reconciler thread's turn
+            assert counter.available() == 5 and remaining() == 0
+        finally:
+            hot_slots._retire(db, counter)
+            db.close()
+        assert remaining() == 5
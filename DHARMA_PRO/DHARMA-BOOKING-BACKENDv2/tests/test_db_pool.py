@@ -0,0 +1,60 @@
+"""
+Test suite for the database connection pool configuration
+Tests: pool metrics on /metrics, checkout timeouts counted, in-memory SQLite left alone
+"""
+import pytest
+from sqlalchemy import create_engine, exc
+
+from api.monitoring import db_pool, metrics
+from database import database, pool
+from database.database import DB_ASYNC
+
+
+@pytest.fixture
+def tiny_engine(tmp_path):
+    """One connection, no overflow, 50 ms timeout"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=pool.TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    pool.instrument(engine, "test")
+    db_pool.install()
+    yield engine
+    pool.engines.pop("test", None)
+    engine.dispose()
+
+
+class TestPoolMetrics:
+
+    def test_metrics_expose_pool_state(self, test_client, created_temple):
+        assert test_client.get(f"/temples/{created_temple['templeId']}").status_code == 200
+        assert test_client.get("/bookings/user/0").status_code == 200      # async route
+
+        body = test_client.get("/metrics").text
+        label = "async" if DB_ASYNC else "sync"
+        assert f'dharma_db_pool_size{{pool="sync"}} {database.DB_POOL_SIZE}' in body
+        assert 'dharma_db_pool_checked_out{pool="sync"}' in body
+        assert 'dharma_db_pool_overflow{pool="sync"}' in body
+        assert f'dharma_db_pool_wait_seconds_count{{pool="{label}"}}' in body
+        assert f'dharma_db_pool_connections_opened_total{{pool="{label}"}}' in body
+
+    def test_checkout_timeout_is_counted(self, tiny_engine):
+        before = db_pool.FAILURES.value(pool="test", reason="timeout")
+        waits = db_pool.WAIT.count(pool="test")
+
+        with tiny_engine.connect():
+            metrics.render()
+            assert db_pool.CHECKED_OUT.value(pool="test") == 1
+            with pytest.raises(exc.TimeoutError):
+                tiny_engine.connect()
+
+        assert db_pool.FAILURES.value(pool="test", reason="timeout") == before + 1
+        assert db_pool.WAIT.count(pool="test") == waits + 1
+        metrics.render()
+        assert db_pool.CHECKED_OUT.value(pool="test") == 0
+
+    def test_in_memory_sqlite_keeps_its_pool(self):
+        assert database.pool_options("sqlite://", pool.TimedQueuePool) == {}
+        options = database.pool_options("postgresql://u:p@db/dharma", pool.TimedQueuePool)
+        assert options["pool_size"] == database.DB_POOL_SIZE
+        assert options["pool_pre_ping"] == database.DB_POOL_PRE_PING
@@ -0,0 +1,128 @@
+"""
+Test suite for the shared outbound HTTP client
+Tests: circuit breaker transitions, open circuit keeps SMS queued, /metrics exposition
+"""
+import time
+import pytest
+from datetime import date, timedelta
+
+from api.notifications import http_client
+from api.notifications.http_client import CircuitBreaker
+from tests.test_sms_outbox import _clear_backlog, _sms_rows, _wait_for_status
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        assert not breaker.is_open()
+
+        breaker.record_failure()
+        assert breaker.is_open()
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open()
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()           # trial request
+        assert not breaker.allow()       # others still fail fast
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.booking
+class TestOutboundClient:
+
+    def _booking_data(self, registered_user, created_temple):
+        return {
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=4)).isoformat(),
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+        }
+
+    def test_open_circuit_leaves_sms_queued(
+        self, test_client, registered_user, created_temple, fake_sms_server
+    ):
+        """While the relay's breaker is open the dispatcher does not claim (or burn attempts on) rows"""
+        breaker = http_client.breaker_for(fake_sms_server.url)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        mobile = registered_user["user_data"]["mobileNumber"]
+        _clear_backlog()
+
+        response = test_client.post("/bookings/", json=self._booking_data(registered_user, created_temple))
+        assert response.status_code == 201
+
+        time.sleep(0.5)
+        rows = _sms_rows(mobile)
+        assert rows[-1].status == "PENDING"
+        assert rows[-1].attempts == 0
+        assert not fake_sms_server.messages_for(mobile)
+
+        breaker.record_success()
+        rows = _wait_for_status(mobile, "SENT")
+        assert rows[-1].status == "SENT"
+
+    def test_half_open_claims_a_single_trial(
+        self, test_client, registered_user, created_temple, fake_sms_server, monkeypatch
+    ):
+        """Half-open lets one request through: one row is claimed, the others keep their attempts"""
+        from api.notifications import sms_outbox
+
+        monkeypatch.setattr(sms_outbox, "SMS_BACKOFF_SECONDS", 0.2)
+        breaker = http_client.breaker_for(fake_sms_server.url)
+        monkeypatch.setattr(breaker, "reset_seconds", 60)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        mobile = registered_user["user_data"]["mobileNumber"]
+        _clear_backlog()
+        fake_sms_server.fail_next(mobile, times=1)   # the first trial fails: OPEN again
+
+        for _ in range(3):
+            response = test_client.post("/bookings/", json=self._booking_data(registered_user, created_temple))
+            assert response.status_code == 201
+        time.sleep(0.3)
+        assert [r.attempts for r in _sms_rows(mobile)] == [0, 0, 0]
+
+        breaker.reset_seconds = 0.2
+        rows = _wait_for_status(mobile, "SENT")
+        assert [r.status for r in rows] == ["SENT"] * 3
+        assert sorted(r.attempts for r in rows) == [1, 1, 2]
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_metrics_expose_relay_latency_and_outcomes(
+        self, test_client, registered_user, created_temple, fake_sms_server
+    ):
+        mobile = registered_user["user_data"]["mobileNumber"]
+        _clear_backlog()
+        response = test_client.post("/bookings/", json=self._booking_data(registered_user, created_temple))
+        assert response.status_code == 201
+        assert _wait_for_status(mobile, "SENT")[-1].status == "SENT"
+
+        host = fake_sms_server.url.split("//", 1)[1].split("/", 1)[0]
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        body = response.text
+        assert f'dharma_http_client_requests_total{{host="{host}",outcome="2xx"}}' in body
+        assert f'dharma_http_client_request_seconds_count{{host="{host}"}}' in body
+        assert "# TYPE dharma_http_client_in_flight gauge" in body
@@ -0,0 +1,136 @@
+"""
+Test suite for payment endpoints
+Tests: create payment, gateway webhook, background ticket image rendering
+"""
+import os
+import time
+import pytest
+from datetime import date, timedelta
+
+
+def _wait_for_image(test_client, ticket_id, token, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        body = test_client.get(f"/ticket/{ticket_id}", params={"t": token}).json()
+        if body["image_status"] != "PENDING":
+            return body
+        time.sleep(0.1)
+    return body
+
+
+@pytest.mark.payment
+class TestPaymentWebhook:
+
+    @pytest.fixture
+    def payment(self, test_client, registered_user, created_temple):
+        booking = test_client.post("/bookings/", json={
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=2)).isoformat(),
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+        })
+        assert booking.status_code == 201
+        response = test_client.post("/payment/create", json={
+            "bookingId": booking.json()["bookingId"],
+            "amount": 100.0,
+            "paymentMethod": "UPI",
+        })
+        assert response.status_code == 200
+        assert response.json()["paymentStatus"] == "pending"
+        return response.json()
+
+    def _confirm(self, test_client, payment):
+        return test_client.post("/payment/webhook", json={
+            "our_payment_id": payment["paymentId"],
+            "gateway_txn_id": f"TXN{payment['paymentId']}",
+            "status": "SUCCESS",
+        })
+
+    def test_webhook_creates_ticket_without_rendering(self, test_client, payment, ticket_image_dir):
+        """By default the image is only rendered when someone views it"""
+        response = self._confirm(test_client, payment)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["paymentStatus"] == "confirmed"
+        assert data["ticket"]["image_status"] == "ON_DEMAND"
+        assert data["image_url"].endswith(f"/ticket/{data['ticket']['ticket_id']}/image?t="
+                                          + data["ticket_url"].split("t=", 1)[1])
+        directory = ticket_image_dir.directory
+        assert not os.path.isdir(directory) or not os.listdir(directory)
+
+    def test_prerender_queues_image_and_pool_renders_it(self, test_client, payment, ticket_image_dir, monkeypatch):
+        """With TICKET_PRERENDER the webhook returns PENDING and the render pool marks it READY"""
+        from api.payments import ticket_renderer
+
+        monkeypatch.setattr(ticket_renderer, "TICKET_PRERENDER", True)
+        response = self._confirm(test_client, payment)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ticket"]["image_status"] == "PENDING"
+
+        ticket_id = data["ticket"]["ticket_id"]
+        body = _wait_for_image(test_client, ticket_id, data["ticket_url"].split("t=", 1)[1])
+        assert body["image_status"] == "READY"
+        assert [name for name in os.listdir(ticket_image_dir.directory) if name.startswith(ticket_id)]
+
+    def test_webhook_is_idempotent(self, test_client, payment, ticket_image_dir):
+        first = self._confirm(test_client, payment)
+        assert first.status_code == 200
+
+        second = self._confirm(test_client, payment)
+        assert second.status_code == 200
+        assert second.json()["message"] == "Already confirmed"
+
+    def test_failed_payment_creates_no_ticket(self, test_client, payment):
+        response = test_client.post("/payment/webhook", json={
+            "our_payment_id": payment["paymentId"],
+            "gateway_txn_id": "TXNFAILED",
+            "status": "FAILED",
+        })
+        assert response.status_code == 200
+        assert response.json()["paymentStatus"] == "cancelled"
+
+
+class TestTicketTemplateCache:
+
+    @pytest.fixture
+    def cache(self, tmp_path, monkeypatch):
+        from PIL import Image
+        from api.payments import ticket_service
+
+        default = tmp_path / "default.png"
+        Image.new("RGB", (64, 64), "white").save(default)
+        monkeypatch.setattr(ticket_service, "TEMPLATE_PATH", str(default))
+        monkeypatch.setattr(ticket_service, "TEMPLATE_DIR", str(tmp_path / "ticket_templates"))
+        return ticket_service.TemplateCache()
+
+    def test_decodes_once_and_hands_out_copies(self, cache):
+        first = cache.get()
+        first.paste((255, 0, 0, 255), (0, 0, 64, 64))
+        second = cache.get()
+
+        assert cache.misses == 1 and cache.hits == 1
+        assert second.mode == "RGBA"
+        assert second.getpixel((0, 0)) == (255, 255, 255, 255)
+
+    def test_reloads_when_file_changes(self, cache):
+        from PIL import Image
+        from api.payments import ticket_service
+
+        cache.get()
+        Image.new("RGB", (64, 64), "black").save(ticket_service.TEMPLATE_PATH)
+        stat = os.stat(ticket_service.TEMPLATE_PATH)
+        os.utime(ticket_service.TEMPLATE_PATH, (stat.st_atime, stat.st_mtime + 5))
+
+        assert cache.get().getpixel((0, 0)) == (0, 0, 0, 255)
+        assert cache.misses == 2
+
+    def test_per_temple_template_overrides_default(self, cache, tmp_path):
+        from PIL import Image
+
+        (tmp_path / "ticket_templates").mkdir()
+        Image.new("RGB", (64, 64), "blue").save(tmp_path / "ticket_templates" / "7.png")
+
+        assert cache.get(7).getpixel((0, 0)) == (0, 0, 255, 255)
+        assert cache.get(8).getpixel((0, 0)) == (255, 255, 255, 255)
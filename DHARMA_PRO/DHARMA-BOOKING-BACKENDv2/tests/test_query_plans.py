@@ -0,0 +1,212 @@
+"""
+Query-plan regression tests
+Seeds a few thousand bookings, slots, payments, participants and tickets,
+calls the booking / slot / participant / ticket / payment endpoints while
+recording their SELECTs, then EXPLAINs each one and fails on a full scan of a
+table holding more than SEQ_SCAN_ROW_THRESHOLD rows (SQLite: SCAN <table>;
+PostgreSQL: Seq Scan with enable_seqscan off, i.e. no usable index).
+"""
+import re
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+SEED_TEMPLES = 10
+SEED_SLOTS_PER_TEMPLE = 150
+SEED_BOOKINGS = 3000
+SEQ_SCAN_ROW_THRESHOLD = 1000
+
+# background workers share the engine; only request queries are checked
+BACKGROUND_THREADS = ("ticket-verify", "hot-slot", "asyncio_")
+
+START = date.today() + timedelta(days=400)
+
+
+@pytest.fixture(scope="module")
+def plan_data(test_client):
+    """Seeded rows (core inserts); returns ids the cases query by"""
+    from sqlalchemy import insert, select
+    from database.database import SessionLocal, engine
+    from database.models.booking.booking_model import Booking
+    from database.models.booking.booking_participant_model import BookingParticipant
+    from database.models.booking.slot_model import Slot
+    from database.models.common.ticket_model import Ticket
+    from database.models.payment.payment_model import Payment
+    from database.models.temple.temple_model import Temple
+    from database.models.user.user_model import User
+
+    run = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        temples = [Temple(templeName=f"Plan Temple {run} {n}", location="Plan") for n in range(SEED_TEMPLES)]
+        users = [
+            User(userName=f"plan{run}{n}", firstName="Plan", lastName="User", mobileNumber="9000000000",
+                 email=f"plan{run}{n}@example.com", password="x", gender="Male", state="KA", city="BLR")
+            for n in range(20)
+        ]
+        db.add_all(temples + users)
+        db.commit()
+        temple_ids = [t.templeId for t in temples]
+        user_ids = [u.userId for u in users]
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        conn.execute(insert(Slot), [
+            {"templeId": temple_id, "date": START + timedelta(days=n), "slotNumber": n + 1,
+             "startTime": time(6), "endTime": time(7), "capacity": 100, "reservedOfflineTickets": 0,
+             "onlineTickets": 100, "remaining": 100}
+            for temple_id in temple_ids for n in range(SEED_SLOTS_PER_TEMPLE)
+        ])
+        slots = conn.execute(
+            select(Slot.slotId, Slot.templeId, Slot.date).where(Slot.templeId.in_(temple_ids))
+        ).all()
+        conn.execute(insert(Booking), [
+            {"bookingType": "ONLINE", "special": False, "templeId": slot.templeId, "slotId": slot.slotId,
+             "userId": user_ids[n % len(user_ids)], "numberOfParticipants": 1,
+             "bookingDate": datetime.combine(slot.date, time())}
+            for n, slot in enumerate(slots[i % len(slots)] for i in range(SEED_BOOKINGS))
+        ])
+        booking_ids = conn.execute(
+            select(Booking.bookingId).where(Booking.templeId.in_(temple_ids)).order_by(Booking.bookingId)
+        ).scalars().all()
+        conn.execute(insert(Payment), [
+            {"bookingId": b, "amount": 100.0, "paymentMethod": "UPI", "paymentStatus": "confirmed"} for b in booking_ids
+        ])
+        conn.execute(insert(BookingParticipant), [
+            {"bookingId": b, "name": "Plan Pilgrim", "age": 30, "gender": "Male",
+             "photoIdType": "Aadhaar", "photoIdNumber": "0000"}
+            for b in booking_ids
+        ])
+        conn.execute(insert(Ticket), [
+            {"id": uuid.uuid4().hex[:12].upper(), "token": uuid.uuid4().hex, "booking_id": b,
+             "image_status": "ON_DEMAND"}
+            for b in booking_ids
+        ])
+
+    return {
+        "temple_id": temple_ids[0],
+        "slot_id": slots[0].slotId,
+        "user_id": user_ids[0],
+        "day": START.isoformat(),
+        "booking_id": booking_ids[0],
+        "spare_booking_id": booking_ids[-1],
+    }
+
+
+@pytest.fixture
+def recorded_selects():
+    """(statement, parameters) of every SELECT run by request handlers while active"""
+    from sqlalchemy import event
+    from database.database import async_engine, engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # the test's own EXPLAINs run on the main thread, handlers on worker threads
+        thread = threading.current_thread()
+        if thread is threading.main_thread() or thread.name.startswith(BACKGROUND_THREADS):
+            return
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            if conn.dialect.paramstyle == "numeric_dollar":
+                # asyncpg ($1, $2) -> psycopg2 (%s), so the EXPLAIN can run on the sync engine
+                order = [int(n) - 1 for n in re.findall(r"\$(\d+)", statement)]
+                statement = re.sub(r"\$\d+", "%s", statement.replace("%", "%%"))
+                parameters = tuple(parameters[i] for i in order)
+            statements.append((statement, parameters))
+
+    # with DB_ASYNC the async routes run on async_engine
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for e in engines:
+        event.listen(e, "before_cursor_execute", record)
+    yield statements
+    for e in engines:
+        event.remove(e, "before_cursor_execute", record)
+
+
+def _full_scans(statement, parameters):
+    """Tables the plan reads in full"""
+    from database.database import engine
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            conn.exec_driver_sql("RESET enable_seqscan")
+            scans, nodes = [], [plan[0]["Plan"]]
+            while nodes:
+                node = nodes.pop()
+                if node["Node Type"] == "Seq Scan":
+                    scans.append(node["Relation Name"])
+                nodes.extend(node.get("Plans", []))
+            return scans
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [m.group(1) for m in (re.match(r"SCAN (\w+)", row[-1]) for row in rows) if m]
+
+
+def _row_count(table):
+    from sqlalchemy import inspect, text
+    from database.database import engine
+
+    if table not in inspect(engine).get_table_names():
+        return 0    # subquery / CTE
+    with engine.connect() as conn:
+        return conn.execute(text(f'SELECT count(*) FROM "{table}"')).scalar()
+
+
+CASES = {
+    "bookings by temple": lambda c, d, h: c.get("/bookings/", params={"templeId": d["temple_id"]}, headers=h),
+    "bookings by temple + day": lambda c, d, h: c.get(
+        "/bookings/", params={"templeId": d["temple_id"], "dateFrom": d["day"], "dateTo": d["day"]}, headers=h),
+    "bookings by slot": lambda c, d, h: c.get("/bookings/", params={"slotId": d["slot_id"]}, headers=h),
+    "bookings by day": lambda c, d, h: c.get(
+        "/bookings/", params={"dateFrom": d["day"], "dateTo": d["day"]}, headers=h),
+    "bookings of user": lambda c, d, h: c.get(f"/bookings/user/{d['user_id']}"),
+    "booking by id": lambda c, d, h: c.get(f"/bookings/{d['booking_id']}"),
+    "export temple day": lambda c, d, h: c.get(
+        "/bookings/export", params={"templeId": d["temple_id"], "dateFrom": d["day"], "dateTo": d["day"]}, headers=h),
+    "slots of temple + day": lambda c, d, h: c.get("/slots/", params={"templeId": d["temple_id"], "date": d["day"]}),
+    "slots of day": lambda c, d, h: c.get("/slots/", params={"date": d["day"]}),
+    "slot availability": lambda c, d, h: c.get(
+        "/slots/availability", params={"templeId": d["temple_id"], "date": d["day"]}),
+    "create slot": lambda c, d, h: c.post("/slots/", json={
+        "templeId": d["temple_id"], "date": (START - timedelta(days=1)).isoformat(),
+        "startTime": "06:00:00", "endTime": "07:00:00", "capacity": 10}, headers=h),
+    "participants of booking": lambda c, d, h: c.get(f"/participant/booking/{d['booking_id']}"),
+    "payment + ticket": lambda c, d, h: c.post("/payment/webhook", json={
+        "our_payment_id": c.post("/payment/create", json={
+            "bookingId": d["booking_id"], "amount": 10.0, "paymentMethod": "UPI"}).json()["paymentId"],
+        "gateway_txn_id": "PLAN", "status": "SUCCESS"}),
+    "cancel booking": lambda c, d, h: c.delete(f"/bookings/{d['spare_booking_id']}"),
+}
+
+
+@pytest.mark.booking
+class TestQueryPlans:
+
+    @pytest.mark.parametrize("case", list(CASES))
+    def test_no_full_scan_of_large_tables(self, case, test_client, registered_admin, plan_data, recorded_selects):
+        response = CASES[case](test_client, plan_data, registered_admin["headers"])
+        assert response.status_code < 300, response.text
+        assert recorded_selects
+
+        offenders = []
+        for statement, parameters in recorded_selects:
+            for table in _full_scans(statement, parameters):
+                if _row_count(table) > SEQ_SCAN_ROW_THRESHOLD:
+                    offenders.append(f"{table}: {' '.join(statement.split())[:200]}")
+        assert not offenders, "full table scans:\n" + "\n".join(offenders)
+
+    def test_ticket_view_and_verify(self, test_client, plan_data, confirmed_ticket, recorded_selects):
+        from api.bookings import ticket_verify
+
+        ticket_verify.cache.clear()
+        ticket, token = confirmed_ticket["ticket_id"], confirmed_ticket["token"]
+        assert test_client.get(f"/ticket/{ticket}", params={"t": token}).status_code == 200
+        assert test_client.get(f"/ticket/{ticket}/verify", params={"t": token}).json()["valid"] is True
+
+        for statement, parameters in recorded_selects:
+            large = [t for t in _full_scans(statement, parameters) if _row_count(t) > SEQ_SCAN_ROW_THRESHOLD]
+            assert not large, f"full scan of {large}: {statement}"
@@ -0,0 +1,76 @@
+"""
+Test suite for the query profiling mode
+Tests: duplicate / slow statement detection, Server-Timing header, runtime switch, admin-only access
+"""
+import pytest
+
+from api.monitoring.query_profiler import RequestProfile, profiler
+
+
+@pytest.fixture
+def profiling(test_client, registered_admin):
+    """Query profiling on for one test (slow = 1 s, so nothing is slow)"""
+    response = test_client.put(
+        "/debug/query-profile", json={"enabled": True, "slowMs": 1000}, headers=registered_admin["headers"]
+    )
+    assert response.status_code == 200
+    yield
+    test_client.put("/debug/query-profile", json={"enabled": False}, headers=registered_admin["headers"])
+
+
+class TestRequestProfile:
+
+    def test_duplicates_and_slow_statements(self):
+        profile = RequestProfile()
+        profile.record("SELECT * FROM admins WHERE id = ?", (1,), 0.002)
+        profile.record("SELECT * FROM admins WHERE id = ?", (1,), 0.003)
+        profile.record("SELECT * FROM admins WHERE id = ?", (2,), 0.001)      # other parameters
+        profile.record("SELECT * FROM bookings", (), 0.250)
+
+        assert profile.statements == 4
+        assert profile.duplicates() == [("SELECT * FROM admins WHERE id = ?", [0.002, 0.003])]
+        assert profile.slow(0.1) == [("SELECT * FROM bookings", 0.250)]
+        assert profile.server_timing(0.1) == (
+            'db;dur=256.0, db-statements;desc="4", db-dup;desc="1", db-slow;dur=250.0;desc="1"'
+        )
+
+
+class TestQueryProfileMode:
+
+    def test_off_by_default_no_header(self, test_client, created_temple):
+        assert not profiler.enabled
+        response = test_client.get(f"/temples/{created_temple['templeId']}")
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_server_timing_and_report_while_on(self, test_client, registered_admin, created_temple, profiling):
+        response = test_client.get(f"/temples/{created_temple['templeId']}")
+        assert response.status_code == 200
+        timing = dict(entry.split(";", 1) for entry in response.headers["server-timing"].split(", "))
+        assert float(timing["db"].removeprefix("dur=")) > 0
+        assert int(timing["db-statements"].removeprefix("desc=").strip('"')) >= 1
+        assert timing["db-dup"] == 'desc="0"'
+
+        report = test_client.get("/debug/query-profile", headers=registered_admin["headers"]).json()
+        assert report["enabled"] is True
+        assert report["slowMs"] == 1000
+        row = next(r for r in report["routes"] if r["route"] == "/temples/{temple_id}")
+        assert row["requests"] == 1
+        assert row["statementsPerRequest"] >= 1
+
+    def test_switched_off_at_runtime(self, test_client, registered_admin, created_temple, profiling):
+        response = test_client.put(
+            "/debug/query-profile", json={"enabled": False}, headers=registered_admin["headers"]
+        )
+        assert response.status_code == 200
+        assert response.json()["enabled"] is False
+
+        response = test_client.get(f"/temples/{created_temple['templeId']}")
+        assert "server-timing" not in response.headers
+
+    def test_admin_only(self, test_client, registered_user):
+        response = test_client.put(
+            "/debug/query-profile", json={"enabled": True}, headers=registered_user["headers"]
+        )
+        assert response.status_code == 403
+        assert not profiler.enabled
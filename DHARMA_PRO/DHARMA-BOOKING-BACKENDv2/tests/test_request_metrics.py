@@ -0,0 +1,46 @@
+"""
+Test suite for the request metrics middleware
+Tests: per-route-template series, status codes, DB statements and time per request, /metrics exposition
+"""
+from api.monitoring.request_metrics import DB_QUERIES, DB_SECONDS, LATENCY, REQUESTS, UNMATCHED
+
+
+class TestRequestMetrics:
+
+    def test_requests_are_labelled_by_route_template(self, test_client, created_temple):
+        temple_id = created_temple["templeId"]
+        route = "/temples/{temple_id}"
+        ok = REQUESTS.value(method="GET", route=route, status=200)
+        missing = REQUESTS.value(method="GET", route=route, status=404)
+        timed = LATENCY.count(method="GET", route=route)
+
+        assert test_client.get(f"/temples/{temple_id}").status_code == 200
+        assert test_client.get("/temples/999999999").status_code == 404
+
+        assert REQUESTS.value(method="GET", route=route, status=200) == ok + 1
+        assert REQUESTS.value(method="GET", route=route, status=404) == missing + 1
+        assert LATENCY.count(method="GET", route=route) == timed + 2
+
+        body = test_client.get("/metrics").text
+        assert f'/temples/{temple_id}"' not in body
+        assert 'dharma_http_request_seconds_bucket{method="GET",route="/temples/{temple_id}",le="+Inf"}' in body
+
+    def test_unknown_paths_share_one_series(self, test_client):
+        before = REQUESTS.value(method="GET", route=UNMATCHED, status=404)
+        assert test_client.get("/no/such/path/123").status_code == 404
+        assert test_client.get("/no/such/path/456").status_code == 404
+        assert REQUESTS.value(method="GET", route=UNMATCHED, status=404) == before + 2
+
+    def test_database_statements_are_counted_per_request(self, test_client, created_temple):
+        # a `def` route (threadpool) and an `async def` one (run_sync / async engine)
+        for route, path in (
+            ("/temples/{temple_id}", f"/temples/{created_temple['templeId']}"),
+            ("/slots/", f"/slots/?templeId={created_temple['templeId']}"),
+        ):
+            queries = DB_QUERIES.sum(method="GET", route=route)
+            db_time = DB_SECONDS.sum(method="GET", route=route)
+
+            assert test_client.get(path).status_code == 200
+
+            assert DB_QUERIES.sum(method="GET", route=route) >= queries + 1, route
+            assert DB_SECONDS.sum(method="GET", route=route) > db_time, route
@@ -198,3 +198,383 @@ class TestSlotAPIs:
         # Verify deletion
         response = test_client.get(f"/slots/{slot_id}")
         assert response.status_code == 404
+
+    def _create(self, test_client, headers, temple_id, start, end, day=None):
+        day = day or date.today() + timedelta(days=7)
+        return test_client.post("/slots/", json={
+            "templeId": temple_id,
+            "date": day.isoformat(),
+            "startTime": start,
+            "endTime": end,
+            "capacity": 50,
+        }, headers=headers)
+
+    def test_create_overlapping_slot_rejected(self, test_client, registered_admin, created_temple):
+        """Overlapping slots of a temple on the same day are rejected; touching ones are fine"""
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        assert self._create(test_client, headers, temple_id, "09:00:00", "11:00:00").status_code == 201
+
+        response = self._create(test_client, headers, temple_id, "10:30:00", "12:00:00")
+        assert response.status_code == 400
+        assert "overlaps" in response.json()["detail"]
+
+        assert self._create(test_client, headers, temple_id, "11:00:00", "12:00:00").status_code == 201
+        other_day = date.today() + timedelta(days=8)
+        assert self._create(test_client, headers, temple_id, "09:30:00", "10:30:00", other_day).status_code == 201
+
+    def test_update_slot_into_overlap_rejected(self, test_client, registered_admin, created_temple):
+        """Moving a slot onto another one is rejected; resizing itself is not an overlap"""
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        self._create(test_client, headers, temple_id, "06:00:00", "07:00:00")
+        slot_id = self._create(test_client, headers, temple_id, "08:00:00", "09:00:00").json()["slotId"]
+
+        response = test_client.put(f"/slots/{slot_id}", json={"startTime": "06:30:00"}, headers=headers)
+        assert response.status_code == 400
+        assert test_client.get(f"/slots/{slot_id}").json()["startTime"] == "08:00:00"
+
+        response = test_client.put(f"/slots/{slot_id}", json={"startTime": "07:00:00"}, headers=headers)
+        assert response.status_code == 200
+
+    def test_overlap_exclusion_constraint_ddl(self):
+        """PostgreSQL gets the GiST exclusion constraint; other dialects skip it"""
+        from sqlalchemy.dialects import postgresql, sqlite
+        from sqlalchemy.schema import CreateTable
+        from database.models.booking.slot_model import SLOT_OVERLAP_CONSTRAINT, Slot
+
+        ddl = str(CreateTable(Slot.__table__).compile(dialect=postgresql.dialect()))
+        assert f"CONSTRAINT {SLOT_OVERLAP_CONSTRAINT} EXCLUDE USING gist" in ddl
+        assert '"templeId" WITH =' in ddl
+        assert """tsrange(date + "startTime", date + "endTime", '[)') WITH &&""" in ddl
+
+        assert SLOT_OVERLAP_CONSTRAINT not in str(CreateTable(Slot.__table__).compile(dialect=sqlite.dialect()))
+
+    def _rule(self, temple_id, **overrides):
+        start = date.today() + timedelta(days=30)
+        rule = {
+            "templeId": temple_id,
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=6)).isoformat(),
+            "openTime": "06:00:00",
+            "closeTime": "08:15:00",
+            "durationMinutes": 30,
+            "capacity": 40,
+            "reservedOfflineTickets": 10,
+        }
+        rule.update(overrides)
+        return rule
+
+    def test_bulk_create_schedule(self, test_client, registered_admin, created_temple):
+        """A week of 30-minute slots, 06:00-08:15 (the last 15 minutes do not fit a slot)"""
+        temple_id = created_temple["templeId"]
+        response = test_client.post("/slots/bulk", json=self._rule(temple_id), headers=registered_admin["headers"])
+        assert response.status_code == 201, response.text
+        assert response.json() == {"created": 28, "skipped": 0, "days": 7, "firstSlotNumber": 1, "lastSlotNumber": 28}
+
+        first_day = (date.today() + timedelta(days=30)).isoformat()
+        slots = test_client.get("/slots/", params={"templeId": temple_id, "date": first_day}).json()
+        assert [(s["startTime"], s["endTime"]) for s in slots] == [
+            ("06:00:00", "06:30:00"), ("06:30:00", "07:00:00"), ("07:00:00", "07:30:00"), ("07:30:00", "08:00:00"),
+        ]
+        assert all(s["onlineTickets"] == 30 and s["remaining"] == 30 for s in slots)
+
+    def test_bulk_create_weekdays(self, test_client, registered_admin, created_temple):
+        """Only the listed weekdays get slots"""
+        rule = self._rule(created_temple["templeId"], weekdays=[5, 6], closeTime="07:00:00", durationMinutes=60)
+        response = test_client.post("/slots/bulk", json=rule, headers=registered_admin["headers"])
+        assert response.status_code == 201
+        assert response.json()["created"] == 2 and response.json()["days"] == 2
+
+        slots = test_client.get("/slots/", params={"templeId": created_temple["templeId"]}).json()
+        assert {date.fromisoformat(s["date"]).weekday() for s in slots} == {5, 6}
+
+    def test_bulk_create_overlap(self, test_client, registered_admin, created_temple):
+        """Clashes with existing slots reject the whole schedule unless skipOverlapping"""
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        self._create(test_client, headers, temple_id, "07:10:00", "07:20:00", date.today() + timedelta(days=31))
+
+        response = test_client.post("/slots/bulk", json=self._rule(temple_id), headers=headers)
+        assert response.status_code == 400
+        assert "1 of 28" in response.json()["detail"]
+        assert len(test_client.get("/slots/", params={"templeId": temple_id}).json()) == 1
+
+        response = test_client.post("/slots/bulk", json=self._rule(temple_id, skipOverlapping=True), headers=headers)
+        assert response.status_code == 201
+        assert response.json()["created"] == 27 and response.json()["skipped"] == 1
+        assert response.json()["firstSlotNumber"] == 2
+
+    def test_bulk_create_invalid_rule(self, test_client, registered_admin, created_temple):
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        for overrides in ({"closeTime": "06:00:00"}, {"durationMinutes": 600}, {"weekdays": [7]},
+                          {"reservedOfflineTickets": 41}, {"endDate": date.today().isoformat()}):
+            response = test_client.post("/slots/bulk", json=self._rule(temple_id, **overrides), headers=headers)
+            assert response.status_code == 400, overrides
+
+    def test_bulk_create_requires_admin(self, test_client, registered_user, created_temple):
+        response = test_client.post("/slots/bulk", json=self._rule(created_temple["templeId"]),
+                                    headers=registered_user["headers"])
+        assert response.status_code == 403
+
+    def _slot_number(self, slot_id):
+        from database.database import SessionLocal
+        from database.models.booking.slot_model import Slot
+
+        db = SessionLocal()
+        try:
+            return db.query(Slot.slotNumber).filter(Slot.slotId == slot_id).scalar()
+        finally:
+            db.close()
+
+    def test_slot_numbers_continue_existing(self, test_client, registered_admin, created_temple):
+        """A temple's first counted slot continues after the highest existing slotNumber"""
+        from database.database import SessionLocal
+        from database.models.booking.slot_model import Slot
+
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        db = SessionLocal()
+        try:
+            db.add(Slot(templeId=temple_id, date=date.today() + timedelta(days=60), slotNumber=41,
+                        startTime=time(5), endTime=time(6), capacity=10, onlineTickets=10, remaining=10))
+            db.commit()
+        finally:
+            db.close()
+
+        slot_id = self._create(test_client, headers, temple_id, "07:00:00", "08:00:00").json()["slotId"]
+        assert self._slot_number(slot_id) == 42
+        response = test_client.post("/slots/bulk", json=self._rule(temple_id), headers=headers)
+        assert (response.json()["firstSlotNumber"], response.json()["lastSlotNumber"]) == (43, 70)
+        slot_id = self._create(test_client, headers, temple_id, "09:00:00", "10:00:00").json()["slotId"]
+        assert self._slot_number(slot_id) == 71
+
+    def test_concurrent_creates_get_distinct_numbers(self, test_client, registered_admin, created_temple):
+        """Parallel single and bulk creates never hand out the same slotNumber"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+
+        def single(n):
+            response = self._create(test_client, headers, temple_id, f"{n:02d}:00:00", f"{n:02d}:30:00")
+            return self._slot_number(response.json()["slotId"])
+
+        def bulk(n):
+            day = (date.today() + timedelta(days=100 + n)).isoformat()
+            body = test_client.post("/slots/bulk", json=self._rule(temple_id, startDate=day, endDate=day),
+                                    headers=headers).json()
+            return list(range(body["firstSlotNumber"], body["lastSlotNumber"] + 1))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            singles = list(pool.map(single, range(12)))
+            bulks = [number for numbers in pool.map(bulk, range(4)) for number in numbers]
+
+        numbers = singles + bulks
+        assert sorted(numbers) == list(range(1, 12 + 4 * 4 + 1))
+
+
+@pytest.mark.slot
+class TestSlotAvailability:
+
+    DAY = date.today() + timedelta(days=9)
+
+    def _slot(self, test_client, headers, temple_id, start="06:00:00", end="07:00:00", capacity=10):
+        return test_client.post("/slots/", json={
+            "templeId": temple_id, "date": self.DAY.isoformat(),
+            "startTime": start, "endTime": end, "capacity": capacity,
+        }, headers=headers).json()["slotId"]
+
+    def _get(self, test_client, temple_id, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return test_client.get("/slots/availability", params={"templeId": temple_id, "date": self.DAY.isoformat()},
+                               headers=headers)
+
+    def test_snapshot_and_not_modified(self, test_client, registered_admin, created_temple):
+        """Compact day snapshot with an ETag; a matching If-None-Match gets a 304"""
+        temple_id = created_temple["templeId"]
+        slot_id = self._slot(test_client, registered_admin["headers"], temple_id)
+
+        response = self._get(test_client, temple_id)
+        assert response.status_code == 200
+        assert response.json() == {"templeId": temple_id, "date": self.DAY.isoformat(), "slots": [
+            {"slotId": slot_id, "startTime": "06:00:00", "endTime": "07:00:00", "onlineTickets": 10, "remaining": 10},
+        ]}
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "public, no-cache"
+
+        not_modified = self._get(test_client, temple_id, etag)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etag
+        assert not_modified.content == b""
+        assert self._get(test_client, temple_id, f'"other", W/{etag}').status_code == 304
+
+    def test_served_from_cache(self, test_client, registered_admin, created_temple):
+        """Repeat polls are cache hits and run no query"""
+        from api.bookings import slot_availability
+
+        temple_id = created_temple["templeId"]
+        self._slot(test_client, registered_admin["headers"], temple_id)
+        self._get(test_client, temple_id)
+
+        hits = slot_availability.LOOKUPS.value(result="hit")
+        misses = slot_availability.LOOKUPS.value(result="miss")
+        for _ in range(5):
+            assert self._get(test_client, temple_id).status_code == 200
+        assert slot_availability.LOOKUPS.value(result="hit") == hits + 5
+        assert slot_availability.LOOKUPS.value(result="miss") == misses
+
+    def test_booking_and_cancel_refresh_snapshot(self, test_client, registered_user, registered_admin, created_temple):
+        """Booking and cancelling change remaining and the ETag at once (no TTL wait)"""
+        temple_id = created_temple["templeId"]
+        slot_id = self._slot(test_client, registered_admin["headers"], temple_id)
+        before = self._get(test_client, temple_id)
+
+        booking = test_client.post("/bookings/", json={
+            "bookingType": "ONLINE", "special": False, "bookingDate": self.DAY.isoformat(),
+            "templeId": temple_id, "userId": registered_user["user_id"], "slotId": slot_id,
+            "numberOfParticipants": 3,
+        })
+        assert booking.status_code == 201
+
+        after = self._get(test_client, temple_id, before.headers["ETag"])
+        assert after.status_code == 200
+        assert after.json()["slots"][0]["remaining"] == 7
+
+        assert test_client.delete(f"/bookings/{booking.json()['bookingId']}").status_code == 200
+        cancelled = self._get(test_client, temple_id, after.headers["ETag"])
+        assert cancelled.status_code == 200
+        assert cancelled.json()["slots"][0]["remaining"] == 10
+        assert cancelled.headers["ETag"] == before.headers["ETag"]
+
+    def test_slot_writes_refresh_snapshot(self, test_client, registered_admin, created_temple):
+        """Slot create, update, bulk create and delete all show up immediately"""
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        slot_id = self._slot(test_client, headers, temple_id)
+        assert len(self._get(test_client, temple_id).json()["slots"]) == 1
+
+        test_client.put(f"/slots/{slot_id}", json={"capacity": 20}, headers=headers)
+        assert self._get(test_client, temple_id).json()["slots"][0]["onlineTickets"] == 20
+
+        day = self.DAY.isoformat()
+        test_client.post("/slots/bulk", json={
+            "templeId": temple_id, "startDate": day, "endDate": day, "openTime": "08:00:00",
+            "closeTime": "09:00:00", "durationMinutes": 30, "capacity": 5,
+        }, headers=headers)
+        assert len(self._get(test_client, temple_id).json()["slots"]) == 3
+
+        test_client.delete(f"/slots/{slot_id}", headers=headers)
+        assert [s["startTime"] for s in self._get(test_client, temple_id).json()["slots"]] == ["08:00:00", "08:30:00"]
+
+    def test_empty_day_and_validation(self, test_client, created_temple):
+        response = test_client.get("/slots/availability", params={"templeId": created_temple["templeId"],
+                                                                  "date": "2031-01-01"})
+        assert response.status_code == 200
+        assert response.json()["slots"] == []
+        assert test_client.get("/slots/availability", params={"date": "2031-01-01"}).status_code == 422
+
+
+@pytest.mark.slot
+class TestSlotStream:
+
+    DAY = date.today() + timedelta(days=11)
+
+    def _slot(self, test_client, headers, temple_id, day=None, capacity=10):
+        return test_client.post("/slots/", json={
+            "templeId": temple_id, "date": (day or self.DAY).isoformat(),
+            "startTime": "06:00:00", "endTime": "07:00:00", "capacity": capacity,
+        }, headers=headers).json()["slotId"]
+
+    def _book(self, test_client, user_id, temple_id, slot_id, participants=1):
+        response = test_client.post("/bookings/", json={
+            "bookingType": "ONLINE", "special": False, "bookingDate": self.DAY.isoformat(),
+            "templeId": temple_id, "userId": user_id, "slotId": slot_id, "numberOfParticipants": participants,
+        })
+        assert response.status_code == 201
+        return response.json()["bookingId"]
+
+    def _open(self, test_client, temple_id, day=None):
+        """The endpoint's event stream, driven on the app's event loop (TestClient would wait for the end)"""
+        from api.bookings.slot_router import stream_slots
+
+        body = test_client.portal.call(stream_slots, temple_id, day).body_iterator
+        assert test_client.portal.call(body.__anext__) == b"retry: 5000\n\n"
+        return body
+
+    def _read(self, test_client, body):
+        import asyncio
+        import json
+
+        async def read():
+            return await asyncio.wait_for(body.__anext__(), 10)
+
+        chunk = test_client.portal.call(read)
+        return [json.loads(line[len(b"data: "):]) for line in chunk.split(b"\n") if line.startswith(b"data: ")] \
+            or chunk
+
+    def test_booking_cancel_and_update_push_events(self, test_client, registered_user, registered_admin,
+                                                   created_temple):
+        from api.bookings import slot_stream
+
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        slot_id = self._slot(test_client, headers, temple_id)
+        body = self._open(test_client, temple_id)
+        try:
+            booking_id = self._book(test_client, registered_user["user_id"], temple_id, slot_id, 3)
+            assert self._read(test_client, body) == [{
+                "slotId": slot_id, "templeId": temple_id, "date": self.DAY.isoformat(), "startTime": "06:00:00",
+                "endTime": "07:00:00", "capacity": 10, "onlineTickets": 10, "remaining": 7,
+            }]
+
+            assert test_client.delete(f"/bookings/{booking_id}").status_code == 200
+            assert self._read(test_client, body)[0]["remaining"] == 10
+
+            test_client.put(f"/slots/{slot_id}", json={"capacity": 20}, headers=headers)
+            assert self._read(test_client, body)[0]["capacity"] == 20
+
+            test_client.delete(f"/slots/{slot_id}", headers=headers)
+            assert self._read(test_client, body) == [{"slotId": slot_id, "templeId": temple_id, "deleted": True}]
+        finally:
+            test_client.portal.call(body.aclose)
+        assert not slot_stream.hub.watching(temple_id)
+
+    def test_slow_subscriber_gets_latest_state_only(self, test_client, registered_user, registered_admin,
+                                                    created_temple):
+        """Updates a connection has not read yet are replaced, not queued"""
+        import time
+        from api.bookings import slot_stream
+
+        temple_id = created_temple["templeId"]
+        slot_id = self._slot(test_client, registered_admin["headers"], temple_id)
+        body = self._open(test_client, temple_id)
+        try:
+            subscriber = next(iter(slot_stream.hub._by_temple[temple_id]))
+            for _ in range(3):
+                self._book(test_client, registered_user["user_id"], temple_id, slot_id)
+            deadline = time.monotonic() + 10
+            while b'"remaining":7' not in subscriber.pending.get(slot_id, b"") and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert len(subscriber.pending) == 1
+            assert [event["remaining"] for event in self._read(test_client, body)] == [7]
+        finally:
+            test_client.portal.call(body.aclose)
+
+    def test_only_followed_temple_and_date(self, test_client, registered_user, registered_admin, created_temple):
+        from api.bookings import slot_stream
+
+        headers, temple_id = registered_admin["headers"], created_temple["templeId"]
+        slot_id = self._slot(test_client, headers, temple_id)
+        other_day = self._open(test_client, temple_id, self.DAY + timedelta(days=1))
+        same_day = self._open(test_client, temple_id, self.DAY)
+        try:
+            self._book(test_client, registered_user["user_id"], temple_id, slot_id)
+            assert self._read(test_client, same_day)[0]["slotId"] == slot_id
+            test_client.portal.call(slot_stream.hub.ping)
+            assert self._read(test_client, other_day) == slot_stream.HEARTBEAT
+        finally:
+            test_client.portal.call(other_day.aclose)
+            test_client.portal.call(same_day.aclose)
+
+    def test_subscriber_limit(self, test_client, created_temple, monkeypatch):
+        from api.bookings import slot_stream
+
+        monkeypatch.setattr(slot_stream, "SLOT_STREAM_MAX_SUBSCRIBERS", 0)
+        response = test_client.get("/slots/stream", params={"templeId": created_temple["templeId"]})
+        assert response.status_code == 503
+        assert test_client.get("/slots/stream").status_code == 422
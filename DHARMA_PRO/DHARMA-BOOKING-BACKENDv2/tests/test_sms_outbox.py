@@ -0,0 +1,108 @@
+"""
+Test suite for the SMS outbox
+Tests: booking writes a PENDING row, dispatcher delivers it, retries with backoff
+"""
+import time
+import pytest
+from datetime import date, timedelta
+
+from database.database import SessionLocal
+from database.models.common.sms_model import SMSLog
+
+
+def _sms_rows(mobile):
+    db = SessionLocal()
+    try:
+        return db.query(SMSLog).filter(SMSLog.mobileNumber == mobile).order_by(SMSLog.id).all()
+    finally:
+        db.close()
+
+
+def _clear_backlog():
+    """Drop rows queued by earlier tests so the dispatcher only has this test's messages to send"""
+    db = SessionLocal()
+    try:
+        db.query(SMSLog).filter(SMSLog.status.in_(("PENDING", "SENDING"))).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _wait_for_status(mobile, status, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        rows = _sms_rows(mobile)
+        if rows and all(r.status == status for r in rows):
+            return rows
+        time.sleep(0.1)
+    return _sms_rows(mobile)
+
+
+@pytest.mark.booking
+class TestSMSOutbox:
+
+    def _booking_data(self, registered_user, created_temple):
+        return {
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": (date.today() + timedelta(days=4)).isoformat(),
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+        }
+
+    def test_booking_queues_sms_and_dispatcher_sends_it(
+        self, test_client, registered_user, created_temple, fake_sms_server
+    ):
+        """Booking returns without waiting on the relay; the outbox row is delivered later"""
+        mobile = registered_user["user_data"]["mobileNumber"]
+        fake_sms_server.delay_for(mobile, 1.5)
+        _clear_backlog()
+
+        started = time.perf_counter()
+        response = test_client.post("/bookings/", json=self._booking_data(registered_user, created_temple))
+        elapsed = time.perf_counter() - started
+
+        assert response.status_code == 201
+        assert elapsed < 1.5, "booking latency must not include the SMS relay"
+
+        rows = _wait_for_status(mobile, "SENT")
+        assert rows and rows[-1].status == "SENT"
+        assert f"Booking ID: {response.json()['bookingId']}" in rows[-1].message
+        assert fake_sms_server.messages_for(mobile)
+
+    def test_failed_send_is_retried_with_backoff(
+        self, test_client, registered_user, created_temple, fake_sms_server, monkeypatch
+    ):
+        """A relay error puts the row back to PENDING and a later attempt delivers it"""
+        from api.notifications import sms_outbox
+
+        monkeypatch.setattr(sms_outbox, "SMS_BACKOFF_SECONDS", 0.2)
+        mobile = registered_user["user_data"]["mobileNumber"]
+        fake_sms_server.fail_next(mobile, times=1)
+        _clear_backlog()
+
+        response = test_client.post("/bookings/", json=self._booking_data(registered_user, created_temple))
+        assert response.status_code == 201
+
+        rows = _wait_for_status(mobile, "SENT")
+        assert rows[-1].status == "SENT"
+        assert rows[-1].attempts == 2
+        assert rows[-1].lastError is None
+
+    def test_kiosk_booking_queues_sms_without_user(
+        self, test_client, registered_admin, created_temple, fake_sms_server
+    ):
+        """Kiosk bookings have no user account; the outbox row is still delivered"""
+        mobile = "9123400000"
+        kiosk_data = {
+            "mobileNumber": mobile,
+            "numberOfParticipants": 3,
+            "templeId": created_temple["templeId"],
+        }
+        _clear_backlog()
+        response = test_client.post("/bookings/kiosk/", json=kiosk_data, headers=registered_admin["headers"])
+        assert response.status_code == 201
+
+        rows = _wait_for_status(mobile, "SENT")
+        assert rows[-1].status == "SENT"
+        assert rows[-1].userId is None
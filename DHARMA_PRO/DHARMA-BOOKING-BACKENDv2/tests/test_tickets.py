@@ -0,0 +1,583 @@
+"""
+Test suite for ticket endpoints
+Tests: ticket view (query count), gate verification cache, admission
+ledger, signed tokens and revocations, on-demand ticket image with ETag / 304, svg/pdf output,
+QR drawing, on-disk LRU cache, bulk print bundles
+"""
+import os
+import pytest
+
+
+@pytest.mark.payment
+class TestTicketImage:
+
+    def test_view_ticket_points_at_image_endpoint(self, test_client, confirmed_ticket):
+        response = test_client.get(
+            f"/ticket/{confirmed_ticket['ticket_id']}", params={"t": confirmed_ticket["token"]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["booking_id"] == confirmed_ticket["bookingId"]
+        assert data["image_url"] == f"/ticket/{confirmed_ticket['ticket_id']}/image?t={confirmed_ticket['token']}"
+
+    def test_image_rendered_on_first_request_then_cached(self, test_client, confirmed_ticket, ticket_image_dir):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/image"
+        first = test_client.get(url, params={"t": confirmed_ticket["token"]})
+
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "image/png"
+        assert first.content.startswith(b"\x89PNG")
+        assert first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        files = os.listdir(ticket_image_dir.directory)
+        assert len(files) == 1 and files[0].startswith(confirmed_ticket["ticket_id"])
+
+        second = test_client.get(url, params={"t": confirmed_ticket["token"]})
+        assert second.status_code == 200
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert second.content == first.content
+
+    def test_if_none_match_returns_304(self, test_client, confirmed_ticket, ticket_image_dir):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/image"
+        etag = test_client.get(url, params={"t": confirmed_ticket["token"]}).headers["ETag"]
+
+        response = test_client.get(url, params={"t": confirmed_ticket["token"]}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    def test_frontend_url_change_invalidates(self, test_client, confirmed_ticket, ticket_image_dir, monkeypatch):
+        """The QR encodes FRONTEND_URL: changing it must not serve (or 304) the old image"""
+        from api.payments import ticket_service
+
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/image"
+        etag = test_client.get(url, params={"t": confirmed_ticket["token"]}).headers["ETag"]
+
+        monkeypatch.setattr(ticket_service, "FRONTEND_URL", "https://tickets.example.org")
+        response = test_client.get(url, params={"t": confirmed_ticket["token"]}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(os.listdir(ticket_image_dir.directory)) == 2
+
+    def test_printer_formats(self, test_client, confirmed_ticket, ticket_image_dir):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/image"
+        params = {"t": confirmed_ticket["token"]}
+
+        svg = test_client.get(url, params={**params, "format": "svg"})
+        assert svg.status_code == 200
+        assert svg.headers["content-type"].startswith("image/svg+xml")
+        assert svg.text.startswith("<svg") and "<path d=\"M" in svg.text
+
+        pdf = test_client.get(url, params={**params, "format": "pdf"})
+        assert pdf.status_code == 200
+        assert pdf.headers["content-type"] == "application/pdf"
+        assert pdf.content.startswith(b"%PDF-") and pdf.content.rstrip().endswith(b"%%EOF")
+        assert pdf.headers["ETag"] != svg.headers["ETag"]
+
+        assert test_client.get(url, params={**params, "format": "gif"}).status_code == 400
+
+    def test_image_requires_valid_token(self, test_client, confirmed_ticket, ticket_image_dir):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/image"
+        assert test_client.get(url, params={"t": "wrong"}).status_code == 403
+        assert test_client.get("/ticket/NOSUCHTICKET/image", params={"t": "x"}).status_code == 404
+
+
+@pytest.fixture
+def sql_statements():
+    """SQL statements touching ticket / booking tables while the fixture is active"""
+    from sqlalchemy import event
+    from database.database import async_engine, engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # background workers (SMS outbox, render recovery) share the engine
+        if "ticket" in statement or "booking" in statement:
+            statements.append(statement)
+
+    # with DB_ASYNC the async routes run on async_engine
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for e in engines:
+        event.listen(e, "before_cursor_execute", record)
+    yield statements
+    for e in engines:
+        event.remove(e, "before_cursor_execute", record)
+
+
+@pytest.mark.payment
+class TestTicketView:
+
+    def test_view_ticket_uses_two_queries(self, test_client, confirmed_ticket, sql_statements):
+        for n in range(3):
+            response = test_client.post("/participant/add", json={
+                "bookingId": confirmed_ticket["bookingId"], "name": f"Pilgrim {n}", "age": 30 + n,
+                "gender": "Female", "photoIdType": "Aadhaar", "photoIdNumber": f"1234{n}",
+            })
+            assert response.status_code == 201
+
+        del sql_statements[:]
+        response = test_client.get(
+            f"/ticket/{confirmed_ticket['ticket_id']}", params={"t": confirmed_ticket["token"]}
+        )
+        statements = list(sql_statements)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["participant_count"] == 3
+        assert data["participant_names"] == "Pilgrim 0, Pilgrim 1, Pilgrim 2"
+        assert data["name"] == "Pilgrim 0"
+        assert data["participants_details"][2] == {
+            "name": "Pilgrim 2", "age": 32, "gender": "Female", "id_type": "Aadhaar", "id_no": "12342",
+        }
+        # one row for ticket + booking + temple + slot, participants fetched flat (no join fan-out)
+        assert len(statements) == 2, statements
+        assert not any("JOIN booking_participants" in statement for statement in statements)
+
+    def test_view_ticket_requires_valid_token(self, test_client, confirmed_ticket):
+        assert test_client.get(f"/ticket/{confirmed_ticket['ticket_id']}", params={"t": "x"}).status_code == 403
+        assert test_client.get("/ticket/NOSUCHTICKET", params={"t": "x"}).status_code == 404
+
+
+@pytest.mark.payment
+class TestTicketVerify:
+
+    def _verify(self, test_client, ticket, token=None):
+        response = test_client.get(
+            f"/ticket/{ticket['ticket_id']}/verify", params={"t": ticket["token"] if token is None else token}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_valid_and_invalid(self, test_client, confirmed_ticket):
+        data = self._verify(test_client, confirmed_ticket)
+        assert data["valid"] is True
+        assert data["headcount"] == 1
+        assert data["booking_id"] == confirmed_ticket["bookingId"]
+
+        assert self._verify(test_client, confirmed_ticket, token="wrong") == {"valid": False}
+        assert test_client.get("/ticket/NOSUCHTICKET/verify", params={"t": "x"}).json() == {"valid": False}
+
+    def test_repeat_scan_served_from_cache(self, test_client, confirmed_ticket, sql_statements):
+        self._verify(test_client, confirmed_ticket)
+        first = len(sql_statements)
+        assert first == 1
+        for _ in range(5):
+            assert self._verify(test_client, confirmed_ticket)["valid"] is True
+        assert len(sql_statements) == first
+
+    def test_warm_loads_the_days_tickets(self, test_client, confirmed_ticket, sql_statements):
+        from datetime import date, timedelta
+        from api.bookings import ticket_verify
+
+        ticket_verify.cache.clear()
+        assert ticket_verify.warm(date.today() + timedelta(days=2)) >= 1
+        del sql_statements[:]
+        assert self._verify(test_client, confirmed_ticket)["valid"] is True
+        assert sql_statements == []
+
+    def test_booking_changes_invalidate(self, test_client, confirmed_ticket):
+        self._verify(test_client, confirmed_ticket)
+
+        for n in range(2):
+            response = test_client.post("/participant/add", json={
+                "bookingId": confirmed_ticket["bookingId"], "name": f"Pilgrim {n}", "age": 40,
+                "gender": "Male", "photoIdType": "Aadhaar", "photoIdNumber": f"99{n}",
+            })
+            assert response.status_code == 201
+        assert self._verify(test_client, confirmed_ticket)["headcount"] == 2
+
+        assert test_client.delete(f"/bookings/{confirmed_ticket['bookingId']}").status_code == 200
+        assert self._verify(test_client, confirmed_ticket) == {"valid": False}
+
+    def test_cache_is_bounded_lru_with_ttl(self, monkeypatch):
+        from api.bookings import ticket_verify
+
+        cache = ticket_verify.VerifyCache(max_entries=2, ttl=60)
+        cache.put("A", ("ta", 1, 1, "2026-01-01"))
+        cache.put("B", ("tb", 2, 1, "2026-01-01"))
+        assert cache.get("A")               # A is now most recently used
+        cache.put("C", ("tc", 2, 1, "2026-01-01"))
+        assert cache.get("B") is None and cache.get("A") and cache.get("C")
+        assert len(cache) == 2
+
+        cache.invalidate(booking_ids=[2])
+        assert cache.get("C") is None
+
+        now = ticket_verify.time.monotonic()
+        monkeypatch.setattr(ticket_verify.time, "monotonic", lambda: now + 61)
+        assert cache.get("A") is None
+
+
+@pytest.mark.payment
+class TestAdmissions:
+
+    def test_second_scan_already_admitted(self, test_client, confirmed_ticket, sql_statements):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/admit"
+        first = test_client.post(url, json={"gateId": "north-1", "t": confirmed_ticket["token"]})
+        assert first.status_code == 200
+        assert first.json()["status"] == "ADMITTED"
+        assert first.json()["headcount"] == 1
+
+        del sql_statements[:]
+        again = test_client.post(url, json={"gateId": "south-2", "t": confirmed_ticket["token"]}).json()
+        assert again["status"] == "ALREADY_ADMITTED"
+        assert again["admitted_gate"] == "north-1"
+        assert sql_statements == []     # verify cache + admitted memo
+
+    def test_admitted_elsewhere_read_from_ledger(self, test_client, confirmed_ticket):
+        from api.bookings import ticket_admissions
+
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/admit"
+        test_client.post(url, json={"gateId": "north-1", "t": confirmed_ticket["token"]})
+        ticket_admissions.admitted.clear()      # as if the first scan hit another worker
+
+        again = test_client.post(url, json={"gateId": "south-2", "t": confirmed_ticket["token"]}).json()
+        assert again["status"] == "ALREADY_ADMITTED"
+        assert again["admitted_gate"] == "north-1"
+
+    def test_invalid_token_not_recorded(self, test_client, confirmed_ticket):
+        url = f"/ticket/{confirmed_ticket['ticket_id']}/admit"
+        assert test_client.post(url, json={"gateId": "g", "t": "wrong"}).json()["status"] == "INVALID"
+        assert test_client.post(url, json={"gateId": "g", "t": confirmed_ticket["token"]}).json()["status"] == "ADMITTED"
+
+    def test_offline_batch_earliest_scan_wins(self, test_client, confirmed_ticket):
+        ticket_id, token = confirmed_ticket["ticket_id"], confirmed_ticket["token"]
+        response = test_client.post("/ticket/admissions/batch", json={"gateId": "east-3", "scans": [
+            {"ticketId": ticket_id, "t": token, "scannedAt": "2026-01-20T09:05:00"},
+            {"ticketId": "NOSUCHTICKET", "t": "x", "scannedAt": "2026-01-20T09:06:00"},
+            {"ticketId": ticket_id, "t": token, "scannedAt": "2026-01-20T09:01:00"},
+        ]})
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["admitted"], data["duplicates"], data["invalid"]) == (1, 1, 1)
+        assert [r["status"] for r in data["results"]] == ["ALREADY_ADMITTED", "INVALID", "ADMITTED"]
+        assert data["results"][0]["admitted_at"] == "2026-01-20 09:01:00"
+
+        # re-uploading the same buffer admits nothing new
+        again = test_client.post("/ticket/admissions/batch", json={"gateId": "east-3", "scans": [
+            {"ticketId": ticket_id, "t": token, "scannedAt": "2026-01-20T09:01:00"},
+        ]}).json()
+        assert again["admitted"] == 0 and again["duplicates"] == 1
+
+    def test_batch_limit(self, test_client, monkeypatch):
+        from api.bookings import ticket_admissions
+
+        monkeypatch.setattr(ticket_admissions, "TICKET_ADMISSION_BATCH_MAX", 2)
+        scans = [{"ticketId": f"T{n}", "t": "x"} for n in range(3)]
+        response = test_client.post("/ticket/admissions/batch", json={"gateId": "g", "scans": scans})
+        assert response.status_code == 400
+
+
+@pytest.fixture
+def signed_tokens(monkeypatch):
+    """Issue Ed25519-signed ticket tokens (fresh key per test)"""
+    import base64
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    from api.payments import ticket_tokens
+
+    seed = Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption()
+    )
+    monkeypatch.setattr(ticket_tokens, "TICKET_TOKEN_MODE", "signed")
+    monkeypatch.setattr(ticket_tokens, "TICKET_SIGNING_ALG", "ed25519")
+    monkeypatch.setattr(ticket_tokens, "TICKET_SIGNING_KEY", base64.urlsafe_b64encode(seed).decode().rstrip("="))
+    monkeypatch.setattr(ticket_tokens, "_ed25519_key", None)
+    monkeypatch.setattr(ticket_tokens, "_ed25519_public", None)
+    return ticket_tokens
+
+
+class TestTokenSigning:
+
+    CLAIMS = {"i": "ABCDEF123456", "b": 7, "t": 1, "s": None, "d": "2026-01-14", "h": 3}
+
+    def test_round_trip_and_tamper(self, signed_tokens):
+        import time
+        token = signed_tokens.sign({**self.CLAIMS, "e": int(time.time()) + 60})
+        assert signed_tokens.is_signed(token)
+        assert signed_tokens.decode(token)["h"] == 3
+
+        payload, signature = token.split(".")
+        forged = signed_tokens.sign({**self.CLAIMS, "h": 30, "e": int(time.time()) + 60}).split(".")[0]
+        assert signed_tokens.decode(f"{forged}.{signature}") is None
+        tampered = ("B" if signature[0] == "A" else "A") + signature[1:]
+        assert signed_tokens.decode(f"{payload}.{tampered}") is None
+        assert signed_tokens.decode(token, now=time.time() + 120) is None   # expired
+
+    def test_hmac(self, monkeypatch, signed_tokens):
+        import time
+        monkeypatch.setattr(signed_tokens, "TICKET_SIGNING_ALG", "hmac")
+        monkeypatch.setattr(signed_tokens, "TICKET_SIGNING_KEY", "gate-secret")
+        token = signed_tokens.sign({**self.CLAIMS, "e": int(time.time()) + 60})
+        assert signed_tokens.decode(token)["i"] == "ABCDEF123456"
+        monkeypatch.setattr(signed_tokens, "TICKET_SIGNING_KEY", "other-secret")
+        assert signed_tokens.decode(token) is None
+        assert signed_tokens.public_key() == {"alg": "HS256", "public_key": None}
+
+
+@pytest.mark.payment
+class TestSignedTickets:
+
+    def test_signed_ticket_verifies_without_database(self, signed_tokens, test_client, confirmed_ticket, sql_statements):
+        import base64
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+        from api.bookings import ticket_verify
+
+        token = confirmed_ticket["token"]
+        assert signed_tokens.is_signed(token)
+
+        # a gate device holding only the public key can check the payload
+        key = test_client.get("/ticket/signing-key").json()
+        assert key["alg"] == "EdDSA"
+        public = Ed25519PublicKey.from_public_bytes(base64.urlsafe_b64decode(key["public_key"] + "="))
+        payload, signature = token.split(".")
+        public.verify(base64.urlsafe_b64decode(signature + "=="), payload.encode())
+        claims = signed_tokens.decode(token)
+        assert claims["i"] == confirmed_ticket["ticket_id"] and claims["b"] == confirmed_ticket["bookingId"]
+
+        ticket_verify.revoked.refresh()
+        del sql_statements[:]
+        response = test_client.get(f"/ticket/{confirmed_ticket['ticket_id']}/verify", params={"t": token})
+        assert response.json()["valid"] is True
+        assert response.json()["headcount"] == 1
+        assert sql_statements == []
+
+        # the token still works as the ticket URL token
+        view = test_client.get(f"/ticket/{confirmed_ticket['ticket_id']}", params={"t": token})
+        assert view.status_code == 200
+
+    def test_cancelled_booking_is_revoked(self, signed_tokens, test_client, confirmed_ticket):
+        ticket_id, token = confirmed_ticket["ticket_id"], confirmed_ticket["token"]
+        since = test_client.get("/ticket/revocations", params={"since": 10 ** 9}).json()["next"]
+        last = test_client.get("/ticket/revocations", params={"limit": 5000}).json()["next"]
+
+        assert test_client.delete(f"/bookings/{confirmed_ticket['bookingId']}").status_code == 200
+
+        feed = test_client.get("/ticket/revocations", params={"since": last}).json()
+        assert [r["ticket_id"] for r in feed["revocations"]] == [ticket_id]
+        assert feed["next"] > last and feed["more"] is False
+        assert since == 10 ** 9   # nothing newer: cursor stays put
+        assert test_client.get(f"/ticket/{ticket_id}/verify", params={"t": token}).json() == {"valid": False}
+
+    def test_changed_booking_is_reissued(self, signed_tokens, test_client, registered_user, created_temple, confirmed_ticket):
+        from datetime import date, timedelta
+        from database.database import SessionLocal
+        from database.models.common.sms_model import SMSLog
+
+        ticket_id, token = confirmed_ticket["ticket_id"], confirmed_ticket["token"]
+        url = f"/bookings/{confirmed_ticket['bookingId']}"
+        payload = {
+            "bookingType": "ONLINE",
+            "special": True,
+            "bookingDate": (date.today() + timedelta(days=2)).isoformat(),
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+        }
+
+        # nothing the gate checks changed: same ticket
+        assert test_client.put(url, json=payload).status_code == 200
+        assert test_client.get(f"/ticket/{ticket_id}/verify", params={"t": token}).json()["valid"] is True
+
+        payload["bookingDate"] = (date.today() + timedelta(days=3)).isoformat()
+        assert test_client.put(url, json=payload).status_code == 200
+        assert test_client.get(f"/ticket/{ticket_id}/verify", params={"t": token}).json() == {"valid": False}
+
+        db = SessionLocal()
+        try:
+            sms = db.query(SMSLog).filter(SMSLog.message.contains("was changed")).order_by(SMSLog.id.desc()).first()
+        finally:
+            db.close()
+        new_id, new_token = sms.message.rsplit("/ticket/", 1)[1].split("?t=")
+        assert new_id != ticket_id
+        assert signed_tokens.decode(new_token)["d"] == payload["bookingDate"]
+        verified = test_client.get(f"/ticket/{new_id}/verify", params={"t": new_token}).json()
+        assert verified["valid"] is True and verified["booking_id"] == confirmed_ticket["bookingId"]
+
+    def test_admin_revoke(self, test_client, registered_admin, registered_user, confirmed_ticket):
+        ticket_id, token = confirmed_ticket["ticket_id"], confirmed_ticket["token"]
+        url = f"/ticket/{ticket_id}/revoke"
+
+        assert test_client.post(url, headers=registered_user["headers"]).status_code == 403
+        assert test_client.get(f"/ticket/{ticket_id}/verify", params={"t": token}).json()["valid"] is True
+
+        response = test_client.post(url, headers=registered_admin["headers"])
+        assert response.status_code == 200 and response.json()["already_revoked"] is False
+        assert test_client.post(url, headers=registered_admin["headers"]).json()["already_revoked"] is True
+        assert test_client.get(f"/ticket/{ticket_id}/verify", params={"t": token}).json() == {"valid": False}
+
+
+class TestQRDrawing:
+
+    def test_modules_drawn_at_target_size_without_resample(self):
+        from PIL import Image
+        from api.payments.ticket_service import _draw_qr, qr_matrix
+
+        matrix = qr_matrix("https://example.com/ticket/ABC?t=123")
+        n, size = len(matrix), 520
+        img = Image.new("RGBA", (600, 600), (255, 0, 0, 255))
+        _draw_qr(img, matrix, 40, 40, size)
+
+        # every module centre has the module's colour, and only pure black/white is used
+        for r in range(n):
+            for c in range(n):
+                x = 40 + int((c + 0.5) * size / n)
+                y = 40 + int((r + 0.5) * size / n)
+                expected = (0, 0, 0, 255) if matrix[r][c] else (255, 255, 255, 255)
+                assert img.getpixel((x, y)) == expected
+        colours = {colour for _, colour in img.crop((40, 40, 40 + size, 40 + size)).getcolors()}
+        assert colours == {(0, 0, 0, 255), (255, 255, 255, 255)}
+        assert img.getpixel((39, 39)) == (255, 0, 0, 255)
+        assert img.getpixel((40 + size, 40 + size)) == (255, 0, 0, 255)
+
+    def test_pdf_cross_reference_offsets(self):
+        import re
+        from api.payments.ticket_vector import ticket_pdf
+
+        pdf = ticket_pdf({"id": "ABCDEF123456", "token": "a" * 32})
+        startxref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        assert pdf[startxref:].startswith(b"xref")
+        offsets = [int(m) for m in re.findall(rb"(\d{10}) 00000 n", pdf)]
+        for number, offset in enumerate(offsets, start=1):
+            assert pdf[offset:].startswith(f"{number} 0 obj".encode())
+
+
+    def test_multi_page_pdf_embeds_template_once(self):
+        from api.payments.ticket_vector import tickets_pdf
+
+        pdf = tickets_pdf([{"id": f"T{i:011d}", "token": "a" * 32} for i in range(3)])
+        assert pdf.count(b"/Type /Page ") == 3
+        assert b"/Count 3" in pdf
+        assert pdf.count(b"/Subtype /Image") == 1
+
+
+@pytest.mark.payment
+class TestBulkTickets:
+
+    def test_bundle_for_temple_day(self, test_client, registered_admin, registered_user, created_temple, confirmed_ticket):
+        from datetime import date, timedelta
+
+        day = (date.today() + timedelta(days=2)).isoformat()
+        # counter booking without a ticket yet
+        kiosk = test_client.post("/bookings/kiosk/", json={
+            "mobileNumber": "9876500001",
+            "numberOfParticipants": 2,
+            "bookingDate": day,
+            "templeId": created_temple["templeId"],
+        }, headers=registered_admin["headers"])
+        assert kiosk.status_code == 201
+
+        payload = {"templeId": created_temple["templeId"], "date": day}
+        response = test_client.post("/ticket/bulk", json=payload, headers=registered_admin["headers"])
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["X-Ticket-Count"] == "2"
+        assert response.headers["X-Tickets-Created"] == "1"
+        assert response.content.count(b"/Type /Page ") == 2
+
+        # second run reuses the rows it created
+        again = test_client.post("/ticket/bulk", json=payload, headers=registered_admin["headers"])
+        assert again.headers["X-Tickets-Created"] == "0"
+
+    def test_unpaid_online_booking_is_skipped(
+        self, test_client, registered_admin, registered_user, created_temple, confirmed_ticket
+    ):
+        from datetime import date, timedelta
+
+        day = (date.today() + timedelta(days=2)).isoformat()
+        unpaid = test_client.post("/bookings/", json={
+            "bookingType": "ONLINE",
+            "special": False,
+            "bookingDate": day,
+            "templeId": created_temple["templeId"],
+            "userId": registered_user["user_id"],
+        })
+        assert unpaid.status_code == 201
+        pending = test_client.post("/payment/create", json={
+            "bookingId": unpaid.json()["bookingId"], "amount": 100.0, "paymentMethod": "UPI",
+        })
+        assert pending.status_code == 200
+
+        response = test_client.post(
+            "/ticket/bulk",
+            json={"templeId": created_temple["templeId"], "date": day},
+            headers=registered_admin["headers"],
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Ticket-Count"] == "1"        # only the paid booking
+        assert response.headers["X-Tickets-Created"] == "0"
+
+        response = test_client.post(
+            "/ticket/bulk", json={"bookingIds": [unpaid.json()["bookingId"]]}, headers=registered_admin["headers"]
+        )
+        assert response.status_code == 404
+
+    def test_limit_checked_before_loading(
+        self, test_client, registered_admin, created_temple, confirmed_ticket, monkeypatch, sql_statements
+    ):
+        from datetime import date, timedelta
+        from api.payments import ticket_bulk
+
+        monkeypatch.setattr(ticket_bulk, "TICKET_BULK_MAX", 0)
+        day = (date.today() + timedelta(days=2)).isoformat()
+        response = test_client.post(
+            "/ticket/bulk",
+            json={"templeId": created_temple["templeId"], "date": day},
+            headers=registered_admin["headers"],
+        )
+        assert response.status_code == 400
+        assert "max 0" in response.json()["detail"]
+
+        # only the count ran: no booking rows, participants or tickets loaded
+        bulk = [s for s in sql_statements if "bookings" in s and "admins" not in s]
+        assert len(bulk) == 1 and "count(" in bulk[0].lower()
+        assert not [s for s in sql_statements if "booking_participants" in s or "FROM tickets" in s]
+
+    def test_bundle_by_booking_ids(self, test_client, registered_admin, confirmed_ticket):
+        response = test_client.post(
+            "/ticket/bulk", json={"bookingIds": [confirmed_ticket["bookingId"]]}, headers=registered_admin["headers"]
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Ticket-Count"] == "1"
+        assert response.headers["X-Tickets-Created"] == "0"
+
+    def test_bulk_validation(self, test_client, registered_admin, registered_user):
+        headers = registered_admin["headers"]
+        assert test_client.post("/ticket/bulk", json={"templeId": 1}, headers=headers).status_code == 400
+        assert test_client.post("/ticket/bulk", json={"bookingIds": [999999999]}, headers=headers).status_code == 404
+
+        response = test_client.post("/ticket/bulk", json={"bookingIds": [1]}, headers=registered_user["headers"])
+        assert response.status_code == 403
+
+
+class TestDiskLRU:
+
+    def _write(self, cache, name, size):
+        os.makedirs(cache.directory, exist_ok=True)
+        with open(cache.path(name), "wb") as f:
+            f.write(b"x" * size)
+        cache.add(name)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        from api.payments.ticket_image_cache import DiskLRU
+
+        cache = DiskLRU(str(tmp_path), max_bytes=250)
+        self._write(cache, "a.png", 100)
+        self._write(cache, "b.png", 100)
+        assert cache.get("a.png")          # a is now most recently used
+        self._write(cache, "c.png", 100)   # over budget -> evict b
+
+        assert cache.get("b.png") is None
+        assert not os.path.exists(tmp_path / "b.png")
+        assert cache.get("a.png") and cache.get("c.png")
+
+    def test_picks_up_existing_files_on_load(self, tmp_path):
+        from api.payments.ticket_image_cache import DiskLRU
+
+        (tmp_path / "old.png").write_bytes(b"x" * 100)
+        os.utime(tmp_path / "old.png", (1, 1))
+        (tmp_path / "new.png").write_bytes(b"x" * 100)
+
+        cache = DiskLRU(str(tmp_path), max_bytes=150)
+        assert cache.get("new.png")
+        assert not os.path.exists(tmp_path / "old.png")